@@ -0,0 +1,122 @@
+"""Compare startup time, page load time and memory of browser profiles.
+
+Run against a live Odoo server, for instance the one started by
+``make odoo-start``:
+
+.. code:: sh
+
+   python benchmarks/browser_profiles.py chrome chrome-headless chrome-lean
+
+For each profile of :mod:`odooselenium.browsers`, the script starts the
+browser, opens Odoo's login page then web client (logged in with JSON-RPC),
+and reports median durations and resident memory of the browser processes
+(Linux only).
+
+"""
+import argparse
+import os
+import time
+
+from odooselenium import OdooUI
+from odooselenium import browsers
+
+
+def process_tree_rss(pid):
+    """Return resident memory of process ``pid`` and descendants, in MiB.
+
+    Return None where ``/proc`` is not available.
+
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{0}/status'.format(entry)) as status:
+                fields = dict(line.split(':', 1) for line in status
+                              if ':' in line)
+        except IOError:  # Process exited meanwhile.
+            continue
+        children.setdefault(int(fields['PPid']), []).append(int(entry))
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0])
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss.get(current, 0)
+        pending.extend(children.get(current, []))
+    return total / 1024.0
+
+
+def driver_pid(driver):
+    """Return PID of driver service or browser process, or None."""
+    for owner in (getattr(driver, 'service', None),
+                  getattr(driver, 'binary', None)):
+        process = getattr(owner, 'process', None)
+        if process is not None:
+            return process.pid
+    return None
+
+
+def measure(profile, args):
+    """Return dictionary of durations and memory for one browser run."""
+    start = time.time()
+    driver = browsers.new_webdriver(profile)
+    started = time.time()
+    try:
+        ui = OdooUI(driver, base_url=args.url)
+        with ui.wait_for_page_load():
+            driver.get(ui.url('web/login'))
+        login_page = time.time()
+        ui.login(args.username, args.password, args.dbname, use_rpc=True)
+        web_client = time.time()
+        pid = driver_pid(driver)
+        memory = process_tree_rss(pid) if pid else None
+    finally:
+        driver.quit()
+    return {
+        'startup': started - start,
+        'login page': login_page - started,
+        'web client': web_client - login_page,
+        'memory': memory,
+    }
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('profiles', nargs='*',
+                        default=sorted(browsers.PROFILES))
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--dbname', default='test')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    columns = ('startup', 'login page', 'web client')
+    print '{0:<18} {1:>10} {2:>10} {3:>10} {4:>10}'.format(
+        'profile', *(columns + ('MiB',)))
+    for profile in args.profiles:
+        try:
+            runs = [measure(profile, args) for i in range(args.repeat)]
+        except Exception as error:
+            print '{0:<18} failed: {1}'.format(profile, error)
+            continue
+        memory = [run['memory'] for run in runs if run['memory'] is not None]
+        print '{0:<18} {1:>10.2f} {2:>10.2f} {3:>10.2f} {4:>10}'.format(
+            profile, *([median([run[column] for run in runs])
+                        for column in columns] +
+                       ['{0:.0f}'.format(median(memory)) if memory
+                        else 'n/a']))
+
+
+if __name__ == '__main__':
+    main()
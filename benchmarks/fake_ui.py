@@ -0,0 +1,141 @@
+"""Count WebDriver commands and time of OdooUI methods on static fixtures.
+
+Runs without Odoo nor browser: pages captured from Odoo web client (see
+``tests/fixtures``) are served by :class:`odooselenium.fake.FakeWebDriver`.
+
+.. code:: sh
+
+   python benchmarks/fake_ui.py --repeat 20
+
+Command counts are those a real browser would receive. Times measure the
+Python side only (no network, no rendering), so they compare helpers' own
+overhead, not end-to-end durations.
+
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from odooselenium import OdooUI
+from odooselenium import menu
+from odooselenium.fake import FakeWebDriver
+from odooselenium.instrument import CommandRecorder
+
+
+#: Directory of captured Odoo web client pages.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                        'tests', 'fixtures')
+
+#: URL of web client, as used in fixtures.
+WEB_URL = 'http://localhost:8069/web'
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name)) as fixture_file:
+        return fixture_file.read()
+
+
+def list_driver():
+    driver = FakeWebDriver(fixture('list_view.html'), url=WEB_URL,
+                           menus=json.loads(fixture('menus.json')))
+    driver.browser.on_click(
+        '//a[@data-pager-action="next"]',
+        lambda browser, element: browser.load_html(
+            fixture('list_view_page2.html')))
+    driver.browser.on_click('//td[@data-field]', lambda browser, element: None)
+    return driver
+
+
+def form_driver():
+    return FakeWebDriver(fixture('form_view.html'), url=WEB_URL)
+
+
+def wizard_driver():
+    driver = FakeWebDriver(fixture('wizard.html'), url=WEB_URL)
+    driver.browser.on_click(
+        '//button[@data-bt-testing-name="action_next"]',
+        lambda browser, element: browser.load_html(fixture('list_view.html')))
+    return driver
+
+
+def navigate(ui):
+    ui.go_to_module('Sales')
+    ui.go_to_view('Customers')
+
+
+def read_form(ui):
+    for field in ('name', 'is_company', 'phone', 'lang'):
+        ui.get_value(field, 'res.partner')
+
+
+def fill_form(ui):
+    ui.enter_data('phone', 'res.partner', '+32 2 290 34 90')
+    ui.enter_data('is_company', 'res.partner', False)
+    ui.enter_data('lang', 'res.partner', 'French')
+
+
+def wizard(ui):
+    ui.wizard_screen([
+        {'field': 'code_digits', 'model': 'account.installer', 'value': '8'},
+        {'field': 'has_default_company', 'model': 'account.installer',
+         'value': True},
+        {'field': 'period', 'model': 'account.installer',
+         'value': '3 Monthly'},
+    ])
+
+
+#: Scenarios: (name, driver factory, function of OdooUI).
+SCENARIOS = [
+    ('list rows (webdriver)', list_driver,
+     lambda ui: ui.get_rows_from_list()),
+    ('list rows (in-page)', list_driver,
+     lambda ui: ui.get_rows_from_list(in_page=True)),
+    ('click column on page 2', list_driver,
+     lambda ui: ui.click_list_column('display_name', 'Think Big Systems')),
+    ('navigate', list_driver, navigate),
+    ('read form', form_driver, read_form),
+    ('fill form', form_driver, fill_form),
+    ('wizard', wizard_driver, wizard),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--idle-wait', action='store_true')
+    parser.add_argument('--menu-index', action='store_true')
+    args = parser.parse_args()
+
+    methods = CommandRecorder()
+    print '{0:<25} {1:>10} {2:>10}'.format('scenario', 'commands', 'ms')
+    for name, factory, scenario in SCENARIOS:
+        recorder = CommandRecorder()
+        elapsed = 0.0
+        for i in range(args.repeat):
+            menu._indexes.clear()
+            driver = factory()
+            ui = OdooUI(driver, idle_wait=args.idle_wait,
+                        menu_index=args.menu_index)
+            recorder.install(driver)
+            start = time.time()
+            scenario(ui)
+            elapsed += time.time() - start
+            recorder.uninstall()
+        print '{0:<25} {1:>10.0f} {2:>10.2f}'.format(
+            name, recorder.totals()['commands'] / float(args.repeat),
+            elapsed * 1000 / args.repeat)
+        for action, counters in recorder.actions.items():
+            totals = methods.actions.setdefault(
+                action, {'commands': 0, 'seconds': 0.0, 'bytes': 0})
+            for key in totals:
+                totals[key] += counters[key]
+    print
+    print 'By OdooUI method, over {0} runs of all scenarios:'.format(
+        args.repeat)
+    methods.report(sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare per-command latency with and without pooled connections.
+
+Run against a local chromedriver:
+
+.. code:: sh
+
+   chromedriver --port=9515 &
+   python benchmarks/keep_alive.py --driver http://127.0.0.1:9515
+
+Without ``--driver``, commands go to a stub driver started by the script.
+``STATUS`` commands, which need no browser session, are sent with:
+
+* a new connection per command (``RemoteConnection`` of remote drivers),
+* one shared keep-alive connection (``RemoteConnection`` of local drivers),
+  single thread only,
+* :class:`odooselenium.connection.PooledConnection`.
+
+With ``--threads``, commands are sent from several threads at once.
+
+"""
+import argparse
+import time
+from multiprocessing.pool import ThreadPool
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from odooselenium.connection import PooledConnection
+from odooselenium.stubdriver import start_stub_driver
+
+
+def measure(executor, commands, threads):
+    """Return milliseconds per command sent with ``executor``."""
+    def send(index):
+        executor.execute(Command.STATUS, {})
+
+    pool = ThreadPool(threads)
+    start = time.time()
+    pool.map(send, range(commands))
+    elapsed = time.time() - start
+    pool.close()
+    pool.join()
+    return elapsed * 1000 / commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--driver', help='URL of browser driver')
+    parser.add_argument('--commands', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    url = args.driver or start_stub_driver().url
+    executors = [('new connection', RemoteConnection(url))]
+    if args.threads == 1:
+        executors.append(('shared keep-alive',
+                          RemoteConnection(url, keep_alive=True)))
+    executors.append(('pooled keep-alive', PooledConnection(url)))
+
+    print '{0:<20} {1:>10} {2:>12}'.format('executor', 'ms/command',
+                                           'connections')
+    for name, executor in executors:
+        milliseconds = measure(executor, args.commands, args.threads)
+        print '{0:<20} {1:>10.3f} {2:>12}'.format(
+            name, milliseconds, getattr(executor, 'opened', 'n/a'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compare WebDriver and in-page extraction of list view rows.
+
+Run against a live Odoo server, for instance the one started by
+``make odoo-start``:
+
+.. code:: sh
+
+   python benchmarks/list_rows.py --view 'Modules/Local Modules'
+
+For each extraction mode, the script reports the number of WebDriver commands
+sent to the browser and the wall time of :meth:`OdooUI.get_rows_from_list`.
+
+"""
+import argparse
+import time
+
+from odooselenium import OdooUI
+from odooselenium import browsers
+from odooselenium.instrument import CommandRecorder
+
+
+def measure(ui, recorder, repeat, in_page):
+    """Return (commands per call, seconds per call, rows) for one mode."""
+    recorder.reset()
+    start = time.time()
+    for i in range(repeat):
+        rows = ui.get_rows_from_list(in_page=in_page)
+    elapsed = time.time() - start
+    commands = recorder.totals()['commands']
+    return commands / float(repeat), elapsed / repeat, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--dbname', default='test')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--module', default='Settings')
+    parser.add_argument('--view', default='Modules/Local Modules')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--browser', default=browsers.default_profile(),
+                        choices=sorted(browsers.PROFILES))
+    args = parser.parse_args()
+
+    driver = browsers.new_webdriver(args.browser)
+    try:
+        ui = OdooUI(driver, base_url=args.url)
+        ui.login(args.username, args.password, args.dbname)
+        ui.go_to_module(args.module)
+        ui.go_to_view(args.view)
+        with ui.wait_for_ajax_load():
+            ui.switch_to_view('list')
+        recorder = CommandRecorder()
+        recorder.install(driver)
+
+        results = {}
+        for label, in_page in (('webdriver', False), ('in-page', True)):
+            results[label] = measure(ui, recorder, args.repeat, in_page)
+        assert results['webdriver'][2] == results['in-page'][2], \
+            'Extraction modes returned different rows'
+
+        rows = results['webdriver'][2]
+        print '{0} rows x {1} columns'.format(
+            len(rows), len(rows[0]) if rows else 0)
+        print '{0:<10} {1:>10} {2:>10}'.format('mode', 'commands', 'seconds')
+        for label in ('webdriver', 'in-page'):
+            count, seconds, _ = results[label]
+            print '{0:<10} {1:>10.0f} {2:>10.3f}'.format(label, count, seconds)
+    finally:
+        driver.quit()
+
+
+if __name__ == '__main__':
+    main()
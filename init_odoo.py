@@ -1,14 +1,37 @@
 """Utilities to run and setup Odoo using Docker."""
+import hashlib
+import json
+import os
 import subprocess
 import time
 
 import erppeek
 
+from odooselenium import provision
+from odooselenium import rpc
+
+
+#: Docker image of Odoo service, as in docker-compose.yml.
+ODOO_IMAGE = 'odoo:8'
+
+#: Docker containers of Odoo and PostgreSQL services.
+ODOO_CONTAINER = 'odooselenium_odoo_1'
+POSTGRES_CONTAINER = 'odooselenium_postgresql_1'
+
+#: JSON file listing addons installed in test database.
+MODULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'odoo_modules.json')
+
+#: Odoo master password, as configured in Docker image.
+MASTER_PASSWORD = 'admin'
+
 
 def odoo_start():
+    """Start Odoo service unless running, return its startup time or None."""
     try:
         erppeek.Client(server='http://localhost:8069')
     except:
+        start = time.time()
         cmd = 'docker-compose up -d'
         subprocess.call(cmd, shell=True)
     else:
@@ -17,22 +40,10 @@ def odoo_start():
 
     # Wait for Odoo to be loaded.
     print "Waiting for Odoo server to be available..."
-    time.sleep(3)
-    limit = time.time() + 30
-    proofs_of_service = [
-        'openerp.service.server: HTTP service (werkzeug) '  # ...
-        'running on 0.0.0.0:8069',
-        'openerp.addons.bus.bus: Bus.loop listen imbus on db postgres',
-    ]
-    while time.time() < limit:
-        cmd = 'docker logs {docker_instance}'.format(
-            docker_instance='odooselenium_odoo_1')
-        output = subprocess.check_output(cmd, shell=True)
-        if all([proof in output for proof in proofs_of_service]):
-            break
-        else:
-            time.sleep(1)
-    print "... Odoo server up and running!"
+    rpc.wait_for_server('http://localhost:8069', timeout=120)
+    startup = time.time() - start
+    print "... Odoo server up and running after {0:.1f}s!".format(startup)
+    return startup
 
 
 def odoo_stop():
@@ -40,35 +51,97 @@ def odoo_stop():
     subprocess.call(cmd, shell=True)
 
 
-def odoo_setup():
+def odoo_setup(dbname=u'test'):
+    """Create ``dbname`` and install addons of :data:`MODULES_FILE`.
+
+    Return timings of installation phases, see
+    :func:`odooselenium.provision.install_modules`.
+
+    """
     odoo = erppeek.Client(
         server='http://localhost:8069',
     )
-    dbname = u'test'
     if dbname not in odoo.db.list():
         print "Creating database {0}...".format(dbname)
         odoo.create_database('admin', dbname)
         print "... Database '{0}' created.".format(dbname)
     else:
         print "Database '{0}' already exists.".format(dbname)
-    # Log in database.
-    odoo = erppeek.Client(
-        server='http://localhost:8069',
-        db='test',
-        user='admin',
-        password='admin',
-    )
-    modules = [
-        'account_accountant',
-        'web_selenium',
-    ]
-    print "Installing addons..."
-    for module in modules:
-        if module not in odoo.modules()['installed']:
-            assert module in odoo.modules()['uninstalled'], \
-                '{0} addon is not available. Check extra addons path.' \
-                .format(module)
-            odoo.install(module)
-        else:
-            print "Addon '{0}' already installed.".format(module)
-    print "... Additional modules installed."
+    # Log in database. Installation may take minutes.
+    session = rpc.Session('http://localhost:8069', timeout=3600)
+    session.authenticate(dbname, 'admin', 'admin')
+    return provision.install_modules(session,
+                                     provision.load_modules(MODULES_FILE))
+
+
+def odoo_image():
+    """Return ID of image of running Odoo container, or :data:`ODOO_IMAGE`."""
+    cmd = "docker inspect --format '{{{{.Image}}}}' {0}".format(ODOO_CONTAINER)
+    try:
+        return subprocess.check_output(cmd, shell=True).strip() or ODOO_IMAGE
+    except subprocess.CalledProcessError:
+        return ODOO_IMAGE
+
+
+def template_name(modules, image):
+    """Return name of template database provisioned with ``modules``.
+
+    >>> template_name(['web_selenium', 'account_accountant'], 'odoo:8')
+    'odooselenium_tpl_2d35be4611'
+
+    """
+    key = json.dumps([sorted(modules), image])
+    return 'odooselenium_tpl_{0}'.format(hashlib.sha1(key).hexdigest()[:10])
+
+
+def restore_database(template, dbname, method='odoo'):
+    """Replace ``dbname`` database by a copy of ``template``.
+
+    With ``method='odoo'``, Odoo's ``duplicate_database`` copies database and
+    filestore. With ``method='createdb'``, ``createdb -T`` runs in PostgreSQL
+    container and filestore is copied in Odoo container, which avoids Odoo's
+    per-request overhead; it fails while Odoo holds connections to
+    ``template``, e.g. right after the template was built.
+
+    """
+    odoo = erppeek.Client(server='http://localhost:8069')
+    if dbname in odoo.db.list():
+        odoo.db.drop(MASTER_PASSWORD, dbname)
+    if method == 'odoo':
+        odoo.db.duplicate_database(MASTER_PASSWORD, template, dbname)
+    elif method == 'createdb':
+        subprocess.check_call(
+            'docker exec {container} createdb -U odoo -T {template} {dbname}'
+            .format(container=POSTGRES_CONTAINER, template=template,
+                    dbname=dbname),
+            shell=True)
+        subprocess.check_call(
+            'docker exec {container} sh -c "test ! -d {filestore}/{template} '
+            '|| cp -a {filestore}/{template} {filestore}/{dbname}"'.format(
+                container=ODOO_CONTAINER,
+                filestore='/var/lib/odoo/filestore', template=template,
+                dbname=dbname),
+            shell=True)
+    else:
+        raise ValueError('Unknown restore method {0!r}'.format(method))
+
+
+def odoo_snapshot(dbname=u'test', method='odoo'):
+    """Restore ``dbname`` from template database, building template once.
+
+    Template is named after addons of :data:`MODULES_FILE` and Odoo image (see
+    :func:`template_name`), so it is rebuilt when either changes.
+
+    """
+    odoo = erppeek.Client(server='http://localhost:8069')
+    template = template_name(provision.load_modules(MODULES_FILE),
+                             odoo_image())
+    start = time.time()
+    if template not in odoo.db.list():
+        print "Building template database {0}...".format(template)
+        odoo_setup(template)
+        print "... Template built in {0:.1f}s.".format(time.time() - start)
+        start = time.time()
+    print "Restoring database '{0}' from {1}...".format(dbname, template)
+    restore_database(template, dbname, method)
+    print "... Database restored in {0:.1f}s.".format(time.time() - start)
@@ -0,0 +1,53 @@
+"""Attribute time spent waiting to :class:`odooselenium.OdooUI` methods."""
+import sys
+
+
+def current_action():
+    """Return name of outermost OdooUI or View method in call stack.
+
+    As an example, time spent in :meth:`OdooUI.wait_for_ajax_load` called by
+    :meth:`OdooUI.go_to_view` is attributed to ``OdooUI.go_to_view``. Returns
+    None outside of such methods.
+
+    Classes opt in with a true ``_audited`` class attribute.
+
+    """
+    action = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if owner is not None and getattr(owner, '_audited', False):
+            action = '{0}.{1}'.format(type(owner).__name__,
+                                      frame.f_code.co_name)
+        frame = frame.f_back
+    return action
+
+
+class WaitAudit(object):
+    """Cumulative time spent sleeping or polling, by action."""
+    def __init__(self):
+        #: Seconds spent waiting, by action.
+        self.seconds = {}
+        #: Number of waits, by action.
+        self.counts = {}
+
+    def record(self, action, seconds):
+        """Add ``seconds`` spent waiting in ``action``."""
+        self.seconds[action] = self.seconds.get(action, 0.0) + seconds
+        self.counts[action] = self.counts.get(action, 0) + 1
+
+    def reset(self):
+        """Forget recorded waits."""
+        self.seconds.clear()
+        self.counts.clear()
+
+    def report(self, stream=None):
+        """Write table of waits, longest first, to ``stream`` (stderr)."""
+        if stream is None:
+            stream = sys.stderr
+        stream.write('{0:<50} {1:>6} {2:>9}\n'.format(
+            'action', 'waits', 'seconds'))
+        for action in sorted(self.seconds, key=self.seconds.get,
+                             reverse=True):
+            stream.write('{0:<50} {1:>6} {2:>9.3f}\n'.format(
+                str(action), self.counts[action], self.seconds[action]))
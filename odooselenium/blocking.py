@@ -0,0 +1,267 @@
+"""Local HTTP proxy blocking requests irrelevant to UI tests.
+
+Odoo web client loads fonts, images, avatars and third-party resources that
+tests never look at. The browser is configured to go through
+:class:`BlockingProxy`, which answers requests matching its blocklist with an
+empty response, and forwards the others. Patterns are shell-style wildcards
+(see :mod:`fnmatch`) matched against full URLs; the allowlist wins over the
+blocklist.
+
+.. code:: python
+
+   proxy = BlockingProxy()
+   proxy.start()
+   driver = browsers.new_webdriver(
+       dict(browsers.get_profile('chrome-headless'), proxy=proxy.address))
+
+Blocked requests are counted by pattern. Blocked resources are never
+requested, so their size is not known.
+
+Forwarded requests wait for Odoo as long as it takes, e.g. for module
+installs or long-polling: :attr:`BlockingProxy.timeout` only bounds
+connection to upstream servers. Responses are streamed to the browser.
+
+"""
+import BaseHTTPServer
+import fnmatch
+import httplib
+import select
+import socket
+import SocketServer
+import sys
+import threading
+import urlparse
+
+
+#: Patterns of URLs blocked by default.
+DEFAULT_BLOCKLIST = [
+    # Fonts, including icon fonts.
+    '*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*',
+    '*.eot', '*.eot?*', '*.otf', '*.otf?*',
+    # Images: record pictures, avatars, company logo. Static images of the
+    # web client are kept: OdooUI waits for and clicks some of them.
+    '*/web/binary/image*', '*/web/binary/company_logo*', '*/web/image/*',
+    '*/web/image?*',
+    # Third parties.
+    '*://*.gravatar.com/*', '*://www.google-analytics.com/*',
+    '*://www.googletagmanager.com/*', '*://fonts.googleapis.com/*',
+    '*://fonts.gstatic.com/*', '*://apps.openerp.com/*',
+    '*://apps.odoo.com/*', '*://services.openerp.com/*',
+]
+
+#: Patterns of URLs never blocked by default.
+DEFAULT_ALLOWLIST = [
+    # Loaded by OdooUI.rpc_login to set session cookie.
+    '*/web/static/src/img/favicon.ico',
+]
+
+#: Headers not forwarded by proxies, see :rfc:`2616` section 13.5.1.
+HOP_BY_HOP_HEADERS = frozenset([
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'proxy-connection', 'te', 'trailers', 'transfer-encoding', 'upgrade'])
+
+
+def matches(url, patterns):
+    """Return first of ``patterns`` matching ``url``, or None.
+
+    >>> matches('http://localhost:8069/web/binary/image?id=1',
+    ...         DEFAULT_BLOCKLIST)
+    '*/web/binary/image*'
+
+    """
+    for pattern in patterns:
+        if fnmatch.fnmatchcase(url, pattern):
+            return pattern
+    return None
+
+
+class _ProxyHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Block or forward one browser connection's requests."""
+    protocol_version = 'HTTP/1.1'
+
+    def _forward(self):
+        proxy = self.server.proxy
+        url = self.path
+        if not proxy.record(url):
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        parts = urlparse.urlsplit(url)
+        path = urlparse.urlunsplit(('', '', parts.path or '/', parts.query,
+                                    ''))
+        headers = dict((name, value) for name, value in self.headers.items()
+                       if name.lower() not in HOP_BY_HOP_HEADERS)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        connection = httplib.HTTPConnection(parts.netloc,
+                                            timeout=proxy.timeout)
+        try:
+            try:
+                connection.connect()
+                # Wait for response as long as Odoo works on it.
+                connection.sock.settimeout(None)
+                connection.request(self.command, path, body, headers)
+                response = connection.getresponse()
+            except (socket.error, httplib.HTTPException) as error:
+                self.send_error(502, str(error))
+                return
+            self._stream(response)
+        finally:
+            connection.close()
+
+    def _stream(self, response):
+        """Send upstream ``response`` to browser, chunk by chunk."""
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(name, value)
+        has_body = self.command != 'HEAD' and \
+            response.status not in (204, 304) and response.status >= 200
+        chunked = has_body and response.getheader('Content-Length') is None
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        if not has_body:
+            return
+        while True:
+            data = response.read(65536)
+            if not data:
+                break
+            if chunked:
+                data = '{0:x}\r\n{1}\r\n'.format(len(data), data)
+            self.wfile.write(data)
+        if chunked:
+            self.wfile.write('0\r\n\r\n')
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = _forward
+
+    def do_CONNECT(self):
+        """Tunnel HTTPS, blocking by host since path is encrypted."""
+        host, port = self.path.rsplit(':', 1)
+        if not self.server.proxy.record('https://{0}/'.format(host)):
+            self.send_error(403, 'Blocked by odooselenium')
+            return
+        try:
+            upstream = socket.create_connection(
+                (host, int(port)), timeout=self.server.proxy.timeout)
+        except socket.error as error:
+            self.send_error(502, str(error))
+            return
+        upstream.settimeout(None)
+        self.send_response(200, 'Connection established')
+        self.end_headers()
+        self.close_connection = 1
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                for source in select.select(sockets, [], [])[0]:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    target = upstream if source is self.connection \
+                        else self.connection
+                    target.sendall(data)
+        finally:
+            upstream.close()
+
+    def log_message(self, *args):
+        pass
+
+
+class _ProxyServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class BlockingProxy(object):
+    """HTTP proxy answering blocked URLs with empty responses."""
+    def __init__(self, blocklist=None, allowlist=None, host='127.0.0.1',
+                 port=0, timeout=30):
+        #: Patterns of blocked URLs.
+        self.blocklist = list(DEFAULT_BLOCKLIST if blocklist is None
+                              else blocklist)
+        #: Patterns of URLs never blocked.
+        self.allowlist = list(DEFAULT_ALLOWLIST if allowlist is None
+                              else allowlist)
+        #: Timeout of connection to upstream servers, in seconds. Responses
+        #: are waited for without timeout.
+        self.timeout = timeout
+        #: Number of requests seen.
+        self.requests = 0
+        #: Number of requests blocked, by pattern.
+        self.blocked = {}
+        self._host = host
+        self._port = port
+        self._server = None
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        """``host:port`` of running proxy, as browsers expect it."""
+        return '{0}:{1}'.format(*self._server.server_address)
+
+    def start(self):
+        """Listen in background threads."""
+        self._server = _ProxyServer((self._host, self._port), _ProxyHandler)
+        self._server.proxy = self
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """Stop listening."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def record(self, url):
+        """Count request of ``url``, return True if it may be forwarded."""
+        pattern = None
+        if not matches(url, self.allowlist):
+            pattern = matches(url, self.blocklist)
+        with self._lock:
+            self.requests += 1
+            if pattern is None:
+                return True
+            self.blocked[pattern] = self.blocked.get(pattern, 0) + 1
+        return False
+
+    def stats(self):
+        """Return dictionary of request counters."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'blocked': sum(self.blocked.values()),
+            }
+
+    def reset(self):
+        """Reset counters, e.g. between tests."""
+        with self._lock:
+            self.requests = 0
+            self.blocked.clear()
+
+    def report(self, stream=None):
+        """Write counters and most blocked patterns to ``stream``."""
+        if stream is None:
+            stream = sys.stderr
+        stream.write('{blocked} of {requests} requests blocked\n'.format(
+            **self.stats()))
+        for pattern in sorted(self.blocked, key=self.blocked.get,
+                              reverse=True):
+            stream.write('{0:>6} {1}\n'.format(self.blocked[pattern],
+                                               pattern))
+
+
+#: Proxy shared by :class:`odooselenium.TestCase` instances, see
+#: :func:`default_proxy`.
+_default_proxy = None
+
+
+def default_proxy():
+    """Return process-wide :class:`BlockingProxy`, started on first call."""
+    global _default_proxy
+    if _default_proxy is None:
+        _default_proxy = BlockingProxy()
+        _default_proxy.start()
+    return _default_proxy
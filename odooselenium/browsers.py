@@ -0,0 +1,280 @@
+"""Browser profiles and factory of web drivers.
+
+A profile is a dictionary of options, see :data:`DEFAULT_OPTIONS`. Named
+profiles are registered in :data:`PROFILES`; :class:`odooselenium.TestCase`
+picks one with its ``browser`` setting, which defaults to
+``ODOOSELENIUM_BROWSER`` environment variable.
+
+.. code:: sh
+
+   ODOOSELENIUM_BROWSER=chrome-lean python -m pytest tests/
+
+Lean profiles run headless and skip work tests do not need: GPU
+compositing, images, extensions, throttling of background tabs and
+memory-hungry caches.
+
+Headless profiles need Chrome 59 and chromedriver 2.29, or Firefox 56 driven
+by geckodriver, which requires Selenium 3. Selenium 2 drives Firefox 47 or
+older through an extension and cannot run it headless. Older browsers would
+silently start with a window, so :func:`new_webdriver` refuses them.
+
+"""
+import os
+import re
+
+import selenium
+from selenium import webdriver
+from selenium.webdriver.firefox.firefox_binary import FirefoxBinary
+
+
+#: Options of profiles, with default values.
+DEFAULT_OPTIONS = {
+    # ``chrome`` or ``firefox``.
+    'browser': 'chrome',
+    'headless': False,
+    # ``(width, height)`` of browser window, or None for browser's default.
+    'window_size': None,
+    'gpu': True,
+    'images': True,
+    'extensions': True,
+    'background_throttling': True,
+    'low_memory': False,
+    # ``host:port`` of HTTP proxy, see :mod:`odooselenium.blocking`.
+    'proxy': None,
+}
+
+#: Options of lean profiles.
+LEAN_OPTIONS = {
+    'headless': True,
+    'window_size': (1280, 1024),
+    'gpu': False,
+    'images': False,
+    'extensions': False,
+    'background_throttling': False,
+    'low_memory': True,
+}
+
+#: Profiles, by name.
+PROFILES = {
+    'chrome': {'browser': 'chrome'},
+    'chrome-headless': {'browser': 'chrome', 'headless': True,
+                        'window_size': (1280, 1024)},
+    'chrome-lean': dict(LEAN_OPTIONS, browser='chrome'),
+    'firefox': {'browser': 'firefox'},
+    'firefox-headless': {'browser': 'firefox', 'headless': True,
+                         'window_size': (1280, 1024)},
+    'firefox-lean': dict(LEAN_OPTIONS, browser='firefox'),
+}
+
+#: Minimal versions running headless, by browser, as ``{component: version}``
+#: where component is ``browser`` or name of its driver.
+HEADLESS_VERSIONS = {
+    'chrome': {'browser': (59,), 'chromedriver': (2, 29)},
+    'firefox': {'browser': (56,), 'selenium': (3,)},
+}
+
+#: Name of profile used when ``ODOOSELENIUM_BROWSER`` is not set.
+DEFAULT_PROFILE = 'chrome'
+
+
+def default_profile():
+    """Return name of profile set in environment, or default one."""
+    return os.environ.get('ODOOSELENIUM_BROWSER') or DEFAULT_PROFILE
+
+
+def get_profile(name=None):
+    """Return options of profile ``name`` (default: :func:`default_profile`).
+
+    >>> get_profile('chrome-lean')['headless']
+    True
+
+    """
+    if name is None:
+        name = default_profile()
+    try:
+        profile = PROFILES[name]
+    except KeyError:
+        raise ValueError('Unknown browser profile {0!r}, choose one of {1}'
+                         .format(name, ', '.join(sorted(PROFILES))))
+    options = dict(DEFAULT_OPTIONS)
+    options.update(profile)
+    return options
+
+
+def chrome_arguments(options):
+    """Return command line arguments of Chrome for profile ``options``.
+
+    >>> chrome_arguments(get_profile('chrome-headless'))
+    ['--headless', '--window-size=1280,1024']
+
+    """
+    arguments = []
+    if options['headless']:
+        arguments.append('--headless')
+    if options['window_size']:
+        arguments.append('--window-size={0},{1}'.format(
+            *options['window_size']))
+    if not options['gpu']:
+        arguments.append('--disable-gpu')
+    if not options['images']:
+        arguments.append('--blink-settings=imagesEnabled=false')
+    if not options['extensions']:
+        arguments.append('--disable-extensions')
+    if not options['background_throttling']:
+        arguments.extend([
+            '--disable-background-timer-throttling',
+            '--disable-backgrounding-occluded-windows',
+            '--disable-renderer-backgrounding',
+        ])
+    if options['low_memory']:
+        arguments.extend([
+            '--disable-dev-shm-usage',
+            '--disable-background-networking',
+            '--disable-default-apps',
+            '--disable-sync',
+            '--disable-translate',
+            '--mute-audio',
+            '--no-first-run',
+            '--renderer-process-limit=1',
+        ])
+    if options['proxy']:
+        arguments.extend([
+            '--proxy-server=http://{0}'.format(options['proxy']),
+            # Chrome does not proxy loopback addresses unless told to.
+            '--proxy-bypass-list=<-loopback>',
+        ])
+    return arguments
+
+
+def chrome_preferences(options):
+    """Return user preferences of Chrome for profile ``options``."""
+    preferences = {}
+    if not options['images']:
+        preferences['profile.managed_default_content_settings.images'] = 2
+    return preferences
+
+
+def firefox_preferences(options):
+    """Return ``about:config`` preferences of Firefox for ``options``.
+
+    Extensions cannot be disabled: Firefox driver is itself an extension.
+
+    """
+    preferences = {}
+    if not options['gpu']:
+        preferences['layers.acceleration.disabled'] = True
+    if not options['images']:
+        preferences['permissions.default.image'] = 2
+    if not options['background_throttling']:
+        preferences['dom.timeout.enable_budget_timer_throttling'] = False
+        preferences['dom.min_background_timeout_value'] = 4
+    if options['low_memory']:
+        preferences.update({
+            'browser.cache.disk.enable': False,
+            'browser.cache.memory.capacity': 16384,
+            'browser.sessionhistory.max_total_viewers': 0,
+            'dom.ipc.processCount': 1,
+            'extensions.update.enabled': False,
+            'app.update.enabled': False,
+        })
+    if options['proxy']:
+        host, port = options['proxy'].rsplit(':', 1)
+        preferences.update({
+            'network.proxy.type': 1,
+            'network.proxy.http': host,
+            'network.proxy.http_port': int(port),
+            'network.proxy.ssl': host,
+            'network.proxy.ssl_port': int(port),
+            'network.proxy.no_proxies_on': '',
+            'network.proxy.allow_hijacking_localhost': True,
+        })
+    return preferences
+
+
+def parse_version(version):
+    """Return tuple of leading numbers of ``version`` string.
+
+    >>> parse_version('2.25.426924 (649f9b868f6783ec9de71c123212b908bf3b232e)')
+    (2, 25, 426924)
+
+    """
+    match = re.match(r'[0-9]+(\.[0-9]+)*', version or '')
+    if match is None:
+        return ()
+    return tuple(int(number) for number in match.group(0).split('.'))
+
+
+def headless_error(browser, versions):
+    """Return why ``browser`` cannot run headless, or None.
+
+    ``versions`` maps components of :data:`HEADLESS_VERSIONS` to their
+    version strings. Unknown versions are not checked.
+
+    >>> headless_error('chrome', {'browser': '58.0.3029.110',
+    ...                           'chromedriver': '2.29.457597'})
+    'headless chrome needs browser 59 or later, got 58.0.3029.110'
+
+    """
+    minimal = HEADLESS_VERSIONS[browser]
+    for component in sorted(minimal):
+        version = parse_version(versions.get(component))
+        if version and version < minimal[component]:
+            return 'headless {0} needs {1} {2} or later, got {3}'.format(
+                browser, component,
+                '.'.join(str(number) for number in minimal[component]),
+                versions[component])
+    return None
+
+
+def _check_headless(driver, browser, versions):
+    """Quit ``driver`` and raise ValueError if it cannot be headless."""
+    capabilities = driver.capabilities
+    versions = dict(versions, browser=capabilities.get('browserVersion') or
+                    capabilities.get('version'))
+    error = headless_error(browser, versions)
+    if error is not None:
+        driver.quit()
+        raise ValueError(error)
+
+
+def new_webdriver(profile=None):
+    """Start browser of ``profile`` (name or options), return web driver."""
+    if isinstance(profile, dict):
+        options = dict(DEFAULT_OPTIONS, **profile)
+    else:
+        options = get_profile(profile)
+    if options['browser'] == 'chrome':
+        chrome_options = webdriver.ChromeOptions()
+        for argument in chrome_arguments(options):
+            chrome_options.add_argument(argument)
+        preferences = chrome_preferences(options)
+        if preferences:
+            chrome_options.add_experimental_option('prefs', preferences)
+        driver = webdriver.Chrome(chrome_options=chrome_options)
+        if options['headless']:
+            _check_headless(driver, 'chrome', {
+                'chromedriver': driver.capabilities.get('chrome', {}).get(
+                    'chromedriverVersion')})
+        return driver
+    if options['browser'] == 'firefox':
+        firefox_profile = webdriver.FirefoxProfile()
+        for key, value in firefox_preferences(options).items():
+            firefox_profile.set_preference(key, value)
+        firefox_profile.update_preferences()
+        binary = FirefoxBinary()
+        if options['headless']:
+            # Fail before starting a browser with a window.
+            error = headless_error('firefox',
+                                   {'selenium': selenium.__version__})
+            if error is not None:
+                raise ValueError(error)
+            binary.add_command_line_options('-headless')
+        driver = webdriver.Firefox(firefox_profile=firefox_profile,
+                                   firefox_binary=binary)
+        if options['headless']:
+            _check_headless(driver, 'firefox',
+                            {'selenium': selenium.__version__})
+        if options['window_size']:
+            driver.set_window_size(*options['window_size'])
+        return driver
+    raise ValueError('Unsupported browser {0!r}'.format(options['browser']))
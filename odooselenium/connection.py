@@ -0,0 +1,146 @@
+"""Keep-alive connections to the browser driver, reused from a pool.
+
+Every WebDriver command is one HTTP request to chromedriver or geckodriver.
+Remote web drivers open a new TCP connection per command, and local ones
+share a single connection which is not safe across threads.
+:class:`PooledConnection` keeps idle connections in a pool: each command
+borrows one, so sessions driven from several threads (see
+:mod:`odooselenium.multi`) never open more connections than they run
+commands concurrently.
+
+.. code:: python
+
+   install(webdriver)
+   ui = OdooUI(webdriver)  # Or OdooUI(webdriver, keep_alive=True).
+
+"""
+import collections
+import httplib
+import json
+import socket
+import threading
+import urlparse
+
+from selenium.webdriver.remote.errorhandler import ErrorCode
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+
+#: Default number of idle connections kept per command executor.
+DEFAULT_POOL_SIZE = 4
+
+
+class PooledConnection(RemoteConnection):
+    """RemoteConnection sending commands over pooled keep-alive connections.
+
+    At most ``pool_size`` idle connections are kept. A command sent over a
+    connection the driver closed meanwhile is sent again once, over a new
+    connection.
+
+    Requests are sent and parsed here, as selenium 2 does over its own
+    keep-alive connection, so that they do not depend on how the installed
+    selenium version sends them.
+
+    """
+    def __init__(self, remote_server_addr, pool_size=DEFAULT_POOL_SIZE,
+                 resolve_ip=True):
+        #: Maximum number of idle connections kept.
+        self.pool_size = pool_size
+        #: Number of connections opened so far.
+        self.opened = 0
+        parts = urlparse.urlsplit(remote_server_addr)
+        self._address = (parts.hostname, parts.port or 80)
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+        RemoteConnection.__init__(self, remote_server_addr,
+                                  resolve_ip=resolve_ip)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.opened += 1
+        return httplib.HTTPConnection(*self._address,
+                                      timeout=self.get_timeout()), False
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _send(self, connection, method, path, body):
+        """Send request over ``connection``, return status, headers, body."""
+        headers = {
+            'Connection': 'keep-alive',
+            'Content-Type': 'application/json;charset=UTF-8',
+            'Accept': 'application/json',
+        }
+        if method not in ('POST', 'PUT'):
+            body = None
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            return response.status, response.msg, response.read()
+        except (httplib.HTTPException, socket.error):
+            connection.close()
+            raise
+
+    def _request(self, method, url, body=None):
+        parts = urlparse.urlsplit(url)
+        path = urlparse.urlunsplit(('', '', parts.path, parts.query, ''))
+        connection, reused = self._acquire()
+        try:
+            response = self._send(connection, method, path, body)
+        except (httplib.HTTPException, socket.error):
+            if not reused:
+                raise
+            # Driver closed idle connection: send again over a new one.
+            with self._lock:
+                self.opened += 1
+            connection = httplib.HTTPConnection(*self._address,
+                                                timeout=self.get_timeout())
+            response = self._send(connection, method, path, body)
+        self._release(connection)
+        status, headers, data = response
+        if 300 <= status < 304:
+            return self._request('GET', headers.getheader('Location'))
+        data = data.decode('utf-8').replace('\x00', '').strip()
+        if 399 < status <= 500:
+            return {'status': status, 'value': data}
+        if (headers.getheader('Content-Type') or '').startswith('image/png'):
+            return {'status': ErrorCode.SUCCESS, 'value': data}
+        try:
+            response = json.loads(data)
+        except ValueError:
+            return {'status': ErrorCode.SUCCESS if 199 < status < 300
+                    else ErrorCode.UNKNOWN_ERROR, 'value': data}
+        # Some drivers omit null values.
+        response.setdefault('value', None)
+        return response
+
+    def close(self):
+        """Close idle connections."""
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+
+def install(webdriver, pool_size=DEFAULT_POOL_SIZE):
+    """Make ``webdriver`` send commands with a :class:`PooledConnection`.
+
+    Return the connection. Command executors which are not
+    ``RemoteConnection``, e.g. :class:`odooselenium.fake.FakeBrowser`, are
+    kept and returned as is.
+
+    """
+    executor = webdriver.command_executor
+    if isinstance(executor, PooledConnection) or \
+            not isinstance(executor, RemoteConnection):
+        return executor
+    connection = PooledConnection(executor._url, pool_size=pool_size,
+                                  resolve_ip=False)
+    # Keep commands specific to browser, e.g. Chrome's ``launchApp``.
+    connection._commands = executor._commands
+    webdriver.command_executor = connection
+    return connection
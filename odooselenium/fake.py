@@ -0,0 +1,511 @@
+"""In-memory WebDriver over static HTML, to exercise OdooUI without browser.
+
+:class:`FakeWebDriver` is a regular Selenium ``WebDriver`` whose command
+executor is a :class:`FakeBrowser`: an lxml DOM of captured Odoo web client
+pages, answering WebDriver commands in-process. It makes it possible to test
+and benchmark the round trips of :class:`odooselenium.OdooUI` methods without
+Odoo nor Chrome.
+
+There is no JavaScript nor CSS engine:
+
+* visibility follows inline ``display: none`` / ``visibility: hidden``
+  styles, ``hidden`` attributes and :data:`HIDDEN_CLASSES`;
+* clicks toggle checkboxes, select options and follow ``#fragment`` links,
+  other effects are simulated with :meth:`FakeBrowser.on_click` callbacks;
+* scripts executed by odooselenium are stubbed (see
+  :meth:`FakeBrowser.default_scripts`), others can be added to
+  :attr:`FakeBrowser.scripts`.
+
+.. code:: python
+
+   driver = FakeWebDriver(html, url='http://localhost:8069/web')
+   driver.browser.on_click('//button[@data-bt-testing-name="action_next"]',
+                           lambda browser, element: browser.load_html(next))
+   ui = OdooUI(driver)
+
+Requires ``lxml`` and ``cssselect``, see ``fake`` extra.
+
+"""
+import itertools
+import re
+import urlparse
+
+import lxml.etree
+import lxml.html
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+from odooselenium import menu
+from odooselenium import rpctrace
+from odooselenium import timing
+from odooselenium import ui
+from odooselenium import wait
+
+
+#: WebDriver status codes, see ``selenium.webdriver.remote.errorhandler``.
+NO_SUCH_ELEMENT = 7
+STALE_ELEMENT_REFERENCE = 10
+ELEMENT_NOT_VISIBLE = 11
+UNKNOWN_ERROR = 13
+JAVASCRIPT_ERROR = 17
+NO_ALERT_OPEN = 27
+INVALID_SELECTOR = 32
+
+#: Elements never rendered.
+HIDDEN_TAGS = frozenset(['head', 'link', 'meta', 'noscript', 'script',
+                         'style', 'template', 'title'])
+
+#: Classes Odoo web client hides elements with.
+HIDDEN_CLASSES = frozenset(['oe_form_invisible', 'oe_invisible'])
+
+#: Elements starting a new line in rendered text.
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+    'li', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'tfoot',
+    'thead', 'tr', 'ul'])
+
+#: Attributes reported as "true" or None, like WebDriver does.
+BOOLEAN_ATTRIBUTES = frozenset(['checked', 'disabled', 'hidden', 'multiple',
+                                'readonly', 'required', 'selected'])
+
+#: Page loaded for URLs missing from :attr:`FakeBrowser.pages`.
+BLANK_PAGE = '<html><head></head><body></body></html>'
+
+_HIDDEN_STYLE_REX = re.compile(r'(display\s*:\s*none|visibility\s*:\s*hidden)')
+_SPECIAL_KEYS_REX = re.compile(u'[\ue000-\uf8ff]')
+
+
+class _CommandError(Exception):
+    """WebDriver error, sent back as a response with ``status``."""
+    def __init__(self, status, message):
+        super(_CommandError, self).__init__(message)
+        self.status = status
+
+
+class FakeBrowser(object):
+    """Remote end of :class:`FakeWebDriver`: DOM answering WebDriver commands.
+
+    ``pages`` maps URLs to HTML (or to callables returning HTML), loaded by
+    ``get()`` and by changes of URL fragment. ``menus`` is the ``ir.ui.menu``
+    tree returned to :data:`odooselenium.menu.MENU_LOAD_SCRIPT`.
+
+    """
+    def __init__(self, html=None, url='http://localhost:8069/web', pages=None,
+                 menus=None, scripts=None):
+        #: HTML of pages, by URL.
+        self.pages = dict(pages or {})
+        #: ``ir.ui.menu`` tree, as loaded by web client.
+        self.menus = menus
+        #: Callables ``f(browser, *args)`` emulating scripts, by source.
+        self.scripts = self.default_scripts()
+        self.scripts.update(scripts or {})
+        #: URL of current page.
+        self.url = url
+        #: Root element of current page.
+        self.document = None
+        #: Text of open alert, or None.
+        self.alert_text = None
+        #: Whether ``window.confirm()`` is suppressed, see
+        #: :meth:`odooselenium.OdooUI.confirm_suppressed`.
+        self.confirm_suppressed = False
+        #: JSON-RPC calls returned by next collection, see
+        #: :data:`odooselenium.rpctrace.COLLECT_RPC_SCRIPT`.
+        self.rpc_calls = []
+        #: Cookies, by name.
+        self.cookies = {}
+        self._clicks = []
+        self._ids = itertools.count(1)
+        self._elements = {}
+        self._element_ids = {}
+        self._handlers = {
+            'newSession': self._new_session,
+            'quit': lambda params: None,
+            'get': self._get,
+            'getCurrentUrl': lambda params: self.url,
+            'getTitle': self._get_title,
+            'getPageSource': lambda params: lxml.html.tostring(
+                self.document, encoding='unicode'),
+            'findElement': self._find_element,
+            'findElements': self._find_elements,
+            'findChildElement': self._find_element,
+            'findChildElements': self._find_elements,
+            'getElementText': self._get_element_text,
+            'getElementTagName': lambda params: self._element(params).tag,
+            'getElementAttribute': self._get_element_attribute,
+            'isElementDisplayed': lambda params: self.is_displayed(
+                self._element(params)),
+            'isElementSelected': self._is_element_selected,
+            'isElementEnabled': lambda params: 'disabled' not in
+            self._element(params).attrib,
+            'clickElement': self._click_element,
+            'clearElement': self._clear_element,
+            'sendKeysToElement': self._send_keys_to_element,
+            'executeScript': self._execute_script,
+            'executeAsyncScript': self._execute_script,
+            'setScriptTimeout': lambda params: None,
+            'setTimeouts': lambda params: None,
+            'implicitlyWait': lambda params: None,
+            'getCookies': lambda params: self.cookies.values(),
+            'addCookie': self._add_cookie,
+            'deleteCookie': lambda params: self.cookies.pop(
+                params['name'], None),
+            'deleteAllCookies': lambda params: self.cookies.clear(),
+            'getAlertText': lambda params: self._alert(),
+            'acceptAlert': self._close_alert,
+            'dismissAlert': self._close_alert,
+        }
+        self.load_html(html if html is not None else BLANK_PAGE)
+
+    @staticmethod
+    def default_scripts():
+        """Return stubs of scripts executed by odooselenium, by source."""
+        return {
+            wait.JQUERY_INACTIVE_SCRIPT: lambda browser: True,
+            wait.IDLE_TRACKER_SCRIPT: lambda browser: None,
+            wait.WAIT_FOR_IDLE_SCRIPT: lambda browser, quiet: True,
+            ui.LIST_ROWS_SCRIPT: FakeBrowser.list_rows,
+            ui.CLICK_ALL_SCRIPT: FakeBrowser.click_all,
+            ui.SUPPRESS_CONFIRM_SCRIPT: FakeBrowser.suppress_confirm,
+            ui.CLEAR_STORAGE_SCRIPT: lambda browser: None,
+            ui.GO_TO_MENU_SCRIPT: FakeBrowser.go_to_menu,
+            menu.MENU_LOAD_SCRIPT: lambda browser: browser.menus,
+            rpctrace.RPC_TRACKER_SCRIPT: lambda browser: None,
+            rpctrace.COLLECT_RPC_SCRIPT: FakeBrowser.collect_rpc_calls,
+            timing.PAGE_TIMING_SCRIPT: lambda browser: {
+                'navigation': None, 'resources': [], 'longtasks': []},
+        }
+
+    def execute(self, command, params):
+        """Run WebDriver ``command``, return JSON wire protocol response."""
+        handler = self._handlers.get(command)
+        if handler is None:
+            return {'status': UNKNOWN_ERROR, 'sessionId': 'fake',
+                    'value': {'message': 'Unsupported command ' + command}}
+        try:
+            value = handler(params)
+        except _CommandError as error:
+            return {'status': error.status, 'sessionId': 'fake',
+                    'value': {'message': str(error)}}
+        return {'status': 0, 'sessionId': 'fake', 'value': value}
+
+    def load_html(self, html):
+        """Replace current page by ``html``, keeping URL.
+
+        Elements of previous page become stale.
+
+        """
+        self.document = lxml.html.document_fromstring(html)
+
+    def set_fragment(self, fragment):
+        """Change URL fragment, load page of new URL if any."""
+        self.url = '{0}#{1}'.format(urlparse.urldefrag(self.url)[0],
+                                    fragment)
+        if self.url in self.pages:
+            self._load_page(self.url)
+
+    def go_to_menu(self, fragment, menu_id, action_id):
+        """Emulate :data:`odooselenium.ui.GO_TO_MENU_SCRIPT`.
+
+        Page of URL is loaded again even if fragment did not change, as the
+        web client reloads the action.
+
+        """
+        self.set_fragment(fragment)
+
+    def on_click(self, xpath, callback):
+        """Call ``callback(browser, element)`` on clicks on ``xpath`` nodes.
+
+        Callbacks replace the default behaviour of clicks.
+
+        """
+        self._clicks.append((xpath, callback))
+
+    def is_displayed(self, element):
+        """Return True unless ``element`` or an ancestor is hidden."""
+        while element is not None:
+            if self._is_hidden(element):
+                return False
+            element = element.getparent()
+        return True
+
+    def text(self, element):
+        """Return rendered text of ``element``, like WebDriver does."""
+        if not self.is_displayed(element):
+            return u''
+        parts = []
+        self._collect_text(element, parts)
+        text = u''.join(parts).replace(u'\xa0', u' ')
+        text = re.sub(u' *\n[ \n]*', u'\n', re.sub(u' +', u' ', text))
+        return text.strip()
+
+    def list_rows(self, columns_xpath, headers_xpath, cells_xpath):
+        """Emulate :data:`odooselenium.ui.LIST_ROWS_SCRIPT`."""
+        def select(xpath):
+            return [element for element in self.document.xpath(xpath)
+                    if self.is_displayed(element)]
+        return {
+            'columns': len(select(columns_xpath)),
+            'headers': [self.text(element)
+                        for element in select(headers_xpath)],
+            'cells': [self.text(element) for element in select(cells_xpath)],
+        }
+
+    def click(self, element):
+        """Click ``element``: call callbacks or toggle, select, follow it."""
+        callbacks = [callback for xpath, callback in self._clicks
+                     if element in self.document.xpath(xpath)]
+        for callback in callbacks:
+            callback(self, element)
+        if callbacks:
+            return
+        if element.tag == 'input' and \
+                element.get('type') in ('checkbox', 'radio'):
+            if 'checked' in element.attrib:
+                del element.attrib['checked']
+            else:
+                element.set('checked', 'checked')
+        elif element.tag == 'option':
+            for option in element.xpath('ancestor::select[1]//option'):
+                option.attrib.pop('selected', None)
+            element.set('selected', 'selected')
+        else:
+            links = element.xpath('ancestor-or-self::a[@href][1]')
+            if links and links[0].get('href').startswith('#') and \
+                    len(links[0].get('href')) > 1:
+                self.set_fragment(links[0].get('href')[1:])
+
+    def click_all(self, xpath):
+        """Emulate :data:`odooselenium.ui.CLICK_ALL_SCRIPT`."""
+        elements = [element for element in self.document.xpath(xpath)
+                    if self.is_displayed(element)]
+        for element in elements:
+            if 'checked' not in element.attrib:
+                self.click(element)
+        return len(elements)
+
+    def collect_rpc_calls(self):
+        """Emulate :data:`odooselenium.rpctrace.COLLECT_RPC_SCRIPT`."""
+        calls, self.rpc_calls = self.rpc_calls, []
+        return calls
+
+    def suppress_confirm(self, suppress):
+        """Emulate :data:`odooselenium.ui.SUPPRESS_CONFIRM_SCRIPT`."""
+        self.confirm_suppressed = suppress
+
+    def _is_hidden(self, element):
+        if not isinstance(element.tag, basestring):
+            return True
+        if element.tag in HIDDEN_TAGS or 'hidden' in element.attrib:
+            return True
+        if element.tag == 'input' and element.get('type') == 'hidden':
+            return True
+        if _HIDDEN_STYLE_REX.search(element.get('style', '')):
+            return True
+        return bool(HIDDEN_CLASSES.intersection(
+            element.get('class', '').split()))
+
+    def _collect_text(self, element, parts):
+        block = element.tag in BLOCK_TAGS
+        if block or element.tag == 'br':
+            parts.append(u'\n')
+        if element.text:
+            parts.append(re.sub(r'\s+', u' ', element.text))
+        for child in element:
+            if not self._is_hidden(child):
+                self._collect_text(child, parts)
+            if child.tail:
+                parts.append(re.sub(r'\s+', u' ', child.tail))
+        if block:
+            parts.append(u'\n')
+        elif element.tag in ('td', 'th'):
+            parts.append(u' ')
+
+    def _load_page(self, url):
+        html = self.pages.get(url)
+        if html is None:
+            html = self.pages.get(urlparse.urldefrag(url)[0], BLANK_PAGE)
+        if callable(html):
+            html = html()
+        self.load_html(html)
+
+    def _is_attached(self, element):
+        while element.getparent() is not None:
+            element = element.getparent()
+        return element is self.document
+
+    def _element_id(self, element):
+        element_id = self._element_ids.get(element)
+        if element_id is None:
+            element_id = str(next(self._ids))
+            self._element_ids[element] = element_id
+            self._elements[element_id] = element
+        return element_id
+
+    def _wrap(self, value):
+        if isinstance(value, lxml.html.HtmlElement):
+            return {'ELEMENT': self._element_id(value)}
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, dict):
+            return dict((key, self._wrap(item))
+                        for key, item in value.items())
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, dict):
+            if 'ELEMENT' in value:
+                return self._element({'id': value['ELEMENT']})
+            return dict((key, self._unwrap(item))
+                        for key, item in value.items())
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        return value
+
+    def _element(self, params):
+        element = self._elements.get(params['id'])
+        if element is None or not self._is_attached(element):
+            raise _CommandError(STALE_ELEMENT_REFERENCE,
+                                'Element is not attached to the page')
+        return element
+
+    def _search(self, params):
+        context = self._element(params) if 'id' in params else \
+            self.document
+        using, value = params['using'], params['value']
+        if using == 'xpath':
+            try:
+                found = context.xpath(value)
+            except lxml.etree.XPathError as error:
+                raise _CommandError(INVALID_SELECTOR,
+                                    '{0}: {1}'.format(error, value))
+        elif using == 'css selector':
+            found = context.cssselect(value)
+        elif using == 'id':
+            found = context.xpath('.//*[@id=$value]', value=value)
+        elif using == 'name':
+            found = context.xpath('.//*[@name=$value]', value=value)
+        elif using == 'tag name':
+            found = context.xpath('.//*[local-name()=$value]', value=value)
+        elif using == 'class name':
+            found = context.find_class(value)
+        elif using in ('link text', 'partial link text'):
+            found = [link for link in context.iter('a')
+                     if (value == self.text(link) if using == 'link text'
+                         else value in self.text(link))]
+        else:
+            raise _CommandError(INVALID_SELECTOR,
+                                'Unsupported locator ' + using)
+        return [element for element in found
+                if isinstance(element, lxml.html.HtmlElement) and
+                element is not context]
+
+    def _new_session(self, params):
+        return {'browserName': 'fake', 'javascriptEnabled': True}
+
+    def _get(self, params):
+        self.url = params['url']
+        self._load_page(self.url)
+
+    def _get_title(self, params):
+        titles = self.document.xpath('//title')
+        return titles[0].text_content().strip() if titles else u''
+
+    def _find_element(self, params):
+        found = self._search(params)
+        if not found:
+            raise _CommandError(
+                NO_SUCH_ELEMENT,
+                'Unable to locate element: {0}'.format(params['value']))
+        return self._wrap(found[0])
+
+    def _find_elements(self, params):
+        return self._wrap(self._search(params))
+
+    def _get_element_text(self, params):
+        return self.text(self._element(params))
+
+    def _get_element_attribute(self, params):
+        element = self._element(params)
+        name = params['name']
+        if name in BOOLEAN_ATTRIBUTES:
+            return 'true' if name in element.attrib else None
+        if name in ('class', 'className'):
+            return element.get('class', '')
+        if name == 'value':
+            if element.tag == 'textarea':
+                return element.get('value', element.text or '')
+            if element.tag == 'select':
+                selected = element.xpath('.//option[@selected]') or \
+                    element.xpath('.//option')
+                return selected[0].get('value', selected[0].text) \
+                    if selected else ''
+            if element.tag == 'option':
+                return element.get('value', self.text(element))
+            return element.get('value', '')
+        if name == 'type' and element.tag == 'input':
+            return element.get('type', 'text')
+        if name in ('href', 'src') and name in element.attrib:
+            return urlparse.urljoin(self.url, element.get(name))
+        return element.get(name)
+
+    def _is_element_selected(self, params):
+        element = self._element(params)
+        return 'checked' in element.attrib or 'selected' in element.attrib
+
+    def _click_element(self, params):
+        element = self._element(params)
+        if not self.is_displayed(element):
+            raise _CommandError(ELEMENT_NOT_VISIBLE,
+                                'Element is not currently visible')
+        self.click(element)
+
+    def _clear_element(self, params):
+        self._element(params).set('value', '')
+
+    def _send_keys_to_element(self, params):
+        element = self._element(params)
+        typed = _SPECIAL_KEYS_REX.sub(u'', u''.join(params['value']))
+        if element.tag == 'textarea' and 'value' not in element.attrib:
+            element.set('value', element.text or '')
+        element.set('value', element.get('value', '') + typed)
+
+    def _execute_script(self, params):
+        script = self.scripts.get(params['script'])
+        if script is None:
+            raise _CommandError(
+                JAVASCRIPT_ERROR,
+                'Script is not stubbed: {0}'.format(params['script'][:80]))
+        return self._wrap(script(self, *self._unwrap(params['args'])))
+
+    def _add_cookie(self, params):
+        cookie = params['cookie']
+        self.cookies[cookie['name']] = cookie
+
+    def _alert(self):
+        if self.alert_text is None:
+            raise _CommandError(NO_ALERT_OPEN, 'No alert is present')
+        return self.alert_text
+
+    def _close_alert(self, params):
+        self._alert()
+        self.alert_text = None
+
+
+class FakeWebDriver(RemoteWebDriver):
+    """Selenium ``WebDriver`` driving a :class:`FakeBrowser`.
+
+    Arguments are those of :class:`FakeBrowser`.
+
+    """
+    def __init__(self, html=None, url='http://localhost:8069/web', pages=None,
+                 menus=None, scripts=None):
+        super(FakeWebDriver, self).__init__(
+            command_executor=FakeBrowser(html, url, pages, menus, scripts),
+            desired_capabilities={})
+        # Typed keys are never file paths to upload.
+        self._is_remote = False
+
+    @property
+    def browser(self):
+        """:class:`FakeBrowser` answering this driver's commands."""
+        return self.command_executor
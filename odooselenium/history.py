@@ -0,0 +1,324 @@
+"""Performance history of test runs, stored in SQLite, with regressions.
+
+Each run records duration of tests and, when WebDriver commands are
+instrumented (see :mod:`odooselenium.instrument`), seconds and number of
+commands by OdooUI action. Runs are keyed by git revision and Odoo image.
+
+Tests based on :class:`odooselenium.TestCase` record into the database
+named by ``history`` configuration or ``ODOOSELENIUM_HISTORY`` environment
+variable. Then compare last run with previous ones:
+
+.. code:: sh
+
+   ODOOSELENIUM_HISTORY=perf.sqlite python -m odooselenium.runner tests/
+   python -m odooselenium.history perf.sqlite --threshold 0.3
+
+A measure regresses when it exceeds the median of the rolling baseline (the
+previous runs on same Odoo image) by ``threshold``, and the mean of the
+baseline by ``z`` standard deviations.
+
+"""
+import argparse
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from odooselenium import instrument
+
+
+#: Action name of whole test durations.
+TEST_ACTION = ''
+
+#: Marker for "runs on any Odoo image", since None is a valid image.
+ANY_IMAGE = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    revision TEXT,
+    image TEXT
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test TEXT NOT NULL,
+    action TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    commands INTEGER
+);
+CREATE INDEX IF NOT EXISTS timings_test ON timings (test, action);
+"""
+
+
+def git_revision(directory=None):
+    """Return git revision checked out in ``directory``, or None."""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=directory,
+                stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def odoo_image():
+    """Return Odoo image under test, from ``ODOOSELENIUM_IMAGE``, or None."""
+    return os.environ.get('ODOOSELENIUM_IMAGE')
+
+
+def median(values):
+    """Return median of ``values``.
+
+    >>> median([3, 1, 2, 10])
+    2.5
+
+    """
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def mean_stdev(values):
+    """Return mean and sample standard deviation of ``values``.
+
+    >>> mean_stdev([1.0, 2.0, 3.0])
+    (2.0, 1.0)
+
+    """
+    mean = sum(values) / float(len(values))
+    if len(values) < 2:
+        return mean, 0.0
+    variance = sum((value - mean) ** 2 for value in values) / \
+        (len(values) - 1)
+    return mean, math.sqrt(variance)
+
+
+class History(object):
+    """SQLite database of runs and their timings."""
+    def __init__(self, path):
+        #: Path of SQLite database.
+        self.path = path
+        # Worker processes of runner write concurrently.
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def start_run(self, revision=None, image=None):
+        """Create run of ``revision`` on Odoo ``image``, return its ID."""
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs (created, revision, image) VALUES (?, ?, ?)',
+                (time.time(), revision, image))
+        return cursor.lastrowid
+
+    def add(self, run_id, test, seconds, action=TEST_ACTION, commands=None):
+        """Record ``seconds`` spent in ``action`` of ``test``.
+
+        ``action`` is :data:`TEST_ACTION` for the whole test.
+
+        """
+        self.add_many(run_id, [(test, action, seconds, commands)])
+
+    def add_many(self, run_id, timings):
+        """Record ``(test, action, seconds, commands)`` tuples.
+
+        None ``action`` is recorded as
+        :data:`odooselenium.instrument.OUTSIDE_ACTION`, as
+        :class:`odooselenium.instrument.CommandRecorder` names commands sent
+        outside of OdooUI methods.
+
+        """
+        rows = []
+        for test, action, seconds, commands in timings:
+            if action is None:
+                action = instrument.OUTSIDE_ACTION
+            rows.append((run_id, test, action, seconds, commands))
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO timings (run_id, test, action, seconds, commands)'
+                ' VALUES (?, ?, ?, ?, ?)', rows)
+
+    def runs(self, image=ANY_IMAGE, before=None, limit=None):
+        """Return IDs of runs, last first.
+
+        Only runs on ``image`` are returned, unless it is
+        :data:`ANY_IMAGE`. None ``image`` selects runs without image.
+
+        """
+        query = 'SELECT id FROM runs WHERE 1'
+        args = []
+        if image is not ANY_IMAGE:
+            query += ' AND image IS ?'
+            args.append(image)
+        if before is not None:
+            query += ' AND id < ?'
+            args.append(before)
+        query += ' ORDER BY id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            args.append(limit)
+        return [row[0] for row in self.connection.execute(query, args)]
+
+    def last_run(self):
+        """Return ID of last run, or None."""
+        runs = self.runs(limit=1)
+        return runs[0] if runs else None
+
+    def image(self, run_id):
+        """Return Odoo image of run.
+
+        Raise :class:`ValueError` if there is no such run.
+
+        """
+        row = self.connection.execute(
+            'SELECT image FROM runs WHERE id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise ValueError('No run {0}.'.format(run_id))
+        return row[0]
+
+    def timings(self, run_ids):
+        """Return ``{(test, action): [(seconds, commands)...]}`` of runs.
+
+        Timings of one test and action are summed by run.
+
+        """
+        if not run_ids:
+            return {}
+        rows = self.connection.execute(
+            'SELECT test, action, SUM(seconds), SUM(commands) FROM timings '
+            'WHERE run_id IN ({0}) GROUP BY run_id, test, action'.format(
+                ', '.join('?' * len(run_ids))), list(run_ids))
+        timings = {}
+        for test, action, seconds, commands in rows:
+            timings.setdefault((test, action), []).append((seconds, commands))
+        return timings
+
+    def durations(self, window=10):
+        """Return median duration of tests over last ``window`` runs."""
+        timings = self.timings(self.runs(limit=window))
+        return dict((test, median([seconds for seconds, commands in values]))
+                    for (test, action), values in timings.items()
+                    if action == TEST_ACTION)
+
+    def compare(self, run_id=None, window=10, threshold=0.2, z=3.0,
+                min_runs=3):
+        """Return regressions of ``run_id`` (last run) against baseline.
+
+        Baseline is made of the ``window`` previous runs on the same Odoo
+        image. Measures present in less than ``min_runs`` of them are
+        skipped. Return list of dictionaries with ``test``, ``action``,
+        ``metric`` (``seconds`` or ``commands``), ``baseline`` (median),
+        ``value`` and ``change`` (ratio) keys, biggest changes first.
+
+        """
+        if run_id is None:
+            run_id = self.last_run()
+        current = self.timings([run_id])
+        baseline = self.timings(self.runs(image=self.image(run_id),
+                                          before=run_id, limit=window))
+        regressions = []
+        for key, values in sorted(current.items()):
+            history = baseline.get(key, [])
+            if len(history) < min_runs:
+                continue
+            for index, metric in enumerate(('seconds', 'commands')):
+                value = values[0][index]
+                past = [item[index] for item in history
+                        if item[index] is not None]
+                if value is None or len(past) < min_runs:
+                    continue
+                reference = median(past)
+                mean, stdev = mean_stdev(past)
+                if value <= reference * (1 + threshold):
+                    continue
+                if stdev and (value - mean) / stdev < z:
+                    continue
+                regressions.append({
+                    'test': key[0], 'action': key[1], 'metric': metric,
+                    'baseline': reference, 'value': value,
+                    'change': value / reference - 1 if reference else None,
+                })
+        regressions.sort(key=lambda regression: regression['change'],
+                         reverse=True)
+        return regressions
+
+
+def report(regressions, stream=None):
+    """Write table of ``regressions`` to ``stream`` (stderr)."""
+    if stream is None:
+        stream = sys.stderr
+    if not regressions:
+        stream.write('No regression.\n')
+        return
+    line = '{0:<60} {1:<35} {2:<8} {3:>10} {4:>10} {5:>8}\n'
+    stream.write(line.format('test', 'action', 'metric', 'baseline', 'value',
+                             'change'))
+    for regression in regressions:
+        stream.write(line.format(
+            regression['test'], regression['action'] or '(test)',
+            regression['metric'], '{0:.3f}'.format(regression['baseline']),
+            '{0:.3f}'.format(regression['value']),
+            '{0:+.0%}'.format(regression['change'])
+            if regression['change'] is not None else '-'))
+
+
+_default_history = None
+_default_run = None
+
+
+def default_run(path):
+    """Return :class:`History` at ``path`` and ID of run of this process.
+
+    The run is created on first call, for current git revision and Odoo
+    image, unless ``ODOOSELENIUM_RUN`` environment variable gives its ID,
+    as :mod:`odooselenium.runner` does for its workers.
+
+    """
+    global _default_history, _default_run
+    if _default_history is None or _default_history.path != path:
+        _default_history = History(path)
+        _default_run = os.environ.get('ODOOSELENIUM_RUN')
+        if _default_run is None:
+            _default_run = _default_history.start_run(git_revision(),
+                                                      odoo_image())
+        else:
+            _default_run = int(_default_run)
+    return _default_history, _default_run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare last test run with previous ones.')
+    parser.add_argument('database', help='SQLite history database.')
+    parser.add_argument('--run', type=int, help='Run ID (default: last).')
+    parser.add_argument('--window', type=int, default=10,
+                        help='Number of previous runs in baseline.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Minimal relative increase over baseline.')
+    parser.add_argument('--z', type=float, default=3.0,
+                        help='Minimal increase, in standard deviations.')
+    args = parser.parse_args(argv)
+
+    history = History(args.database)
+    if history.last_run() is None:
+        sys.stderr.write('No run recorded.\n')
+        return 0
+    try:
+        regressions = history.compare(args.run, window=args.window,
+                                      threshold=args.threshold, z=args.z)
+    except ValueError as exception:
+        sys.stderr.write('{0}\n'.format(exception))
+        return 2
+    report(regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
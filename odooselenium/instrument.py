@@ -0,0 +1,110 @@
+"""Count WebDriver commands and their cost, by OdooUI action.
+
+:class:`CommandRecorder` wraps the command executor of a web driver. Every
+WebDriver command (one HTTP round trip to the browser driver) is attributed
+to the enclosing :class:`odooselenium.OdooUI` or ``View`` method, see
+:func:`odooselenium.audit.current_action`.
+
+.. code:: python
+
+   recorder = CommandRecorder()
+   recorder.install(webdriver)
+   ui.go_to_view('Customers')
+   recorder.report()
+   recorder.uninstall()
+
+"""
+import json
+import sys
+
+from odooselenium import audit
+from odooselenium import wait
+
+
+#: Action name for commands sent outside of OdooUI methods.
+OUTSIDE_ACTION = '(outside OdooUI)'
+
+
+def _size(data):
+    """Return size of ``data`` serialized as JSON, in bytes."""
+    try:
+        return len(json.dumps(data))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CommandRecorder(object):
+    """Record count, latency and payload size of WebDriver commands."""
+    def __init__(self):
+        #: Counters by action: dictionaries with ``commands``, ``seconds`` and
+        #: ``bytes`` (sent and received) keys.
+        self.actions = {}
+        #: Number of commands, by WebDriver command name.
+        self.commands = {}
+        self._webdriver = None
+        self._execute = None
+
+    def install(self, webdriver):
+        """Start recording commands sent by ``webdriver``."""
+        if self._webdriver is not None:
+            raise RuntimeError('Recorder is already installed')
+        executor = webdriver.command_executor
+        self._webdriver = webdriver
+        self._execute = executor.execute
+
+        def execute(command, params):
+            start = wait.clock()
+            response = self._execute(command, params)
+            self.record(audit.current_action() or OUTSIDE_ACTION, command,
+                        wait.clock() - start,
+                        _size(params) + _size(response))
+            return response
+
+        executor.execute = execute
+
+    def uninstall(self):
+        """Stop recording commands."""
+        if self._webdriver is not None:
+            self._webdriver.command_executor.execute = self._execute
+            self._webdriver = None
+            self._execute = None
+
+    def record(self, action, command, seconds, size):
+        """Add one ``command`` sent by ``action``."""
+        counters = self.actions.setdefault(
+            action, {'commands': 0, 'seconds': 0.0, 'bytes': 0})
+        counters['commands'] += 1
+        counters['seconds'] += seconds
+        counters['bytes'] += size
+        self.commands[command] = self.commands.get(command, 0) + 1
+
+    def totals(self):
+        """Return counters summed over all actions."""
+        totals = {'commands': 0, 'seconds': 0.0, 'bytes': 0}
+        for counters in self.actions.values():
+            for key in totals:
+                totals[key] += counters[key]
+        return totals
+
+    def reset(self):
+        """Forget recorded commands."""
+        self.actions.clear()
+        self.commands.clear()
+
+    def report(self, stream=None):
+        """Write table of actions, most expensive first, to ``stream``."""
+        if stream is None:
+            stream = sys.stderr
+        line = '{0:<50} {1:>8} {2:>9} {3:>10}\n'
+        stream.write(line.format('action', 'commands', 'seconds', 'bytes'))
+        for action in sorted(self.actions,
+                             key=lambda a: self.actions[a]['seconds'],
+                             reverse=True):
+            counters = self.actions[action]
+            stream.write(line.format(
+                action, counters['commands'],
+                '{0:.3f}'.format(counters['seconds']), counters['bytes']))
+        totals = self.totals()
+        stream.write(line.format(
+            'total', totals['commands'], '{0:.3f}'.format(totals['seconds']),
+            totals['bytes']))
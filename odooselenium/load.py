@@ -0,0 +1,259 @@
+"""Load Odoo with concurrent simulated users, report latency by step.
+
+A scenario is a callable ``scenario(ui, step)`` driving one
+:class:`odooselenium.OdooUI` session, with steps timed by ``step(name)``
+context managers:
+
+.. code:: python
+
+   def customers(ui, step):
+       with step('open customers'):
+           ui.go_to_view('Customers')
+       with step('search'):
+           ui.search_for('Agrolait')
+
+Users run the scenario in a loop, on concurrent browser sessions (see
+:class:`odooselenium.multi.SessionGroup`). They start evenly over the
+ramp-up period, and stop starting iterations once duration is over.
+Latency percentiles and throughput by step are reported, and can be
+exported as JSON or CSV:
+
+.. code:: sh
+
+   python -m odooselenium.load --users 20 --ramp-up 60 --duration 600 \\
+       --json load.json scenarios.py:customers
+
+"""
+import argparse
+import contextlib
+import csv
+import imp
+import importlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from odooselenium import multi
+from odooselenium import wait
+
+
+#: Step name of whole scenario iterations.
+ITERATION = '(iteration)'
+
+#: Step name of ``setup`` failures.
+SETUP = '(setup)'
+
+#: Columns of step statistics, as exported in CSV.
+STEP_COLUMNS = ('step', 'count', 'errors', 'mean', 'p50', 'p95', 'p99', 'max',
+                'throughput')
+
+
+def percentile(values, percent):
+    """Return ``percent`` percentile of sorted ``values``, by nearest rank.
+
+    >>> percentile([0.1, 0.2, 0.3, 0.4], 50)
+    0.2
+    >>> percentile([0.1, 0.2, 0.3, 0.4], 99)
+    0.4
+
+    """
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+class LoadStats(object):
+    """Latencies of steps, recorded from concurrent users."""
+    def __init__(self):
+        #: Durations of successful steps in seconds, by step name.
+        self.latencies = {}
+        #: Number of failed steps, by step name.
+        self.errors = {}
+        #: Order of first occurrence of steps.
+        self.steps = []
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds=None, error=False):
+        """Add one ``name`` step, lasting ``seconds`` or failed."""
+        with self._lock:
+            if name not in self.latencies:
+                self.steps.append(name)
+                self.latencies[name] = []
+                self.errors[name] = 0
+            if error:
+                self.errors[name] += 1
+            else:
+                self.latencies[name].append(seconds)
+
+    @contextlib.contextmanager
+    def step(self, name):
+        """Record duration of ``with`` block as ``name`` step."""
+        start = wait.clock()
+        try:
+            yield
+        except Exception:
+            self.record(name, error=True)
+            raise
+        self.record(name, wait.clock() - start)
+
+    def summary(self, elapsed):
+        """Return list of statistics by step, as dictionaries.
+
+        Keys are :data:`STEP_COLUMNS`: durations are in seconds, throughput
+        is the number of successful steps per second over ``elapsed``
+        seconds.
+
+        """
+        with self._lock:
+            steps = [(name, sorted(self.latencies[name]), self.errors[name])
+                     for name in self.steps]
+        summary = []
+        for name, latencies, errors in steps:
+            summary.append({
+                'step': name,
+                'count': len(latencies),
+                'errors': errors,
+                'mean': sum(latencies) / len(latencies) if latencies
+                else None,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': latencies[-1] if latencies else None,
+                'throughput': len(latencies) / elapsed if elapsed else None,
+            })
+        return summary
+
+    def report(self, elapsed, stream=None):
+        """Write table of step statistics to ``stream`` (stderr)."""
+        if stream is None:
+            stream = sys.stderr
+        line = '{0:<30} {1:>7} {2:>6} {3:>8} {4:>8} {5:>8} {6:>8} {7:>8}\n'
+        stream.write(line.format('step', 'count', 'errors', 'p50', 'p95',
+                                 'p99', 'max', 'per s'))
+        for stats in self.summary(elapsed):
+            stream.write(line.format(
+                stats['step'], stats['count'], stats['errors'],
+                *['{0:.3f}'.format(stats[key])
+                  if stats[key] is not None else '-'
+                  for key in ('p50', 'p95', 'p99', 'max', 'throughput')]))
+
+    def to_json(self, stream, elapsed, **metadata):
+        """Write statistics and ``metadata``, e.g. users, as JSON."""
+        data = dict(metadata, elapsed=elapsed, steps=self.summary(elapsed))
+        json.dump(data, stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+    def to_csv(self, stream, elapsed):
+        """Write statistics as CSV, one line per step."""
+        writer = csv.DictWriter(stream, STEP_COLUMNS)
+        writer.writerow(dict((column, column) for column in STEP_COLUMNS))
+        for stats in self.summary(elapsed):
+            writer.writerow(stats)
+
+
+def _run_user(ui, index, scenario, stats, users, ramp_up, start, end,
+              setup):
+    """Run iterations of ``scenario`` on ``ui`` until ``end``."""
+    delay = start + ramp_up * index / float(users) - wait.clock()
+    if delay > 0:
+        time.sleep(delay)
+    if setup is not None:
+        try:
+            setup(ui)
+        except Exception:
+            stats.record(SETUP, error=True)
+            return
+    while wait.clock() < end:
+        try:
+            with stats.step(ITERATION):
+                scenario(ui, stats.step)
+        except Exception:  # Recorded, next iteration starts afresh.
+            pass
+
+
+def run_load(scenario, users=1, duration=60, ramp_up=0, setup=None,
+             stats=None, **group_options):
+    """Run ``scenario`` with ``users`` concurrent sessions.
+
+    Users start evenly over ``ramp_up`` seconds once browsers are started,
+    call ``setup(ui)`` if given (e.g. to log in), then loop over
+    ``scenario(ui, step)`` until ``duration`` seconds after the first user
+    started. ``group_options`` are passed to
+    :class:`odooselenium.multi.SessionGroup`.
+
+    Return ``(stats, elapsed)``: :class:`LoadStats` and seconds from first
+    start to last iteration end.
+
+    """
+    if stats is None:
+        stats = LoadStats()
+    with multi.SessionGroup(users, **group_options) as group:
+        start = wait.clock()
+        end = start + duration
+        pending = [group.submit(index, _run_user, index, scenario, stats,
+                                users, ramp_up, start, end, setup)
+                   for index in range(users)]
+        for result in pending:
+            result.get()
+        elapsed = wait.clock() - start
+    return stats, elapsed
+
+
+def load_scenario(name):
+    """Return callable from ``module:function`` or ``path.py:function``."""
+    module_name, function_name = name.rsplit(':', 1)
+    if os.path.isfile(module_name):
+        module = imp.load_source(
+            os.path.splitext(os.path.basename(module_name))[0], module_name)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Load Odoo with concurrent users running a scenario.')
+    parser.add_argument('scenario',
+                        help='Scenario as module:function or file:function.')
+    parser.add_argument('--users', '-u', type=int, default=10)
+    parser.add_argument('--ramp-up', type=float, default=0,
+                        help='Seconds over which users start.')
+    parser.add_argument('--duration', '-d', type=float, default=60,
+                        help='Seconds during which iterations start.')
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--dbname', default='test')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--browser', help='Browser profile.')
+    parser.add_argument('--keep-alive', action='store_true',
+                        help='Reuse connections to browser drivers.')
+    parser.add_argument('--json', help='Write statistics to JSON file.')
+    parser.add_argument('--csv', help='Write statistics to CSV file.')
+    args = parser.parse_args(argv)
+
+    stats, elapsed = run_load(
+        load_scenario(args.scenario), users=args.users,
+        duration=args.duration, ramp_up=args.ramp_up,
+        # One Odoo session per user, as with real users.
+        setup=lambda ui: ui.rpc_login(args.username, args.password,
+                                      args.dbname, cache=False),
+        base_url=args.url, browser=args.browser, keep_alive=args.keep_alive)
+    sys.stderr.write('{0} users, {1:.1f}s:\n'.format(args.users, elapsed))
+    stats.report(elapsed)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            stats.to_json(json_file, elapsed, users=args.users,
+                          ramp_up=args.ramp_up, duration=args.duration,
+                          scenario=args.scenario)
+    if args.csv:
+        with open(args.csv, 'wb') as csv_file:
+            stats.to_csv(csv_file, elapsed)
+    return 1 if any(stats.errors.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Index of Odoo menus, to navigate without walking the menu bar.
+
+The index maps "Module" and "Module/Path/To/View" to menu and action IDs. It
+is built from ``ir.ui.menu`` tree, fetched by one script executed in the
+browser (so that it uses the browser's session and the user's access rights),
+and cached per Odoo URL, database and user.
+
+"""
+
+#: Asynchronous JavaScript calling back with ``ir.ui.menu`` tree, as loaded
+#: by web client from ``/web/menu/load``.
+MENU_LOAD_SCRIPT = """
+var callback = arguments[arguments.length - 1];
+var xhr = new XMLHttpRequest();
+xhr.open('POST', '/web/menu/load');
+xhr.setRequestHeader('Content-Type', 'application/json');
+xhr.onload = function () {
+    try {
+        callback(JSON.parse(xhr.responseText).result || null);
+    } catch (e) {
+        callback(null);
+    }
+};
+xhr.onerror = function () {
+    callback(null);
+};
+xhr.send(JSON.stringify({jsonrpc: '2.0', method: 'call', params: {}}));
+"""
+
+#: Cache of :class:`MenuIndex` instances, by ``(url, dbname, username)``.
+_indexes = {}
+
+
+def _action_id(menu):
+    """Return ID of ``menu``'s action, or of its first descendant's action.
+
+    That is the action web client opens when one clicks the menu.
+
+    """
+    if menu.get('action'):
+        return int(menu['action'].split(',')[1])
+    for child in menu.get('children', []):
+        action_id = _action_id(child)
+        if action_id is not None:
+            return action_id
+    return None
+
+
+class MenuIndex(object):
+    """Menu and action IDs of modules and views, by name."""
+    def __init__(self, tree):
+        #: Entries of top-level menus, by name.
+        self.modules = {}
+        #: Entries of sub-menus, by ``Module/Path/To/View``.
+        self.views = {}
+        for module in tree.get('children', []):
+            self.modules[module['name']] = self._entry(module)
+            for section in module.get('children', []):
+                self._add(module['name'], section, [])
+
+    def _entry(self, menu):
+        return {'menu_id': menu['id'], 'action_id': _action_id(menu)}
+
+    def _add(self, module, menu, parents):
+        path = parents + [menu['name']]
+        entry = self._entry(menu)
+        self.views['/'.join([module] + path)] = entry
+        if parents:
+            # Also index path without section, as OdooUI.go_to_view expects.
+            self.views.setdefault('/'.join([module] + path[1:]), entry)
+        for child in menu.get('children', []):
+            self._add(module, child, path)
+
+    def find_module(self, module_name):
+        """Return entry of top-level menu ``module_name``."""
+        try:
+            return self.modules[module_name]
+        except KeyError:
+            raise AssertionError("Couldn't find module menu '{}' in '{}'"
+                                 .format(module_name, sorted(self.modules)))
+
+    def find_view(self, view_name, module_name=None):
+        """Return entry of sub-menu ``view_name``.
+
+        If ``module_name`` is None, ``view_name`` must be unique across
+        modules.
+
+        """
+        if module_name is not None:
+            key = u'{}/{}'.format(module_name, view_name)
+            if key in self.views:
+                return self.views[key]
+            candidates = []
+        else:
+            suffix = u'/{}'.format(view_name)
+            candidates = [key for key in self.views if key.endswith(suffix)]
+            entries = set(self.views[key]['menu_id'] for key in candidates)
+            if len(entries) == 1:
+                return self.views[candidates[0]]
+        raise AssertionError("Couldn't find exactly one view menu '{}' in "
+                             "'{}': {}".format(view_name, module_name,
+                                               candidates))
+
+    @staticmethod
+    def fragment(entry):
+        """Return URL fragment opening ``entry``'s menu and action."""
+        fragment = 'menu_id={}'.format(entry['menu_id'])
+        if entry['action_id'] is not None:
+            fragment += '&action={}'.format(entry['action_id'])
+        return fragment
+
+
+def get_index(webdriver, key):
+    """Return :class:`MenuIndex` for ``key``, loading it with ``webdriver``.
+
+    ``key`` is typically ``(url, dbname, username)``.
+
+    """
+    index = _indexes.get(key)
+    if index is None:
+        tree = webdriver.execute_async_script(MENU_LOAD_SCRIPT)
+        if not tree:
+            raise RuntimeError("Couldn't load menus from Odoo")
+        index = _indexes[key] = MenuIndex(tree)
+    return index
+
+
+def invalidate(url, dbname):
+    """Forget indexes of database ``dbname``, e.g. after module install."""
+    for key in list(_indexes):
+        if key[:2] == (url, dbname):
+            del _indexes[key]
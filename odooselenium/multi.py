@@ -0,0 +1,141 @@
+"""Drive many OdooUI sessions concurrently from one process.
+
+Each :class:`odooselenium.OdooUI` call mostly waits for HTTP round trips to
+the browser driver, during which Python releases the GIL. A
+:class:`SessionGroup` runs one thread per browser session, so that dozens of
+sessions interleave in one process, while calls on one session never
+overlap.
+
+.. code:: python
+
+   with SessionGroup(10, browser='chrome-lean') as group:
+       group.map(lambda ui: ui.login('admin', 'admin', 'test', use_rpc=True))
+       group.call('go_to_module', 'Sales')
+       rows = group.call('get_rows_from_list', in_page=True)
+
+Waits of :mod:`odooselenium.wait` keep their deadlines per thread, so
+sessions do not interfere.
+
+"""
+from multiprocessing.pool import ThreadPool
+
+from odooselenium import browsers
+from odooselenium.ui import OdooUI
+
+
+class SessionGroup(object):
+    """Fixed number of OdooUI sessions, each driven by its own thread.
+
+    ``factory(index)`` returns the :class:`OdooUI` of session ``index``. By
+    default, it starts a browser with ``browser`` profile (see
+    :mod:`odooselenium.browsers`) and passes ``ui_options`` to OdooUI.
+
+    """
+    def __init__(self, size, factory=None, base_url='http://localhost:8069',
+                 browser=None, **ui_options):
+        #: Number of sessions.
+        self.size = size
+        #: Base URL of Odoo web service.
+        self.base_url = base_url
+        #: Name of browser profile used by default factory.
+        self.browser = browser
+        #: Keyword arguments of OdooUI, used by default factory.
+        self.ui_options = ui_options
+        #: :class:`OdooUI` instances, once started.
+        self.sessions = []
+        self._factory = factory or self._new_ui
+        # One single thread pool by session, so that calls on one session
+        # never overlap.
+        self._pools = None
+
+    def _new_ui(self, index):
+        return OdooUI(browsers.new_webdriver(self.browser),
+                      base_url=self.base_url, **self.ui_options)
+
+    def start(self):
+        """Start sessions concurrently.
+
+        If some sessions fail to start, quit the others and raise the first
+        error.
+
+        """
+        self._pools = [ThreadPool(1) for index in range(self.size)]
+        pending = [pool.apply_async(self._factory, (index,))
+                   for index, pool in enumerate(self._pools)]
+        errors = []
+        for result in pending:
+            try:
+                self.sessions.append(result.get())
+            except Exception as error:
+                errors.append(error)
+        if errors:
+            self.close()
+            raise errors[0]
+
+    def close(self):
+        """Quit browsers concurrently, stop threads."""
+        if self._pools is None:
+            return
+        pending = [pool.apply_async(self._quit, (ui,))
+                   for pool, ui in zip(self._pools, self.sessions)]
+        for result in pending:
+            result.wait()
+        for pool in self._pools:
+            pool.close()
+            pool.join()
+        self._pools = None
+        self.sessions = []
+
+    @staticmethod
+    def _quit(ui):
+        try:
+            ui.webdriver.quit()
+        except Exception:  # Browser may already be gone.
+            pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, index, function, *args, **kwargs):
+        """Run ``function(ui, *args, **kwargs)`` on session ``index``.
+
+        Calls on one session run one after the other, in order of
+        submission. Return ``multiprocessing.pool.AsyncResult``: call its
+        ``get()`` to wait for the result.
+
+        """
+        return self._pools[index].apply_async(
+            function, (self.sessions[index],) + args, kwargs)
+
+    def map(self, function, *args, **kwargs):
+        """Run ``function(ui, *args, **kwargs)`` on all sessions at once.
+
+        Return list of results, in order of sessions. If ``function`` raised
+        in some sessions, wait for all of them then raise the first error,
+        unless ``return_exceptions=True`` is given: then exceptions are
+        returned in place of results.
+
+        """
+        return_exceptions = kwargs.pop('return_exceptions', False)
+        pending = [self.submit(index, function, *args, **kwargs)
+                   for index in range(len(self.sessions))]
+        results = []
+        for result in pending:
+            try:
+                results.append(result.get())
+            except Exception as error:
+                results.append(error)
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def call(self, method, *args, **kwargs):
+        """Call OdooUI ``method`` on all sessions at once, see :meth:`map`."""
+        return self.map(lambda ui, *a, **kw: getattr(ui, method)(*a, **kw),
+                        *args, **kwargs)
@@ -0,0 +1,96 @@
+"""Process-wide pool of browser sessions, shared by test cases."""
+import atexit
+import sys
+
+
+class SessionPool(object):
+    """Reuse web drivers instead of starting one browser per test.
+
+    Idle sessions are stored by key, typically ``(url, dbname, username)``,
+    so that a session logged in some database is only handed to tests using
+    the same database and user.
+
+    """
+    def __init__(self):
+        #: Idle web drivers, by key.
+        self.idle = {}
+        #: Number of sessions reused.
+        self.hits = 0
+        #: Number of sessions created.
+        self.misses = 0
+        #: Number of reused sessions which had to log in again.
+        self.relogins = 0
+        #: Number of sessions found dead when reused, and created again.
+        self.replaced = 0
+
+    def acquire(self, key, factory):
+        """Return ``(webdriver, reused)`` tuple for ``key``.
+
+        If there is no idle session for ``key``, ``factory()`` is called to
+        create a new web driver.
+
+        """
+        drivers = self.idle.get(key)
+        if drivers:
+            self.hits += 1
+            return drivers.pop(), True
+        self.misses += 1
+        return factory(), False
+
+    def replace(self, webdriver, factory):
+        """Quit dead ``webdriver`` just acquired, return ``factory()``.
+
+        The session was counted as a hit: it is counted as a miss instead.
+
+        """
+        try:
+            webdriver.quit()
+        except Exception:  # Browser is gone.
+            pass
+        self.hits -= 1
+        self.misses += 1
+        self.replaced += 1
+        return factory()
+
+    def release(self, key, webdriver):
+        """Give ``webdriver`` back to the pool."""
+        self.idle.setdefault(key, []).append(webdriver)
+
+    def close(self):
+        """Quit all idle web drivers."""
+        for drivers in self.idle.values():
+            for webdriver in drivers:
+                try:
+                    webdriver.quit()
+                except Exception:  # Browser may already be gone.
+                    pass
+        self.idle.clear()
+
+    def stats(self):
+        """Return dictionary of pool counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'relogins': self.relogins,
+            'replaced': self.replaced,
+        }
+
+    def report(self, stream=None):
+        """Write counters to ``stream`` (defaults to stderr)."""
+        if stream is None:
+            stream = sys.stderr
+        stream.write(
+            'odooselenium session pool: {hits} hits, {misses} misses '
+            '({replaced} dead sessions replaced), {relogins} re-logins\n'
+            .format(**self.stats()))
+
+
+#: Default pool, used by :class:`odooselenium.TestCase`.
+default_pool = SessionPool()
+
+
+@atexit.register
+def _close_default_pool():
+    if default_pool.hits or default_pool.misses:
+        default_pool.report()
+    default_pool.close()
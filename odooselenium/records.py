@@ -0,0 +1,60 @@
+"""Test data created over JSON-RPC, deleted once test is over.
+
+Tests should drive the user interface for the step under test only.
+Prerequisite records are created with :class:`RecordFixtures`, which tracks
+their IDs and deletes them with one ``unlink`` per model.
+
+.. code:: python
+
+   records = RecordFixtures(rpc.authenticated_session(
+       'http://localhost:8069', 'test', 'admin', 'admin'))
+   partner_ids = records.create('res.partner', [{'name': 'Agrolait'},
+                                                {'name': 'Camptocamp'}])
+   ...
+   records.unlink_all()
+
+"""
+import collections
+
+
+class RecordFixtures(object):
+    """Create records with :class:`odooselenium.rpc.Session`, track them."""
+    def __init__(self, session):
+        #: Logged in :class:`odooselenium.rpc.Session`.
+        self.session = session
+        #: IDs of created records, by model, in order of first creation.
+        self.created = collections.OrderedDict()
+
+    def create(self, model, values_list):
+        """Create one ``model`` record per dictionary, return their IDs.
+
+        Odoo 8 ``create()`` takes one record: calls are sent one after the
+        other on the same session.
+
+        """
+        ids = self.created.setdefault(model, [])
+        new_ids = []
+        for values in values_list:
+            record_id = self.session.execute_kw(model, 'create', [values])
+            ids.append(record_id)
+            new_ids.append(record_id)
+        return new_ids
+
+    def ref(self, xml_id):
+        """Return database ID of record with external ID ``xml_id``."""
+        return self.session.execute_kw('ir.model.data', 'xmlid_to_res_id',
+                                       [xml_id], {'raise_if_not_found': True})
+
+    def unlink_all(self):
+        """Delete created records, last created models first.
+
+        Records already deleted, e.g. by the test, are skipped.
+
+        """
+        while self.created:
+            model, ids = self.created.popitem()
+            existing = self.session.execute_kw(
+                model, 'search', [[('id', 'in', ids)]],
+                {'context': {'active_test': False}})
+            if existing:
+                self.session.execute_kw(model, 'unlink', [existing])
@@ -0,0 +1,152 @@
+"""Minimal JSON-RPC client for Odoo web controllers.
+
+Used to prepare browser sessions (see :meth:`odooselenium.OdooUI.login`)
+without driving the user interface.
+
+"""
+import Cookie
+import httplib
+import itertools
+import json
+import socket
+import threading
+import time
+import urllib2
+
+from odooselenium import wait
+
+
+#: Cache of authenticated sessions, by ``(url, dbname, login)``.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class RPCError(Exception):
+    """Error returned by Odoo JSON-RPC endpoint."""
+
+
+class Session(object):
+    """HTTP session on Odoo web controllers, identified by ``session_id``."""
+    def __init__(self, base_url='http://localhost:8069', session_id=None,
+                 timeout=60):
+        #: Base URL of Odoo web service.
+        self.base_url = base_url.rstrip('/')
+        #: Value of ``session_id`` cookie, set by Odoo.
+        self.session_id = session_id
+        #: Timeout of HTTP requests, in seconds.
+        self.timeout = timeout
+        #: Odoo user ID, once authenticated.
+        self.uid = None
+        self._ids = itertools.count(1)
+
+    def call(self, path, params=None):
+        """Call JSON route ``path`` with ``params``, return result."""
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': params or {},
+            'id': next(self._ids),
+        }
+        request = urllib2.Request(
+            '{0}/{1}'.format(self.base_url, path.lstrip('/')),
+            json.dumps(payload),
+            {'Content-Type': 'application/json'})
+        if self.session_id:
+            request.add_header(
+                'Cookie', 'session_id={0}'.format(self.session_id))
+        response = urllib2.urlopen(request, timeout=self.timeout)
+        for header in response.info().getheaders('Set-Cookie'):
+            cookie = Cookie.SimpleCookie(header)
+            if 'session_id' in cookie:
+                self.session_id = cookie['session_id'].value
+        body = json.load(response)
+        if body.get('error'):
+            error = body['error']
+            message = error.get('data', {}).get('message') or \
+                error.get('message')
+            raise RPCError(message)
+        return body.get('result')
+
+    def service(self, service, method, *args):
+        """Call ``method`` of Odoo RPC ``service`` (db, common, object)."""
+        return self.call('jsonrpc', {
+            'service': service,
+            'method': method,
+            'args': args,
+        })
+
+    def authenticate(self, dbname, login, password):
+        """Log in ``dbname``, return user ID or raise :class:`RPCError`."""
+        result = self.call('web/session/authenticate', {
+            'db': dbname,
+            'login': login,
+            'password': password,
+            'base_location': self.base_url,
+        })
+        self.uid = result and result.get('uid')
+        if not self.uid:
+            raise RPCError(
+                'Authentication failed for {0} in {1}'.format(login, dbname))
+        return self.uid
+
+    def is_valid(self):
+        """Return True if session is still logged in Odoo."""
+        try:
+            result = self.call('web/session/get_session_info')
+        except (RPCError, urllib2.URLError):
+            return False
+        return bool(result and result.get('uid'))
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        """Call ``method`` of ``model``, the way web client does."""
+        return self.call('web/dataset/call_kw', {
+            'model': model,
+            'method': method,
+            'args': args or [],
+            'kwargs': kwargs or {},
+        })
+
+
+def authenticated_session(base_url, dbname, login, password):
+    """Return logged in :class:`Session`, reusing cached one if still valid.
+
+    Callers share the cached session, hence its ``session_id``: start a new
+    :class:`Session` for each simulated user instead.
+
+    """
+    key = (base_url.rstrip('/'), dbname, login)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or not session.is_valid():
+            session = Session(base_url)
+            session.authenticate(dbname, login, password)
+            _sessions[key] = session
+    return session
+
+
+def wait_for_server(base_url='http://localhost:8069', timeout=60,
+                    interval=0.1, max_interval=2):
+    """Wait until Odoo answers JSON-RPC requests, return seconds waited.
+
+    Polls ``/web/webclient/version_info``, sleeping ``interval`` seconds
+    between attempts then 1.5 times longer each time, up to ``max_interval``.
+    Raise RuntimeError after ``timeout`` seconds.
+
+    """
+    start = wait.clock()
+    limit = start + timeout
+    while True:
+        session = Session(base_url, timeout=max_interval * 5)
+        try:
+            session.call('web/webclient/version_info')
+        except (urllib2.URLError, httplib.HTTPException, socket.error,
+                ValueError, RPCError):
+            pass
+        else:
+            return wait.clock() - start
+        remaining = limit - wait.clock()
+        if remaining <= 0:
+            raise RuntimeError('Odoo did not answer at {0} within {1}s'
+                               .format(base_url, timeout))
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 1.5, max_interval)
@@ -0,0 +1,152 @@
+"""Time JSON-RPC calls of the web client, by OdooUI action.
+
+A hook around jQuery AJAX requests of the page records model, method,
+request and response sizes and round-trip time of each JSON-RPC call.
+:meth:`odooselenium.OdooUI.wait_for_ajax_load` collects them at the end of
+each wait, and :class:`RpcTrace` attributes them to the enclosing
+:class:`odooselenium.OdooUI` or ``View`` method (see
+:func:`odooselenium.audit.current_action`). Time of each action is split
+between server time (at least one call pending) and client time (the rest:
+WebDriver commands, rendering).
+
+.. code:: python
+
+   ui = OdooUI(webdriver, trace_rpc=True)
+   ui.go_to_view('Customers')
+   ui.rpc_trace.report()
+
+Calls sent outside of ``wait_for_ajax_load`` blocks are attributed to the
+next action which waits. Calls sent before a full page load are lost.
+
+"""
+import sys
+
+
+#: JavaScript installing ``window.odooseleniumRpc`` in the page, once.
+#: Completed calls are appended to ``window.odooseleniumRpc.calls``, with
+#: times in milliseconds since navigation start. Long-polling is ignored.
+RPC_TRACKER_SCRIPT = """
+if (!window.odooseleniumRpc) {
+    var trace = window.odooseleniumRpc = {calls: []};
+    if (window.jQuery) {
+        jQuery(document).ajaxSend(function (event, xhr, settings) {
+            var url = settings.url || '';
+            if (url.indexOf('/longpolling/') !== -1) {
+                return;
+            }
+            var data = typeof settings.data === 'string' ? settings.data : '';
+            var params = {};
+            try {
+                params = JSON.parse(data).params || {};
+            } catch (error) {}
+            xhr.odooseleniumRpc = {
+                url: url.split('?')[0],
+                model: params.model || null,
+                method: params.method || url.split('?')[0].split('/').pop(),
+                request_bytes: data.length,
+                start: window.performance.now()
+            };
+        }).ajaxComplete(function (event, xhr) {
+            var call = xhr.odooseleniumRpc;
+            if (call) {
+                delete xhr.odooseleniumRpc;
+                call.end = window.performance.now();
+                call.response_bytes = (xhr.responseText || '').length;
+                call.status = xhr.status;
+                trace.calls.push(call);
+            }
+        });
+    }
+}
+"""
+
+#: JavaScript returning calls completed since last collection, and
+#: forgetting them.
+COLLECT_RPC_SCRIPT = """
+var trace = window.odooseleniumRpc;
+return trace ? trace.calls.splice(0, trace.calls.length) : [];
+"""
+
+
+def server_time(calls):
+    """Return seconds during which at least one of ``calls`` was pending.
+
+    Calls have ``start`` and ``end`` times, in milliseconds.
+
+    >>> server_time([{'start': 0, 'end': 100}, {'start': 50, 'end': 150},
+    ...              {'start': 300, 'end': 400}])
+    0.25
+
+    """
+    total = 0.0
+    current_start = current_end = None
+    for call in sorted(calls, key=lambda call: call['start']):
+        if current_end is None or call['start'] > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = call['start'], call['end']
+        else:
+            current_end = max(current_end, call['end'])
+    if current_end is not None:
+        total += current_end - current_start
+    return total / 1000.0
+
+
+class RpcTrace(object):
+    """JSON-RPC calls of the web client, and time split by action."""
+    def __init__(self):
+        #: Calls, as collected from page, with ``action`` and ``duration``
+        #: (seconds) keys added.
+        self.calls = []
+        #: Counters by action: dictionaries with ``calls``, ``seconds``,
+        #: ``server``, ``client`` (seconds) and ``bytes`` keys.
+        self.actions = {}
+
+    def record(self, action, calls, seconds):
+        """Add ``calls`` sent during ``seconds`` spent in ``action``."""
+        for call in calls:
+            call['action'] = action
+            call['duration'] = (call['end'] - call['start']) / 1000.0
+        self.calls.extend(calls)
+        counters = self.actions.setdefault(action, {
+            'calls': 0, 'seconds': 0.0, 'server': 0.0, 'client': 0.0,
+            'bytes': 0})
+        server = min(server_time(calls), seconds)
+        counters['calls'] += len(calls)
+        counters['seconds'] += seconds
+        counters['server'] += server
+        counters['client'] += seconds - server
+        counters['bytes'] += sum(call['request_bytes'] +
+                                 call['response_bytes'] for call in calls)
+
+    def methods(self):
+        """Return number of calls and seconds, by ``(model, method)``."""
+        methods = {}
+        for call in self.calls:
+            counters = methods.setdefault((call['model'], call['method']),
+                                          {'calls': 0, 'seconds': 0.0})
+            counters['calls'] += 1
+            counters['seconds'] += call['duration']
+        return methods
+
+    def reset(self):
+        """Forget recorded calls."""
+        del self.calls[:]
+        self.actions.clear()
+
+    def report(self, stream=None):
+        """Write table of actions, most expensive first, to ``stream``."""
+        if stream is None:
+            stream = sys.stderr
+        line = '{0:<50} {1:>6} {2:>9} {3:>9} {4:>9} {5:>10}\n'
+        stream.write(line.format('action', 'calls', 'seconds', 'server',
+                                 'client', 'bytes'))
+        for action in sorted(self.actions,
+                             key=lambda a: self.actions[a]['seconds'],
+                             reverse=True):
+            counters = self.actions[action]
+            stream.write(line.format(
+                str(action), counters['calls'],
+                *['{0:.3f}'.format(counters[key])
+                  for key in ('seconds', 'server', 'client')] +
+                [counters['bytes']]))
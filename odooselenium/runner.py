@@ -0,0 +1,350 @@
+"""Run test suites in parallel worker processes, one Odoo database each.
+
+Tests based on :class:`odooselenium.TestCase` share one database by default,
+so they cannot run concurrently. This runner shards tests across worker
+processes. Each worker duplicates a template database, such as the one
+``init_odoo.odoo_setup()`` prepares, and exposes it to tests through
+``ODOOSELENIUM_DBNAME`` environment variable. Since each worker is a process,
+it also gets its own browser. Results and timings are collected centrally.
+
+Tests are balanced across workers, longest first, using their durations in
+performance history (see :mod:`odooselenium.history`) or static estimates
+(see :func:`expected_duration`). Predicted and actual durations of workers
+are reported.
+
+.. code:: sh
+
+   python -m odooselenium.runner --workers 4 --history perf.sqlite \
+       tests/res_partner_bank.py
+
+"""
+import argparse
+import heapq
+import imp
+import multiprocessing
+import os
+import Queue
+import sys
+import time
+import traceback
+import unittest
+
+from odooselenium import history
+from odooselenium import rpc
+
+
+#: Estimated duration of tests without history nor ``expected_duration``,
+#: in seconds.
+DEFAULT_ESTIMATE = 30.0
+
+
+class _QueueResult(unittest.TestResult):
+    """Send outcome and duration of each test to parent process."""
+    def __init__(self, queue, worker):
+        super(_QueueResult, self).__init__()
+        self.queue = queue
+        self.worker = worker
+        self._start = None
+
+    def startTest(self, test):
+        super(_QueueResult, self).startTest(test)
+        self._start = time.time()
+
+    def _put(self, test, outcome, details=''):
+        duration = time.time() - self._start if self._start else 0.0
+        self._start = None
+        self.queue.put({
+            'id': test.id(),
+            'worker': self.worker,
+            'outcome': outcome,
+            'duration': duration,
+            'details': details,
+        })
+
+    def addSuccess(self, test):
+        self._put(test, 'ok')
+
+    def addFailure(self, test, err):
+        self._put(test, 'FAIL', self._exc_info_to_string(err, test))
+
+    def addError(self, test, err):
+        self._put(test, 'ERROR', self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        self._put(test, 'skip', reason)
+
+    def addExpectedFailure(self, test, err):
+        self._put(test, 'expected failure')
+
+    def addUnexpectedSuccess(self, test):
+        self._put(test, 'FAIL', 'Unexpected success')
+
+
+def iter_tests(suite):
+    """Yield test cases of (nested) ``suite``."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for subtest in iter_tests(test):
+                yield subtest
+        else:
+            yield test
+
+
+def load_tests(names):
+    """Return suite of tests from file paths or dotted names."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for name in names:
+        if os.path.isfile(name):
+            directory, filename = os.path.split(os.path.abspath(name))
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+            module_name = os.path.splitext(filename)[0]
+            module = imp.load_source(module_name, name)
+            sys.modules[module_name] = module
+            suite.addTest(loader.loadTestsFromModule(module))
+        else:
+            suite.addTest(loader.loadTestsFromName(name))
+    return suite
+
+
+def expected_duration(seconds):
+    """Decorate test method with static estimate of its duration.
+
+    Estimate is used by :func:`estimate_durations` until the test has
+    recorded durations. Test classes can set an ``expected_duration``
+    attribute too.
+
+    """
+    def decorate(function):
+        function.expected_duration = seconds
+        return function
+    return decorate
+
+
+def estimate_durations(tests, durations=None, default=DEFAULT_ESTIMATE):
+    """Return estimated duration of ``tests`` in seconds, by test.
+
+    Estimates are ``durations`` by test ID, e.g. from
+    :meth:`odooselenium.history.History.durations`, else ``expected_duration``
+    of test method or class, else ``default``.
+
+    """
+    durations = durations or {}
+    estimates = {}
+    for test in tests:
+        method = getattr(test, test._testMethodName, None)
+        estimate = durations.get(test.id())
+        if estimate is None:
+            estimate = getattr(method, 'expected_duration', None)
+        if estimate is None:
+            estimate = getattr(test, 'expected_duration', default)
+        estimates[test] = estimate
+    return estimates
+
+
+def schedule(tests, workers, estimates):
+    """Return ``workers`` lists of tests and their estimated durations.
+
+    Longest tests are assigned first, each to the least loaded worker, so
+    that workers finish at about the same time. ``estimates`` are durations
+    by test.
+
+    >>> schedule(['a', 'b', 'c', 'd', 'e'], 2,
+    ...          {'a': 2, 'b': 7, 'c': 4, 'd': 5, 'e': 3})
+    ([['b', 'e'], ['d', 'c', 'a']], [10, 11])
+
+    """
+    shards = [[] for i in range(workers)]
+    loads = [0] * workers
+    heap = [(0, worker) for worker in range(workers)]
+    for test in sorted(tests, key=lambda test: -estimates[test]):
+        load, worker = heapq.heappop(heap)
+        shards[worker].append(test)
+        loads[worker] = load + estimates[test]
+        heapq.heappush(heap, (loads[worker], worker))
+    return shards, loads
+
+
+def worker_dbname(template, worker):
+    """Return name of database dedicated to ``worker``."""
+    return '{0}_worker{1}'.format(template, worker)
+
+
+def setup_database(url, master_password, template, dbname):
+    """Duplicate ``template`` database as ``dbname``, replacing it."""
+    session = rpc.Session(url)
+    if dbname in session.service('db', 'list'):
+        session.service('db', 'drop', master_password, dbname)
+    session.service('db', 'duplicate_database', master_password, template,
+                    dbname)
+
+
+def drop_database(url, master_password, dbname):
+    """Drop ``dbname`` database."""
+    rpc.Session(url).service('db', 'drop', master_password, dbname)
+
+
+def _run_worker(worker, tests, queue, url, template, master_password,
+                keep_databases, history_path=None, run_id=None):
+    """Run ``tests`` in current process, with dedicated database.
+
+    If ``history_path`` is set, tests record their timings in run
+    ``run_id`` of this history database.
+
+    """
+    result = _QueueResult(queue, worker)
+    if history_path:
+        os.environ['ODOOSELENIUM_HISTORY'] = history_path
+        os.environ['ODOOSELENIUM_RUN'] = str(run_id)
+    dbname = None
+    if template:
+        dbname = worker_dbname(template, worker)
+        try:
+            setup_database(url, master_password, template, dbname)
+        except Exception:
+            details = traceback.format_exc()
+            for test in tests:
+                queue.put({'id': test.id(), 'worker': worker,
+                           'outcome': 'ERROR', 'duration': 0.0,
+                           'details': details})
+            return
+        os.environ['ODOOSELENIUM_DBNAME'] = dbname
+    try:
+        unittest.TestSuite(tests).run(result)
+    finally:
+        if dbname and not keep_databases:
+            drop_database(url, master_password, dbname)
+
+
+def run_parallel(suite, workers=2, url='http://localhost:8069',
+                 template='test', master_password='admin',
+                 keep_databases=False, stream=None, history_path=None):
+    """Run ``suite`` in ``workers`` processes, return list of results.
+
+    Each result is a dictionary with ``id``, ``worker``, ``outcome``
+    (``ok``, ``FAIL``, ``ERROR``...), ``duration`` (seconds) and ``details``.
+    If ``template`` is None, workers use the database configured in tests.
+    If ``history_path`` is set, tests of all workers record their timings
+    in one run of :class:`odooselenium.history.History` at this path.
+
+    Tests are scheduled longest first on workers (see :func:`schedule`),
+    using durations of previous runs in history, or static estimates (see
+    :func:`estimate_durations`).
+
+    """
+    if stream is None:
+        stream = sys.stderr
+    durations = None
+    run_id = None
+    if history_path:
+        database = history.History(history_path)
+        durations = database.durations()
+        run_id = database.start_run(history.git_revision(),
+                                    history.odoo_image())
+        database.close()
+    tests = list(iter_tests(suite))
+    shards, loads = schedule(tests, workers,
+                             estimate_durations(tests, durations))
+    # Workers without tests come last.
+    predicted = [load for load, tests_shard in zip(loads, shards)
+                 if tests_shard]
+    shards = [tests_shard for tests_shard in shards if tests_shard]
+    queue = multiprocessing.Queue()
+    processes = []
+    start = time.time()
+    for worker, tests_shard in enumerate(shards):
+        process = multiprocessing.Process(
+            target=_run_worker,
+            args=(worker, tests_shard, queue, url, template, master_password,
+                  keep_databases, history_path, run_id))
+        process.start()
+        processes.append(process)
+
+    results = []
+    while len(results) < len(tests):
+        try:
+            result = queue.get(timeout=1)
+        except Queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        results.append(result)
+        stream.write('[w{worker}] {duration:7.2f}s {outcome:<5} {id}\n'
+                     .format(**result))
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+    done = set(result['id'] for result in results)
+    for test in tests:
+        if test.id() not in done:
+            results.append({'id': test.id(), 'worker': None,
+                            'outcome': 'ERROR', 'duration': 0.0,
+                            'details': 'Worker exited before running test.'})
+
+    report(results, elapsed, len(processes), stream, predicted)
+    return results
+
+
+def report(results, elapsed, workers, stream, predicted=None):
+    """Write failures and timing summary of ``results`` to ``stream``.
+
+    ``predicted`` are estimated durations of workers, compared with actual
+    ones.
+
+    """
+    for result in results:
+        if result['outcome'] in ('FAIL', 'ERROR'):
+            stream.write('=' * 70 + '\n')
+            stream.write('{outcome}: {id}\n'.format(**result))
+            stream.write('-' * 70 + '\n')
+            stream.write(result['details'] + '\n')
+    busy = {}
+    for result in results:
+        busy[result['worker']] = busy.get(result['worker'], 0.0) + \
+            result['duration']
+    stream.write('-' * 70 + '\n')
+    stream.write('Ran {0} tests in {1:.2f}s on {2} workers '
+                 '(sum of test durations: {3:.2f}s)\n'.format(
+                     len(results), elapsed, workers, sum(busy.values())))
+    for worker in sorted(busy):
+        stream.write('  worker {0}: {1:.2f}s'.format(worker, busy[worker]))
+        if predicted and worker is not None:
+            stream.write(' (predicted {0:.2f}s)'.format(predicted[worker]))
+        stream.write('\n')
+    if predicted:
+        stream.write('Makespan: {0:.2f}s, predicted {1:.2f}s\n'.format(
+            max(busy.values()), max(predicted)))
+    failures = [r for r in results if r['outcome'] in ('FAIL', 'ERROR')]
+    stream.write('{0}\n'.format(
+        'FAILED (failures={0})'.format(len(failures)) if failures else 'OK'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run odooselenium tests in parallel processes.')
+    parser.add_argument('tests', nargs='+',
+                        help='Test files or dotted names.')
+    parser.add_argument('--workers', '-n', type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--template', default='test',
+                        help='Database duplicated for each worker.')
+    parser.add_argument('--master-password', default='admin')
+    parser.add_argument('--keep-databases', action='store_true')
+    parser.add_argument('--history',
+                        default=os.environ.get('ODOOSELENIUM_HISTORY'),
+                        help='SQLite database of performance history.')
+    args = parser.parse_args(argv)
+
+    results = run_parallel(load_tests(args.tests), workers=args.workers,
+                           url=args.url, template=args.template,
+                           master_password=args.master_password,
+                           keep_databases=args.keep_databases,
+                           history_path=args.history)
+    failed = any(r['outcome'] in ('FAIL', 'ERROR') for r in results)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Stub browser driver answering WebDriver commands over HTTP.
+
+Used to measure and test command executors, e.g.
+:class:`odooselenium.connection.PooledConnection`, without a browser.
+
+.. code:: python
+
+   driver = start_stub_driver()
+   executor = PooledConnection(driver.url)
+   executor.execute(Command.STATUS, {})['value']  # '/status'
+   driver.shutdown()
+
+"""
+import BaseHTTPServer
+import json
+import SocketServer
+import threading
+
+
+class StubDriverHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer every command with its path, over keep-alive connections."""
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1  # Send response at once, as drivers do.
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def _respond(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        self.rfile.read(length)
+        body = json.dumps({'status': 0, 'value': self.path})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Emulate driver dropping idle connections, without telling client.
+        self.close_connection = self.server.drop_connections
+
+    do_GET = do_POST = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class StubDriver(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Stub driver server, see :func:`start_stub_driver`."""
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0)):
+        BaseHTTPServer.HTTPServer.__init__(self, address, StubDriverHandler)
+        #: Number of connections accepted so far.
+        self.connections = 0
+        #: Whether to close connections after each response.
+        self.drop_connections = False
+        #: URL of driver, as given to command executors.
+        self.url = 'http://{0}:{1}'.format(*self.server_address)
+
+
+def start_stub_driver():
+    """Start :class:`StubDriver` in background, return it."""
+    server = StubDriver()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
@@ -1,36 +1,197 @@
 """Testing libraries."""
+import os
+import sys
+import time
 import unittest
 
-from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 
+from odooselenium import blocking
+from odooselenium import browsers
+from odooselenium import history
+from odooselenium import instrument
+from odooselenium import pool
+from odooselenium import records
+from odooselenium import rpc
 from odooselenium.ui import OdooUI
 
 
 class TestCase(unittest.TestCase):
     def setUp(self):
         """Setup Selenium driver, log in."""
+        self._started = time.time()
         self.configure()
-        self.setup_webdriver()
-        #: Bindings to Odoo user interface.
-        self.ui = OdooUI(self.webdriver, base_url=self.cfg['url'])
+        #: :class:`odooselenium.records.RecordFixtures` of test, created by
+        #: :meth:`create_records`.
+        self.records = None
+        #: :class:`odooselenium.blocking.BlockingProxy` browser goes through,
+        #: or None.
+        self.proxy = None
+        if self.cfg['block_requests']:
+            self.proxy = blocking.default_proxy()
+            self.proxy.blocklist = list(self.cfg['blocklist'])
+            self.proxy.allowlist = list(self.cfg['allowlist'])
+            self.proxy.reset()
+        reused = False
+        if self.cfg['pool_sessions']:
+            self.webdriver, reused = pool.default_pool.acquire(
+                self.session_key(), self._new_webdriver)
+        else:
+            self.setup_webdriver()
+        self.setup_ui()
+        if reused:
+            try:
+                if not self.ui.reset_session(self.cfg['username'],
+                                             self.cfg['password'],
+                                             self.cfg['dbname'],
+                                             use_rpc=self.cfg['rpc_login']):
+                    pool.default_pool.relogins += 1
+                return
+            except WebDriverException:  # Browser is gone, start a new one.
+                if self.command_recorder is not None:
+                    self.command_recorder.uninstall()
+                self.webdriver = pool.default_pool.replace(
+                    self.webdriver, self._new_webdriver)
+                self.setup_ui()
         self.ui.login(self.cfg['username'],
                       self.cfg['password'],
-                      self.cfg['dbname'])
+                      self.cfg['dbname'],
+                      use_rpc=self.cfg['rpc_login'])
+
+    def setup_ui(self):
+        """Set :attr:`ui` and :attr:`command_recorder` for web driver."""
+        #: Bindings to Odoo user interface.
+        self.ui = OdooUI(self.webdriver, base_url=self.cfg['url'],
+                         idle_wait=self.cfg['idle_wait'],
+                         menu_index=self.cfg['menu_index'],
+                         audit_waits=self.cfg['audit_waits'],
+                         keep_alive=self.cfg['keep_alive'],
+                         trace_rpc=self.cfg['trace_rpc'],
+                         collect_timings=self.cfg['collect_timings'])
+        #: :class:`odooselenium.instrument.CommandRecorder`, or None.
+        self.command_recorder = None
+        if self.cfg['instrument']:
+            self.command_recorder = instrument.CommandRecorder()
+            self.command_recorder.install(self.webdriver)
 
     def tearDown(self):
-        """Close the webdriver's session."""
-        self.webdriver.quit()
+        """Close the webdriver's session, or give it back to the pool.
+        Then delete records of :meth:`create_records`."""
+        if self.ui.wait_audit is not None:
+            sys.stderr.write('\nTime spent waiting in {0}:\n'.format(
+                self.id()))
+            self.ui.wait_audit.report(sys.stderr)
+        if self.ui.rpc_trace is not None:
+            sys.stderr.write('\nJSON-RPC calls in {0}:\n'.format(self.id()))
+            self.ui.rpc_trace.report(sys.stderr)
+        if self.ui.timings is not None:
+            sys.stderr.write('\nBrowser timings in {0}:\n'.format(self.id()))
+            self.ui.timings.report(sys.stderr)
+            if self.cfg['timings_dir']:
+                self.write_timings(self.cfg['timings_dir'])
+        if self.command_recorder is not None:
+            self.command_recorder.uninstall()
+            sys.stderr.write('\nWebDriver commands in {0}:\n'.format(
+                self.id()))
+            self.command_recorder.report(sys.stderr)
+        if self.proxy is not None:
+            sys.stderr.write('\nRequests blocked in {0}: '.format(self.id()))
+            self.proxy.report(sys.stderr)
+        if self.cfg['pool_sessions']:
+            pool.default_pool.release(self.session_key(), self.webdriver)
+        else:
+            self.webdriver.quit()
+        if self.records is not None:
+            self.records.unlink_all()
+        if self.cfg['history']:
+            self.record_history(self.cfg['history'])
+
+    def record_history(self, path):
+        """Record duration of test, and of actions if instrumented, in
+        :class:`odooselenium.history.History` at ``path``."""
+        database, run_id = history.default_run(path)
+        timings = [(self.id(), history.TEST_ACTION,
+                    time.time() - self._started, None)]
+        if self.command_recorder is not None:
+            for action, counters in self.command_recorder.actions.items():
+                timings.append((self.id(), action, counters['seconds'],
+                                counters['commands']))
+        database.add_many(run_id, timings)
 
     def configure(self, **kwargs):
-        """Set :attr:`cfg`."""
+        """Set :attr:`cfg`.
+
+        Default database can be set with ``ODOOSELENIUM_DBNAME`` environment
+        variable, as :mod:`odooselenium.runner` does for each worker. Default
+        browser profile (see :mod:`odooselenium.browsers`) can be set with
+        ``ODOOSELENIUM_BROWSER``. Performance history database (see
+        :mod:`odooselenium.history`) can be set with ``ODOOSELENIUM_HISTORY``.
+
+        """
         self.cfg = {
             'url': 'http://localhost:8069',
             'username': 'admin',
             'password': 'admin',
-            'dbname': 'test',
+            'dbname': os.environ.get('ODOOSELENIUM_DBNAME', 'test'),
+            'idle_wait': False,
+            'pool_sessions': False,
+            'rpc_login': True,
+            'menu_index': False,
+            'audit_waits': False,
+            'instrument': False,
+            'keep_alive': False,
+            'trace_rpc': False,
+            'collect_timings': False,
+            'timings_dir': None,
+            'history': os.environ.get('ODOOSELENIUM_HISTORY'),
+            'browser': browsers.default_profile(),
+            'block_requests': False,
+            'blocklist': blocking.DEFAULT_BLOCKLIST,
+            'allowlist': blocking.DEFAULT_ALLOWLIST,
         }
         self.cfg.update(kwargs)
 
+    def write_timings(self, directory):
+        """Write browser timings of test to ``<test id>.json`` file."""
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, '{0}.json'.format(self.id()))
+        with open(path, 'w') as timings_file:
+            self.ui.timings.to_json(timings_file)
+
+    def create_records(self, model, values_list):
+        """Create ``model`` records over JSON-RPC, return their IDs.
+
+        Records are deleted at tear down. See
+        :class:`odooselenium.records.RecordFixtures`.
+
+        """
+        if self.records is None:
+            self.records = records.RecordFixtures(rpc.authenticated_session(
+                self.cfg['url'], self.cfg['dbname'], self.cfg['username'],
+                self.cfg['password']))
+        return self.records.create(model, values_list)
+
+    def create_record(self, model, values):
+        """Create one ``model`` record over JSON-RPC, return its ID."""
+        return self.create_records(model, [values])[0]
+
     def setup_webdriver(self):
-        """Set :attr:`webdriver`."""
-        self.webdriver = webdriver.Chrome()
+        """Set :attr:`webdriver`, started with ``browser`` profile.
+
+        If ``block_requests`` is set, browser goes through :attr:`proxy`.
+
+        """
+        options = browsers.get_profile(self.cfg['browser'])
+        if self.proxy is not None:
+            options['proxy'] = self.proxy.address
+        self.webdriver = browsers.new_webdriver(options)
+
+    def session_key(self):
+        """Return key of browser sessions this test can share in pool."""
+        return (self.cfg['url'], self.cfg['dbname'], self.cfg['username'],
+                self.cfg['browser'], self.cfg['block_requests'])
+
+    def _new_webdriver(self):
+        self.setup_webdriver()
+        return self.webdriver
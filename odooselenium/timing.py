@@ -0,0 +1,147 @@
+"""Collect browser timings of pages: navigation, resources, long tasks.
+
+After each :meth:`odooselenium.OdooUI.wait_for_page_load` (including the one
+of ``login``) and :meth:`odooselenium.OdooUI.wait_for_ajax_load`, one script
+call returns Navigation Timing of a newly loaded page, Resource Timing
+entries and long tasks (main thread blocked for more than 50ms) since the
+previous call. :class:`TimingCollector` keeps them as a time series,
+attributed to :class:`odooselenium.OdooUI` actions.
+
+.. code:: python
+
+   ui = OdooUI(webdriver, collect_timings=True)
+   ui.login('admin', 'admin', 'test')
+   ui.go_to_view('Customers')
+   ui.timings.report()
+   with open('timings.json', 'w') as timings_file:
+       ui.timings.to_json(timings_file)
+
+Long tasks are only reported by browsers implementing the Long Tasks API,
+such as Chrome.
+
+"""
+import json
+import sys
+import time
+
+
+#: JavaScript returning timings of current page since previous call. Times
+#: are in milliseconds since navigation start. Navigation is only returned
+#: once per page.
+PAGE_TIMING_SCRIPT = """
+var state = window.odooseleniumTiming;
+if (!state) {
+    state = window.odooseleniumTiming = {
+        navigation: false, resources: 0, longtasks: []};
+    if (performance.setResourceTimingBufferSize) {
+        performance.setResourceTimingBufferSize(10000);
+    }
+    if (window.PerformanceObserver) {
+        var observer = new PerformanceObserver(function (list) {
+            list.getEntries().forEach(function (entry) {
+                state.longtasks.push({start: entry.startTime,
+                                      duration: entry.duration});
+            });
+        });
+        try {
+            observer.observe({type: 'longtask', buffered: true});
+        } catch (error) {
+            try {
+                observer.observe({entryTypes: ['longtask']});
+            } catch (error) {}
+        }
+    }
+}
+var result = {navigation: null, resources: [],
+              longtasks: state.longtasks.splice(0, state.longtasks.length)};
+if (!state.navigation) {
+    state.navigation = true;
+    var timing = performance.timing;
+    result.navigation = {};
+    ['fetchStart', 'domainLookupEnd', 'connectEnd', 'requestStart',
+     'responseStart', 'responseEnd', 'domInteractive',
+     'domContentLoadedEventEnd', 'loadEventEnd'].forEach(function (name) {
+        result.navigation[name] = timing[name] ?
+            timing[name] - timing.navigationStart : null;
+    });
+}
+var entries = performance.getEntriesByType('resource');
+result.resources = entries.slice(state.resources).map(function (entry) {
+    return {name: entry.name, type: entry.initiatorType,
+            start: entry.startTime, duration: entry.duration,
+            size: entry.transferSize || 0};
+});
+state.resources = entries.length;
+return result;
+"""
+
+#: Duration of main thread work above which a task is long, in milliseconds.
+LONG_TASK_THRESHOLD = 50
+
+
+class TimingCollector(object):
+    """Time series of page timings."""
+    def __init__(self):
+        #: Samples, in order: dictionaries with ``time`` (seconds since
+        #: collector creation), ``event`` (``page_load`` or ``ajax_load``),
+        #: ``action``, and ``navigation``, ``resources`` and ``longtasks``
+        #: as returned by :data:`PAGE_TIMING_SCRIPT`.
+        self.samples = []
+        self._start = time.time()
+
+    def collect(self, webdriver, event, action=None):
+        """Add sample of timings of current page, return it."""
+        sample = webdriver.execute_script(PAGE_TIMING_SCRIPT)
+        sample.update({'time': time.time() - self._start, 'event': event,
+                       'action': action})
+        self.samples.append(sample)
+        return sample
+
+    def totals(self):
+        """Return counters by action.
+
+        Counters are the number of ``pages`` loaded, of ``resources``, their
+        ``bytes``, and the number of ``longtasks`` with ``blocking`` time
+        (seconds above 50ms per long task).
+
+        """
+        totals = {}
+        for sample in self.samples:
+            counters = totals.setdefault(sample['action'], {
+                'pages': 0, 'resources': 0, 'bytes': 0, 'longtasks': 0,
+                'blocking': 0.0})
+            counters['pages'] += sample['navigation'] is not None
+            counters['resources'] += len(sample['resources'])
+            counters['bytes'] += sum(resource['size']
+                                     for resource in sample['resources'])
+            counters['longtasks'] += len(sample['longtasks'])
+            counters['blocking'] += sum(
+                max(task['duration'] - LONG_TASK_THRESHOLD, 0)
+                for task in sample['longtasks']) / 1000.0
+        return totals
+
+    def reset(self):
+        """Forget samples."""
+        del self.samples[:]
+        self._start = time.time()
+
+    def report(self, stream=None):
+        """Write table of totals by action to ``stream`` (stderr)."""
+        if stream is None:
+            stream = sys.stderr
+        line = '{0:<50} {1:>5} {2:>9} {3:>10} {4:>9} {5:>9}\n'
+        stream.write(line.format('action', 'pages', 'resources', 'bytes',
+                                 'longtasks', 'blocking'))
+        totals = self.totals()
+        for action in sorted(totals, key=lambda a: totals[a]['blocking'],
+                             reverse=True):
+            counters = totals[action]
+            stream.write(line.format(
+                str(action), counters['pages'], counters['resources'],
+                counters['bytes'], counters['longtasks'],
+                '{0:.3f}'.format(counters['blocking'])))
+
+    def to_json(self, stream):
+        """Write samples to ``stream`` as JSON."""
+        json.dump(self.samples, stream, indent=2, sort_keys=True)
+        stream.write('\n')
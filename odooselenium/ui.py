@@ -7,25 +7,212 @@ import urlparse
 from selenium.common.exceptions import NoAlertPresentException
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support import ui
-from selenium.webdriver.support.ui import WebDriverWait
 
+from odooselenium import audit
+from odooselenium import connection
+from odooselenium import menu
+from odooselenium import rpc
+from odooselenium import rpctrace
+from odooselenium import timing
 from odooselenium import wait
 
 
 PAGER_STATUS_REX = re.compile('\d+-(?P<last>\d+) of (?P<total>\d+)')
 
+#: JavaScript collecting list columns, headers and cells in one round trip.
+#: Arguments are the XPath expressions used by
+#: :meth:`OdooUI._get_rows_from_list`. Only displayed nodes are kept, and text
+#: is normalized the way WebDriver's ``text`` property does.
+LIST_ROWS_SCRIPT = """
+var select = function (xpath) {
+    var snapshot = document.evaluate(
+        xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) {
+        var node = snapshot.snapshotItem(i);
+        var style = window.getComputedStyle(node);
+        if (style.visibility !== 'hidden' &&
+                (node.offsetWidth || node.offsetHeight ||
+                 node.getClientRects().length)) {
+            nodes.push(node);
+        }
+    }
+    return nodes;
+};
+var text = function (node) {
+    return (node.innerText || '').replace(/\\u00a0/g, ' ')
+        .replace(/[ \\t]+/g, ' ').replace(/ ?\\n ?/g, '\\n').trim();
+};
+return {
+    columns: select(arguments[0]).length,
+    headers: select(arguments[1]).map(text),
+    cells: select(arguments[2]).map(text)
+};
+"""
+
+#: JavaScript clicking all displayed nodes matching XPath ``arguments[0]``,
+#: in one round trip. Checkboxes already checked are skipped. Returns number
+#: of matching nodes.
+CLICK_ALL_SCRIPT = """
+var snapshot = document.evaluate(arguments[0], document, null,
+                                 XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var nodes = [];
+for (var i = 0; i < snapshot.snapshotLength; i++) {
+    var node = snapshot.snapshotItem(i);
+    if (node.offsetWidth || node.offsetHeight ||
+            node.getClientRects().length) {
+        nodes.push(node);
+    }
+}
+nodes.forEach(function (node) {
+    if (node.checked !== true) {
+        node.click();
+    }
+});
+return nodes.length;
+"""
+
+#: JavaScript making ``window.confirm()`` return true without showing a
+#: dialog if ``arguments[0]`` is true, restoring it otherwise.
+SUPPRESS_CONFIRM_SCRIPT = """
+if (arguments[0] && !window.odooseleniumConfirm) {
+    window.odooseleniumConfirm = window.confirm;
+    window.confirm = function () { return true; };
+} else if (!arguments[0] && window.odooseleniumConfirm) {
+    window.confirm = window.odooseleniumConfirm;
+    delete window.odooseleniumConfirm;
+}
+"""
+
+#: JavaScript clearing web storage of current page.
+CLEAR_STORAGE_SCRIPT = \
+    'window.localStorage.clear(); window.sessionStorage.clear();'
+
+#: JavaScript opening menu ``arguments[1]`` and its action ``arguments[2]``
+#: by setting URL fragment to ``arguments[0]``. If the action is already
+#: open, ``hashchange`` would not reload it: click its menu through the web
+#: client instead, which resets search and filters.
+GO_TO_MENU_SCRIPT = """
+var fragment = arguments[0], menuId = arguments[1], actionId = arguments[2];
+var current = /[#&]action=([^&]*)/.exec(window.location.hash);
+var client = window.openerp && window.openerp.webclient;
+if (actionId && current && current[1] === String(actionId) &&
+        client && client.menu) {
+    client.menu.menu_click(menuId);
+} else {
+    window.location.hash = fragment;
+}
+"""
+
+
+def any_visible_element(by, value):
+    """Return condition for ``WebDriverWait``: first displayed element."""
+    def condition(webdriver):
+        for element in webdriver.find_elements(by, value):
+            if element.is_displayed():
+                return element
+        return False
+    return condition
+
 
 class OdooUI(object):
     """Encapsulate DOM elements of Odoo user interface."""
-    def __init__(self, webdriver, base_url='http://localhost:8069'):
-        #: Selenium WebDriver instance.
+    _audited = True
+
+    def __init__(self, webdriver, base_url='http://localhost:8069',
+                 idle_wait=False, menu_index=False, audit_waits=False,
+                 keep_alive=False, trace_rpc=False, collect_timings=False):
+        if keep_alive:
+            connection.install(webdriver)
+        #: Selenium WebDriver instance. With ``keep_alive``, it sends commands
+        #: over pooled connections, see :mod:`odooselenium.connection`.
         self.webdriver = webdriver
         #: Base URL of Odoo web service.
         self.base_url = base_url
+        #: Whether to wait for Odoo with the in-page idle tracker (see
+        #: :func:`odooselenium.wait.wait_for_odoo_idle`) instead of polling.
+        self.idle_wait = idle_wait
+        #: Whether :meth:`go_to_module` and :meth:`go_to_view` jump to menus
+        #: using :mod:`odooselenium.menu` index instead of clicking menus.
+        self.menu_index = menu_index
+        #: Database and user of current session, as passed to :meth:`login`.
+        self.dbname = None
+        self.username = None
+        #: Name of module opened by :meth:`go_to_module`.
+        self.current_module = None
+        #: :class:`odooselenium.audit.WaitAudit` recording time spent waiting
+        #: by method, or None.
+        self.wait_audit = audit.WaitAudit() if audit_waits else None
+        #: :class:`odooselenium.rpctrace.RpcTrace` recording JSON-RPC calls
+        #: of the web client by method, or None.
+        self.rpc_trace = rpctrace.RpcTrace() if trace_rpc else None
+        #: :class:`odooselenium.timing.TimingCollector` recording browser
+        #: timings after page and AJAX loads, or None.
+        self.timings = timing.TimingCollector() if collect_timings else None
+
+    @contextlib.contextmanager
+    def _waiting(self):
+        """Record time spent in ``with`` block in :attr:`wait_audit`."""
+        if self.wait_audit is None:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.wait_audit.record(audit.current_action(),
+                                   time.time() - start)
+
+    @contextlib.contextmanager
+    def _tracing_rpc(self):
+        """Record JSON-RPC calls of ``with`` block in :attr:`rpc_trace`."""
+        if self.rpc_trace is None:
+            yield
+            return
+        self.webdriver.execute_script(rpctrace.RPC_TRACKER_SCRIPT)
+        start = wait.clock()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            # Collect even if block failed, else its calls would be
+            # attributed to next action.
+            seconds = wait.clock() - start
+            try:
+                calls = self.webdriver.execute_script(
+                    rpctrace.COLLECT_RPC_SCRIPT)
+            except WebDriverException:
+                if not failed:
+                    raise
+            else:
+                self.rpc_trace.record(audit.current_action(), calls,
+                                      seconds)
+
+    @contextlib.contextmanager
+    def _collecting_timings(self, event):
+        """Collect browser timings in :attr:`timings` after ``with`` block."""
+        yield
+        if self.timings is not None:
+            self.timings.collect(self.webdriver, event,
+                                 audit.current_action())
+
+    def wait_until(self, condition, timeout=10):
+        """Wait until ``condition(webdriver)`` is true, return its value.
+
+        Raise :class:`odooselenium.wait.WaitTimeout` after ``timeout``
+        seconds, or at deadline of enclosing waits. See
+        :func:`odooselenium.wait.until`.
+
+        """
+        with self._waiting():
+            return wait.until(lambda: condition(self.webdriver), timeout,
+                              wait.describe(condition))
 
     @property
     def create_button(self):
@@ -45,54 +232,100 @@ class OdooUI(object):
 
     @contextlib.contextmanager
     def wait_for_page_load(self, timeout=10):
-        """Wait for full page load and assert new page has been loaded."""
-        # Inspect initial state.
-        try:
-            initial_body = self.webdriver.find_element(By.XPATH, '//body')
-        except NoSuchElementException:  # First load.
-            initial_body = None
+        """Wait for full page load and assert new page has been loaded.
 
-        # Yield (back to 'with' block, where user triggers page load).
-        yield
+        Waits in ``with`` block cannot exceed ``timeout`` either.
+        Browser timings are then collected in :attr:`timings`, if set.
 
-        # Wait for body to change.
-        ui.WebDriverWait(self.webdriver, timeout).until(
-            expected_conditions.staleness_of(initial_body)
-        )
+        """
+        with wait.deadline(timeout), self._collecting_timings('page_load'):
+            # Inspect initial state.
+            try:
+                initial_body = self.webdriver.find_element(By.XPATH, '//body')
+            except NoSuchElementException:  # First load.
+                initial_body = None
+
+            # Yield (back to 'with' block, where user triggers page load).
+            yield
+
+            # Wait for body to change.
+            self.wait_until(expected_conditions.staleness_of(initial_body),
+                            timeout)
+            # Wait for web client to be done with initial requests.
+            if self.idle_wait:
+                with self._waiting():
+                    wait.wait_for_odoo_idle(self.webdriver, timeout)
 
     @contextlib.contextmanager
     def wait_for_ajax_load(self, timeout=10):
-        """Wait for AJAX-style load and assert new page has been loaded."""
-        # Inspect initial state.
-        initial_jquery_active = not wait.jquery_inactive(self.webdriver)
+        """Wait for AJAX-style load and assert new page has been loaded.
 
-        # Yield (back to 'with' block where user clicks or whatever)
-        yield
+        Waits in ``with`` block cannot exceed ``timeout`` either.
+        JSON-RPC calls of the block are recorded in :attr:`rpc_trace`, and
+        browser timings are collected in :attr:`timings`, if set.
+
+        """
+        with wait.deadline(timeout), self._tracing_rpc(), \
+                self._collecting_timings('ajax_load'):
+            if self.idle_wait:
+                wait.install_idle_tracker(self.webdriver)
+                yield
+                with self._waiting():
+                    wait.wait_for_odoo_idle(self.webdriver, timeout)
+                return
+
+            # Inspect initial state.
+            initial_jquery_active = not wait.jquery_inactive(self.webdriver)
 
-        # Check state changed.
-        def page_loaded(webdriver):
-            # jQuery should be inactive (no AJAX pending).
-            if not initial_jquery_active:
-                if not wait.jquery_inactive(webdriver):
+            # Yield (back to 'with' block where user clicks or whatever)
+            yield
+
+            # Check state changed.
+            def page_loaded(webdriver):
+                # jQuery should be inactive (no AJAX pending).
+                if not initial_jquery_active:
+                    if not wait.jquery_inactive(webdriver):
+                        return False
+                # Body element doesn't have class 'oe_wait'.
+                try:
+                    webdriver.find_element(By.CSS_SELECTOR, 'body.oe_wait')
+                except:
+                    pass
+                else:
                     return False
-            # Body element doesn't have class 'oe_wait'.
-            try:
-                webdriver.find_element(By.CSS_SELECTOR, 'body.oe_wait')
-            except:
-                pass
-            else:
-                return False
-            return True
+                return True
+
+            self.wait_until(page_loaded, timeout)
+
+    @contextlib.contextmanager
+    def confirm_suppressed(self):
+        """Accept confirmation dialogs of ``with`` block without showing them.
 
-        ui.WebDriverWait(self.webdriver, timeout).until(page_loaded)
+        Saves one alert round trip per dialog, e.g. when deleting records.
+
+        """
+        self.webdriver.execute_script(SUPPRESS_CONFIRM_SCRIPT, True)
+        try:
+            yield
+        finally:
+            self.webdriver.execute_script(SUPPRESS_CONFIRM_SCRIPT, False)
 
-    def login(self, username, password, dbname=None):
+    def login(self, username, password, dbname=None, use_rpc=False):
         """Log in Odoo.
 
         If ``dbname`` is None and there are several databases, then the first
         one is automatically selected.
 
+        If ``use_rpc`` is True, authenticate with JSON-RPC then open web client
+        with session cookie (see :meth:`rpc_login`). Else, fill in login
+        screen.
+
         """
+        if use_rpc:
+            return self.rpc_login(username, password, dbname)
+        self.dbname = dbname
+        self.username = username
+
         # Display the first page
         self.webdriver.get(self.url())
 
@@ -120,6 +353,61 @@ class OdooUI(object):
         with self.wait_for_page_load():
             login_button.click()
 
+    def rpc_login(self, username, password, dbname=None, cache=True):
+        """Log in Odoo without using login screen.
+
+        Authenticate with ``/web/session/authenticate`` (or reuse a cached
+        session which is still valid, if ``cache`` is True), put
+        ``session_id`` cookie in browser, then open web client.
+
+        """
+        if dbname is None:
+            dbname = rpc.Session(self.base_url).service('db', 'list')[0]
+        if cache:
+            session = rpc.authenticated_session(self.base_url, dbname,
+                                                username, password)
+        else:
+            session = rpc.Session(self.base_url)
+            session.authenticate(dbname, username, password)
+        self.dbname = dbname
+        self.username = username
+        # Cookies can only be set for domain of current page: load something
+        # small from Odoo server first.
+        self.webdriver.get(self.url('web/static/src/img/favicon.ico'))
+        self.webdriver.delete_cookie('session_id')
+        self.webdriver.add_cookie({
+            'name': 'session_id',
+            'value': session.session_id,
+            'path': '/',
+        })
+        with self.wait_for_page_load():
+            self.webdriver.get(self.url('web'))
+
+    def is_logged_in(self):
+        """Return True if current page is not Odoo's login form."""
+        return not self.webdriver.find_elements(By.ID, u'login')
+
+    def reset_session(self, username, password, dbname=None, use_rpc=False):
+        """Reset state of a reused browser session, log in only if necessary.
+
+        Pending alerts are dismissed, web storage is cleared, then the browser
+        goes back to the home action of web client.
+
+        """
+        try:
+            self.webdriver.switch_to.alert.dismiss()
+        except NoAlertPresentException:
+            pass
+        self.webdriver.execute_script(CLEAR_STORAGE_SCRIPT)
+        self.dbname = dbname
+        self.username = username
+        with self.wait_for_page_load():
+            self.webdriver.get(self.url('web'))
+        if not self.is_logged_in():
+            self.login(username, password, dbname, use_rpc=use_rpc)
+            return False
+        return True
+
     def url(self, path=''):
         """Return complete URL."""
         return u'{base:s}/{path:s}'.format(
@@ -128,7 +416,7 @@ class OdooUI(object):
         )
 
     def list_modules(self):
-        ui.WebDriverWait(self.webdriver, 10).until(
+        self.wait_until(
             expected_conditions.presence_of_element_located((
                 By.CSS_SELECTOR,
                 '.oe_application .oe_view_manager'
@@ -140,8 +428,33 @@ class OdooUI(object):
         )
         return modules
 
+    def get_menu_index(self):
+        """Return :class:`odooselenium.menu.MenuIndex` of current session."""
+        return menu.get_index(self.webdriver,
+                              (self.base_url, self.dbname, self.username))
+
+    def _go_to_menu(self, entry, timeout=10):
+        """Open menu and action of index ``entry`` in one step."""
+        with self.wait_for_ajax_load(timeout):
+            self.webdriver.execute_script(GO_TO_MENU_SCRIPT,
+                                          menu.MenuIndex.fragment(entry),
+                                          entry['menu_id'],
+                                          entry['action_id'])
+        # Wait for application view to be loaded.
+        self.wait_until(
+            expected_conditions.presence_of_element_located((
+                By.CSS_SELECTOR,
+                '.oe_application .oe_view_manager'
+            )),
+            timeout)
+
     def go_to_module(self, module_name, timeout=10):
         """Click on the module in menu."""
+        if self.menu_index:
+            entry = self.get_menu_index().find_module(module_name)
+            self._go_to_menu(entry, timeout)
+            self.current_module = module_name
+            return
         list_module_display = []
         modules = self.list_modules()
         module_link = None
@@ -156,25 +469,31 @@ class OdooUI(object):
                                                             tuple_module[1])
 
         # Wait for application view to be loaded.
-        ui.WebDriverWait(self.webdriver, timeout).until(
+        self.wait_until(
             expected_conditions.presence_of_element_located((
                 By.CSS_SELECTOR,
                 '.oe_application .oe_view_manager'
-            ))
-        )
+            )),
+            timeout)
 
         module_link.click()
 
         # Wait for application view to be loaded.
-        ui.WebDriverWait(self.webdriver, timeout).until(
+        self.wait_until(
             expected_conditions.presence_of_element_located((
                 By.CSS_SELECTOR,
                 '.oe_application .oe_view_manager'
-            ))
-        )
+            )),
+            timeout)
+        self.current_module = module_name
 
     def go_to_view(self, view_name, timeout=10):
         """Click on the view in menu."""
+        if self.menu_index:
+            entry = self.get_menu_index().find_view(view_name,
+                                                    self.current_module)
+            self._go_to_menu(entry, timeout)
+            return
         # Select all the secondary menus
         secondary_menus = self.webdriver.find_elements_by_css_selector(
             '.oe_secondary_menu')
@@ -189,18 +508,18 @@ class OdooUI(object):
                     By.CSS_SELECTOR,
                     ".oe_secondary_submenu .oe_menu_text"
                 )
-                for menu in menus:
-                    if menu.text in [searched_menu] + list(previous_parts):
-                        menu_parent = menu.find_element_by_xpath('ancestor::a')
-                        if menu_parts or menu.text in previous_parts:
+                for item in menus:
+                    if item.text in [searched_menu] + list(previous_parts):
+                        menu_parent = item.find_element_by_xpath('ancestor::a')
+                        if menu_parts or item.text in previous_parts:
                             if ('oe_menu_opened' not in
                                     menu_parent.get_attribute('class')):
-                                menu.click()
-                        if menu.text == searched_menu and menu_parts:
+                                item.click()
+                        if item.text == searched_menu and menu_parts:
                             previous_parts.add(searched_menu)
                             searched_menu = menu_parts.pop(0)
-                        elif menu.text == searched_menu and not menu_parts:
-                            view_link = menu
+                        elif item.text == searched_menu and not menu_parts:
+                            view_link = item
                             break
                 break
         tuple_view = (view_name, menus)
@@ -210,12 +529,12 @@ class OdooUI(object):
         with self.wait_for_ajax_load():
             view_link.click()
         # Wait for application view to be loaded.
-        ui.WebDriverWait(self.webdriver, timeout).until(
+        self.wait_until(
             expected_conditions.presence_of_element_located((
                 By.CSS_SELECTOR,
                 '.oe_application .oe_view_manager'
-            ))
-        )
+            )),
+            timeout)
 
     def click_form_view_tab(self, tab_name):
         tabs = self.webdriver.find_elements(
@@ -243,21 +562,22 @@ class OdooUI(object):
                 for button in buttons:
                     # Print "Button text: ",button.text
                     if button.text == button_name:
-                        with wait.wait_for_body_odoo_load(self.webdriver):
+                        with wait.wait_for_body_odoo_load(
+                                self.webdriver, idle=self.idle_wait):
                             button.click()
                         break
 
     def click_button_by_model(self, model_name, name, timeout=10):
         with self.wait_for_ajax_load():
-            button = ui.WebDriverWait(self.webdriver, timeout).until(
+            button = self.wait_until(
                 expected_conditions.presence_of_element_located((
                     By.XPATH,
                     "//button["
                     "@data-bt-testing-model_name='{}' and "
                     "@data-bt-testing-name='{}']".format(
                         model_name, name))
-                )
-            )
+                ),
+                timeout)
             button.click()
 
     def click_edit(self, timeout=10):
@@ -304,13 +624,13 @@ class OdooUI(object):
         with self.wait_for_ajax_load(timeout):
             visible_buttons[0].click()
 
-    def delete_item_from_form_kanban(self, value, timeout=10):
+    def delete_item_from_form_kanban(self, value, timeout=10, in_page=False):
         xpath = ('//a[contains(@class, "oe_kanban_action") and text()="{}"]'
                  '/ancestor::div[contains(@class, "oe_kanban_record")]'
                  '//a[contains(@class, "oe_kanban_action") and '
                  '@data-type="delete"]'.format(value))
 
-        self._delete_item_from_form(xpath, timeout)
+        self._delete_item_from_form(xpath, timeout, in_page=in_page)
 
     def get_values_from_form_kanban(self):
         """Get the displayed values of a form sub-kanban"""
@@ -322,8 +642,11 @@ class OdooUI(object):
 
         return [e.text for e in elements if e.is_displayed()]
 
-    def get_rows_from_form_list(self, header=None):
-        """Get the values of all rows on a form sub-list"""
+    def get_rows_from_form_list(self, header=None, in_page=False):
+        """Get the values of all rows on a form sub-list.
+
+        If in_page is True, values are collected by a single script executed
+        in the browser instead of one WebDriver call per cell."""
 
         if header:
             columns_xpath = ('//div[normalize-space(text())="{}"]'
@@ -349,10 +672,11 @@ class OdooUI(object):
                      'and not(ancestor::*[@style="display: none;"])]/tbody/tr'
                      '/td')
 
-        return self._get_rows_from_list(columns_xpath, headers_xpath, xpath)
+        return self._get_rows_from_list(columns_xpath, headers_xpath, xpath,
+                                        in_page=in_page)
 
     def delete_item_from_form_list(self, column, value, header=None,
-                                   timeout=10):
+                                   timeout=10, in_page=False):
         xpath = ('//table[@class="oe_list_content"]/tbody/tr/'
                  'td[@data-field="{}" and text()="{}"]/following-sibling::'
                  'td[@class="oe_list_record_delete"]'.format(column, value))
@@ -361,9 +685,22 @@ class OdooUI(object):
             xpath = ('//div[normalize-space(text())="{}"]/'
                      'following-sibling::*[1]{}'.format(header, xpath))
 
-        self._delete_item_from_form(xpath, timeout)
+        self._delete_item_from_form(xpath, timeout, in_page=in_page)
 
-    def _delete_item_from_form(self, xpath, timeout):
+    def _delete_item_from_form(self, xpath, timeout, in_page=False):
+        """Click visible delete buttons matching ``xpath``.
+
+        If in_page is True, all buttons are clicked by a single script with
+        confirmations suppressed, then Odoo is waited for once.
+
+        """
+        if in_page:
+            with self.confirm_suppressed():
+                with self.wait_for_ajax_load(timeout):
+                    if not self.webdriver.execute_script(CLICK_ALL_SCRIPT,
+                                                         xpath):
+                        raise RuntimeError("No delete buttons found")
+            return
         delete_buttons = self.webdriver.find_elements_by_xpath(xpath)
 
         visible_buttons = [b for b in delete_buttons if b.is_displayed()]
@@ -414,26 +751,51 @@ class OdooUI(object):
             fragment_values[key] = value
         return fragment_values
 
-    def delete_from_list(self):
-        """Delete items selected with select_list_items"""
+    def delete_from_list(self, suppress_confirm=False, timeout=10):
+        """Delete items selected with select_list_items.
+        If suppress_confirm is True, the confirmation dialog is not shown and
+        deletion is waited for, see confirm_suppressed."""
+        if suppress_confirm:
+            with self.confirm_suppressed():
+                with self.wait_for_ajax_load(timeout):
+                    self.click_more_item('Delete')
+            return
         self.click_more_item('Delete')
         self.webdriver.switch_to.alert.accept()
 
-    def select_list_items(self, data_field, column_value):
+    def select_list_items(self, data_field, column_value, in_page=False):
         """Select items in a list view where the specified data_field has the
-        specified column_value"""
+        specified column_value.
+        If in_page is True, rows are selected by a single script executed in
+        the browser, and rows already selected stay selected. Return number
+        of matching rows."""
 
         xpath = ('//table[@class="oe_list_content"]/tbody/tr/'
                  'td[@data-field="{}" and text()="{}"]/../'
                  'th[@class="oe_list_record_selector"]/input'.format(
                      data_field, column_value))
+        if in_page:
+            return self.webdriver.execute_script(CLICK_ALL_SCRIPT, xpath)
         checkboxes = self.webdriver.find_elements_by_xpath(xpath)
         for checkbox in checkboxes:
             checkbox.click()
+        return len(checkboxes)
+
+    def select_all_list_items(self):
+        """Select all items of current list view page with the header
+        checkbox."""
+        checkbox = self.wait_for_visible_element_by_xpath(
+            '//table[@class="oe_list_content"]/thead/tr/th/'
+            'input[contains(@class, "oe_list_record_selector")]')
+        if not checkbox.is_selected():
+            checkbox.click()
 
-    def get_rows_from_list(self, data_field=None, column_value=None):
+    def get_rows_from_list(self, data_field=None, column_value=None,
+                           in_page=False):
         """Get the values of all rows having a specific column value.
-        If data_field and column_value are not specified, get all rows."""
+        If data_field and column_value are not specified, get all rows.
+        If in_page is True, values are collected by a single script executed
+        in the browser instead of one WebDriver call per cell."""
 
         columns_xpath = ('//table[@class="oe_list_content"]/thead/tr['
                          '@class="oe_list_header_columns"]/th[starts-with('
@@ -447,34 +809,90 @@ class OdooUI(object):
         else:
             xpath = '//table[@class="oe_list_content"]/tbody/tr/td'
 
-        return self._get_rows_from_list(columns_xpath, headers_xpath, xpath)
-
-    def _get_rows_from_list(self, columns_xpath, headers_xpath, values_xpath):
-        columns = [elem for elem in
-                   self.webdriver.find_elements_by_xpath(columns_xpath)
-                   if elem.is_displayed()]
-
-        chunk_size = len(columns)
-
-        header_values = [elem.text for elem in
-                         self.webdriver.find_elements_by_xpath(headers_xpath)
-                         if elem.is_displayed()]
+        return self._get_rows_from_list(columns_xpath, headers_xpath, xpath,
+                                        in_page=in_page)
+
+    def _get_rows_from_list(self, columns_xpath, headers_xpath, values_xpath,
+                            in_page=False):
+        if in_page:
+            result = self.webdriver.execute_script(
+                LIST_ROWS_SCRIPT, columns_xpath, headers_xpath, values_xpath)
+            chunk_size = result['columns']
+            header_values = result['headers']
+            all_values = result['cells']
+        else:
+            columns = [elem for elem in
+                       self.webdriver.find_elements_by_xpath(columns_xpath)
+                       if elem.is_displayed()]
+            chunk_size = len(columns)
+            header_values = [elem.text for elem in
+                             self.webdriver.find_elements_by_xpath(
+                                 headers_xpath)
+                             if elem.is_displayed()]
+            all_values = self.webdriver.find_elements_by_xpath(values_xpath)
+            all_values = [v.text for v in all_values if v.is_displayed()]
 
         header_values += ['Untitled{}'.format(x) for x
                           in xrange(chunk_size - len(header_values))]
         values = []
 
-        all_values = self.webdriver.find_elements_by_xpath(values_xpath)
-        all_values = [v for v in all_values if v.is_displayed()]
         lines = [all_values[i:i + chunk_size] for i in xrange(0,
                                                               len(all_values),
                                                               chunk_size)]
-        for line in lines:
-            line_values = [elem.text for elem in line]
+        for line_values in lines:
             values.append(dict(zip(header_values, line_values)))
 
         return values
 
+    def iter_list_rows(self, data_field=None, column_value=None,
+                       in_page=False, page_limit=None, timeout=10):
+        """Yield rows of list view like get_rows_from_list, page after page.
+        Next page is loaded only once rows of current page are consumed, so
+        that iteration stops on the page where the consumer stops.
+        If page_limit is set, pager limit is changed first with
+        set_list_limit, so that fewer pages are loaded."""
+
+        if page_limit is not None:
+            self.set_list_limit(page_limit, timeout)
+        while True:
+            for row in self.get_rows_from_list(data_field, column_value,
+                                               in_page=in_page):
+                yield row
+            if not self._go_to_next_list_page(timeout):
+                return
+
+    def _go_to_next_list_page(self, timeout):
+        """Load next page of list view, return False if on last page."""
+        next_buttons = self.webdriver.find_elements_by_xpath(
+            '//div[@class="oe_list_pager"]/ul[@class="oe_pager_group"]/li/'
+            'a[@data-pager-action="next"]')
+        if not next_buttons:
+            return False
+        # Next page of last page is the first one.
+        pager_status = self.webdriver.find_element_by_xpath(
+            '//span[@class="oe_list_pager_state"]')
+        match = re.match(PAGER_STATUS_REX, pager_status.text)
+        if match:
+            status_match = match.groupdict()
+            if status_match['last'] == status_match['total']:
+                return False
+        with self.wait_for_ajax_load(timeout):
+            next_buttons[0].click()
+        return True
+
+    def set_list_limit(self, limit, timeout=10):
+        """Set number of rows per page of list view.
+        limit is one of the choices of Odoo's pager: 80, 200, 500, 2000 or
+        'unlimited'."""
+
+        self.wait_for_visible_element_by_xpath(
+            '//span[@class="oe_list_pager_state"]').click()
+        select = ui.Select(self.wait_for_visible_element_by_xpath(
+            '//span[@class="oe_list_pager_state"]/select'))
+        with self.wait_for_ajax_load(timeout):
+            select.select_by_value('NaN' if limit == 'unlimited'
+                                   else str(limit))
+
     def click_more_item(self, menu_item):
         """Click an item in the More menu that appears when selecting list
         items"""
@@ -523,58 +941,29 @@ class OdooUI(object):
                 input_field.send_keys(search_string)
                 input_field.send_keys(Keys.ENTER)
 
-    def click_list_column(self, data_field, value, click_column=None):
+    def click_list_column(self, data_field, value, click_column=None,
+                          timeout=20):
         """Click the first item with the specified value in the specified
         column in a list. Cycle through multiple pages if they're available and
         it is necessary.
         If click_column is not specified, find the cell under data_field with
         contains value and click it.
         If click_column is specified, find the cell under data_field which
-        contains value, then click click_column in the same row."""
-
-        rows = []
-        while not rows:
-            rows = self.get_rows_from_list(data_field, value)
+        contains value, then click click_column in the same row.
+        Wait up to timeout seconds for the row to be displayed."""
 
-            next_button_xpath = ('//div[@class="oe_list_pager"]/'
-                                 'ul[@class="oe_pager_group"]/li/'
-                                 'a[@data-pager-action="next"]')
-            next_buttons = self.webdriver.find_elements_by_xpath(
-                next_button_xpath)
-
-            if rows:
-                break
-            elif not next_buttons:
-                raise RuntimeError('Could not find row with {}'.format(value))
-            else:
-                pager_status_xpath = '//span[@class="oe_list_pager_state"]'
-                pager_status = self.webdriver.find_element_by_xpath(
-                    pager_status_xpath)
-
-                match = re.match(PAGER_STATUS_REX, pager_status.text)
-
-                if match:
-                    status_match = match.groupdict()
-                    if status_match['last'] == status_match['total']:
-                        raise RuntimeError('Could not find row with {}'.format(
-                            value))
-                next_buttons[0].click()
+        if next(self.iter_list_rows(data_field, value), None) is None:
+            raise RuntimeError('Could not find row with {}'.format(value))
 
         xpath = ('//table[@class="oe_list_content"]/tbody/tr/'
                  'td[@data-field="{}" and text()="{}"]'.format(
                      data_field, value))
 
-        attempts = 2
-        elem = None
-        counter = 0
-        while not elem and counter < attempts:
-            elems = self.webdriver.find_elements_by_xpath(xpath)
-            try:
-                elem = next(e for e in elems if e.is_displayed())
-            except StopIteration:
-                counter += 1
-                time.sleep(10)
-        if not elem:
+        # Wait for row to be rendered.
+        try:
+            elem = self.wait_until(any_visible_element(By.XPATH, xpath),
+                                   timeout)
+        except TimeoutException:
             raise RuntimeError('Could not find row with {}'.format(value))
 
         if click_column:
@@ -602,8 +991,11 @@ class OdooUI(object):
 
         self.clear_search_facets()
         self.search_for(module_name)
-        row_data = self.get_rows_from_list(column, module_name)
-        if row_data[0]['Status'] == 'Installed' and upgrade is False:
+        row = next(self.iter_list_rows(column, module_name), None)
+        if row is None:
+            raise RuntimeError('Could not find row with {}'.format(
+                module_name))
+        if row['Status'] == 'Installed' and upgrade is False:
             return
 
         self.click_list_column(column, module_name)
@@ -611,6 +1003,8 @@ class OdooUI(object):
             '//button[@class="oe_button oe_form_button oe_highlight"]')
         with self.wait_for_ajax_load(timeout):
             btn.click()
+        # Installed module may add menus.
+        menu.invalidate(self.base_url, self.dbname)
 
     def switch_to_view(self, view_name):
         """Switch to list, form or kanban view
@@ -679,7 +1073,11 @@ class OdooUI(object):
                                                                   model_name))
         elem = self.wait_for_visible_element_by_xpath(xpath)
         elem.click()
-        time.sleep(0.5)
+        # Wait for autocomplete menu to be populated.
+        self.wait_until(any_visible_element(
+            By.XPATH,
+            '//ul[contains(@class, "ui-autocomplete")]/'
+            'li[contains(@class, "ui-menu-item")]'))
 
     def get_edit_field_from_label_text(self, label_text):
         """Get the editable field which belongs to a label.
@@ -841,46 +1239,23 @@ class OdooUI(object):
             self.click_list_column(search_field, value)
 
     def wait_for_visible_element_by_xpath(self, xpath, timeout=10, attempts=2):
-        """Find an element by XPath and wait until it is visible. Will try up
-        to <attempts> times with a timeout of <timeout> seconds each time."""
-
-        tries = 0
-        elem = None
-
-        while tries < attempts and elem is None:
-            try:
-                condition = expected_conditions.visibility_of_element_located(
-                    (By.XPATH, xpath))
-                elem = ui.WebDriverWait(self.webdriver,
-                                        timeout).until(condition)
-            except TimeoutException:
-                tries += 1
-                if tries == attempts:
-                    raise
+        """Find an element by XPath and wait until it is visible. Will wait
+        up to <attempts> times <timeout> seconds, within the deadline of
+        enclosing waits."""
 
-        return elem
+        condition = expected_conditions.visibility_of_element_located(
+            (By.XPATH, xpath))
+        return self.wait_until(condition, timeout * attempts)
 
     def wait_for_visible_element_by_css_selector(self, selector,
                                                  timeout=10, attempts=2):
-        """Find an element by CSS selector and wait until it is visible. Will
-        try up to <attempts> times with a timeout of <timeout> seconds
-        each time."""
+        """Find an element by CSS selector and wait until it is visible.
+        Will wait up to <attempts> times <timeout> seconds, within the
+        deadline of enclosing waits."""
 
-        tries = 0
-        elem = None
-
-        while tries < attempts and elem is None:
-            try:
-                condition = expected_conditions.visibility_of_element_located(
-                    (By.CSS_SELECTOR, selector))
-                elem = ui.WebDriverWait(self.webdriver,
-                                        timeout).until(condition)
-            except TimeoutException:
-                tries += 1
-                if tries == attempts:
-                    raise
-
-        return elem
+        condition = expected_conditions.visibility_of_element_located(
+            (By.CSS_SELECTOR, selector))
+        return self.wait_until(condition, timeout * attempts)
 
     def click_translate(self, field_name, model):
         """Click the translate button that goes with the specified field"""
@@ -890,16 +1265,21 @@ class OdooUI(object):
         with self.wait_for_ajax_load():
             translate_button.click()
 
-    def go_to_tab(self, tab_name):
-        tab = WebDriverWait(self.webdriver, 10).until(
+    def go_to_tab(self, tab_name, timeout=10):
+        tab = self.wait_until(
             expected_conditions.presence_of_element_located((
                 By.XPATH,
                 "//a[@class='ui-tabs-anchor' and "
                 "@data-bt-testing-original-string='{}']".format(tab_name)
-            ))
-        )
+            )),
+            timeout)
+        # Anchor targets tab panel.
+        panel_id = tab.get_attribute('href').rsplit('#', 1)[-1]
         tab.click()
-        time.sleep(1)
+        self.wait_until(
+            expected_conditions.visibility_of_element_located((
+                By.ID, panel_id)),
+            timeout)
 
     def page(self, name):
         """ click on the given page if found """
@@ -927,13 +1307,15 @@ class OdooPage():
 
 
 class View(object):
+    _audited = True
+
     def __init__(self, ui, model, *args, **kwargs):
         self.ui = ui
         self.model = model
 
     def get_field(self, field_name, model=None):
 
-        return WebDriverWait(self.ui.webdriver, 10).until(
+        return self.ui.wait_until(
             expected_conditions.presence_of_element_located((
                 By.XPATH,
                 "//*["
@@ -1,6 +1,158 @@
+"""Wait for conditions in browser.
+
+Waits share one engine, :func:`until`: it polls with adaptive backoff, uses
+a monotonic clock and honours deadlines of enclosing :func:`deadline` blocks,
+so that nested waits cannot exceed the timeout of outer ones. On timeout, it
+raises :class:`WaitTimeout` with the name of the condition and the time spent.
+
+"""
+import contextlib
+import ctypes
+import ctypes.util
+import threading
 import time
 
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+
+
+def _monotonic_clock():
+    """Return function returning seconds from a monotonic clock.
+
+    Python 2 has no ``time.monotonic()``: use ``clock_gettime()`` if
+    available, else fall back to wall clock.
+
+    """
+    if hasattr(time, 'monotonic'):
+        return time.monotonic
+
+    class timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+    try:
+        librt = ctypes.CDLL(ctypes.util.find_library('rt') or
+                            ctypes.util.find_library('c'), use_errno=True)
+        clock_gettime = librt.clock_gettime
+    except (OSError, AttributeError):
+        return time.time
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+    CLOCK_MONOTONIC = 1  # Linux.
+
+    def monotonic():
+        t = timespec()
+        if clock_gettime(CLOCK_MONOTONIC, ctypes.pointer(t)) != 0:
+            return time.time()
+        return t.tv_sec + t.tv_nsec * 1e-9
+    return monotonic
+
+
+#: Monotonic clock, in seconds.
+clock = _monotonic_clock()
+
+#: First and maximum delay between two polls, in seconds.
+POLL_START = 0.01
+POLL_MAX = 0.5
+
+#: Exceptions meaning "condition not met yet" while polling.
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+_local = threading.local()
+
+
+class WaitTimeout(TimeoutException):
+    """Condition was not met before deadline."""
+
+
+#: JavaScript returning True if jQuery is loaded and has no pending request.
+JQUERY_INACTIVE_SCRIPT = \
+    "return (window.jQuery != null) && (jQuery.active === 0);"
+
+#: JavaScript installing ``window.odooseleniumIdle`` in the page, once.
+#: The tracker counts pending JSON-RPC requests (long-polling excluded) and
+#: tells whether Odoo shows ``.oe_loading`` or blockUI overlays. Requests
+#: sent before the tracker was installed, e.g. by a page which just loaded,
+#: are only known to ``jQuery.active``: they keep Odoo busy too.
+IDLE_TRACKER_SCRIPT = """
+if (!window.odooseleniumIdle) {
+    var tracker = window.odooseleniumIdle = {
+        pending: 0, polling: 0, listeners: []};
+    var notify = function () {
+        var listeners = tracker.listeners.slice();
+        for (var i = 0; i < listeners.length; i++) {
+            listeners[i]();
+        }
+    };
+    var counter = function (settings) {
+        return (settings.url || '').indexOf('/longpolling/') === -1 ?
+            'pending' : 'polling';
+    };
+    if (window.jQuery) {
+        jQuery(document).ajaxSend(function (event, xhr, settings) {
+            xhr.odooseleniumCounter = counter(settings);
+            tracker[xhr.odooseleniumCounter]++;
+            notify();
+        }).ajaxComplete(function (event, xhr, settings) {
+            if (xhr.odooseleniumCounter) {
+                tracker[xhr.odooseleniumCounter]--;
+            }
+            // jQuery.active is decremented after ajaxComplete handlers.
+            setTimeout(notify, 0);
+        });
+    }
+    tracker.busy = function () {
+        if (document.readyState !== 'complete' || tracker.pending > 0) {
+            return true;
+        }
+        // Requests in flight, other than tracked long-polling ones.
+        if (window.jQuery && jQuery.active > tracker.polling) {
+            return true;
+        }
+        if (document.querySelector('body.oe_wait')) {
+            return true;
+        }
+        var overlays = document.querySelectorAll('.oe_loading, .blockUI');
+        for (var i = 0; i < overlays.length; i++) {
+            if (overlays[i].offsetWidth || overlays[i].offsetHeight) {
+                return true;
+            }
+        }
+        return false;
+    };
+    if (window.MutationObserver) {
+        new MutationObserver(notify).observe(document.documentElement, {
+            attributes: true, attributeFilter: ['class', 'style'],
+            childList: true, subtree: true});
+    }
+    document.addEventListener('readystatechange', notify);
+}
+"""
+
+#: Asynchronous JavaScript calling back as soon as Odoo has been idle for
+#: ``arguments[0]`` milliseconds. Installs the tracker if necessary.
+WAIT_FOR_IDLE_SCRIPT = IDLE_TRACKER_SCRIPT + """
+var quiet = arguments[0];
+var callback = arguments[arguments.length - 1];
+var tracker = window.odooseleniumIdle;
+var timer = null;
+var check = function () {
+    if (tracker.busy()) {
+        clearTimeout(timer);
+        timer = null;
+    } else if (timer === null) {
+        timer = setTimeout(function () {
+            timer = null;
+            if (tracker.busy()) {
+                return;
+            }
+            tracker.listeners.splice(tracker.listeners.indexOf(check), 1);
+            callback(true);
+        }, quiet);
+    }
+};
+tracker.listeners.push(check);
+check();
+"""
 
 
 def loading_displayed(driver):
@@ -30,26 +182,125 @@ def jquery_inactive(driver):
     Tip from book "Mastering Selenium WebDriver" by Mark Collin.
 
     """
-    return driver.execute_script(
-        "return (window.jQuery != null) && (jQuery.active === 0);"
-    )
+    return driver.execute_script(JQUERY_INACTIVE_SCRIPT)
+
+
+def _deadlines():
+    if not hasattr(_local, 'deadlines'):
+        _local.deadlines = []
+    return _local.deadlines
+
+
+@contextlib.contextmanager
+def deadline(timeout):
+    """Bound every wait in ``with`` block to ``timeout`` seconds overall.
+
+    Deadlines nest: an inner block cannot extend the deadline of an outer
+    one.
+
+    """
+    deadlines = _deadlines()
+    end = clock() + timeout
+    if deadlines:
+        end = min(end, deadlines[-1])
+    deadlines.append(end)
+    try:
+        yield
+    finally:
+        deadlines.pop()
+
+
+def remaining(timeout):
+    """Return seconds left for a wait of ``timeout``, given deadlines."""
+    deadlines = _deadlines()
+    if deadlines:
+        timeout = min(timeout, deadlines[-1] - clock())
+    return max(timeout, 0)
+
+
+def describe(condition):
+    """Return human-readable name of ``condition``."""
+    name = getattr(condition, '__name__', None) or type(condition).__name__
+    locator = getattr(condition, 'locator', None)
+    if locator:
+        name = '{0} {1}'.format(name, locator)
+    return name
+
+
+def until(condition, timeout=10, name=None):
+    """Return ``condition()`` as soon as it is true, or raise WaitTimeout.
+
+    ``condition`` is polled with delays growing from :data:`POLL_START` to
+    :data:`POLL_MAX`, for at most ``timeout`` seconds and never beyond the
+    deadline of enclosing :func:`deadline` blocks.
+
+    """
+    start = clock()
+    end = start + remaining(timeout)
+    delay = POLL_START
+    while True:
+        try:
+            value = condition()
+        except IGNORED_EXCEPTIONS:
+            value = None
+        if value:
+            return value
+        now = clock()
+        if now >= end:
+            raise WaitTimeout('Timed out after {0:.2f}s waiting for {1}'
+                              .format(now - start,
+                                      name or describe(condition)))
+        time.sleep(min(delay, end - now))
+        delay = min(delay * 1.5, POLL_MAX)
+
+
+#: Timeout of asynchronous scripts restored by :func:`wait_for_odoo_idle`,
+#: in seconds.
+SCRIPT_TIMEOUT = 30
+
+
+def install_idle_tracker(driver):
+    """Install Odoo idle tracker in current page of web driver.
+
+    Install the tracker *before* triggering an action, so that JSON-RPC
+    requests sent by the action are counted. Installing twice is harmless.
+
+    """
+    driver.execute_script(IDLE_TRACKER_SCRIPT)
+
+
+def wait_for_odoo_idle(driver, timeout=10, quiet=0.05):
+    """Block until Odoo web client is idle, or raise ``WaitTimeout``.
+
+    Odoo is idle when no JSON-RPC request is pending and no loading indicator
+    is displayed, for at least ``quiet`` seconds. Waiting happens in the
+    browser: Python sends one asynchronous script, which returns as soon as
+    Odoo is idle.
+
+    """
+    start = clock()
+    timeout = remaining(timeout)
+    if timeout <= 0:
+        raise WaitTimeout('Deadline exceeded before waiting for Odoo idle')
+    driver.set_script_timeout(timeout)
+    try:
+        driver.execute_async_script(WAIT_FOR_IDLE_SCRIPT, int(quiet * 1000))
+    except TimeoutException:
+        raise WaitTimeout('Timed out after {0:.2f}s waiting for Odoo idle'
+                          .format(clock() - start))
+    finally:
+        # Do not leave what remained of deadline to later scripts.
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
 
 
 def wait_for(condition_function, timeout=10):
     """Wait until condition_function returns True or raise timeout exception.
 
-    The ``condition_function`` must return a boolean.
+    The ``condition_function`` must return a boolean. See :func:`until`.
 
     """
-    start_time = time.time()
-    while time.time() < start_time + timeout:
-        if condition_function():
-            return True
-        else:
-            time.sleep(0.1)
-    raise Exception(
-        'Timeout waiting for {}'.format(condition_function.__name__)
-    )
+    until(condition_function, timeout)
+    return True
 
 
 class wait_for_new_page_load(object):
@@ -79,13 +330,25 @@ class wait_for_new_page_load(object):
 
 
 class wait_for_body_odoo_load(object):
-    """Wait for Odoo page loading."""
-    def __init__(self, browser):
+    """Wait for Odoo page loading.
+
+    If ``idle`` is True, wait with the in-page idle tracker (see
+    :func:`wait_for_odoo_idle`) instead of polling jQuery state.
+
+    """
+    def __init__(self, browser, idle=False):
         self.browser = browser
+        self.idle = idle
 
     def __enter__(self):
-        """Do nothing."""
+        """Install idle tracker if necessary."""
+        if self.idle:
+            install_idle_tracker(self.browser)
 
     def __exit__(self, *args):
         """Wait for the page to be loaded after doing the web action..."""
-        WebDriverWait(self.browser, 10).until(jquery_inactive)
+        if self.idle:
+            wait_for_odoo_idle(self.browser, 10)
+        else:
+            until(lambda: jquery_inactive(self.browser), 10,
+                  'jQuery inactive')
@@ -42,6 +42,7 @@ TEST_REQUIREMENTS = ['tox']
 CMDCLASS = {}
 EXTRA_REQUIREMENTS = {
     'test': TEST_REQUIREMENTS,
+    'fake': ['lxml', 'cssselect'],
 }
 
 
@@ -2,9 +2,11 @@ import json
 import os
 
 from odooselenium import TestCase
+from odooselenium.runner import expected_duration
 
 
 class TestAccounting(TestCase):
+    @expected_duration(300)
     def test_setup_module(self):
         self.ui.go_to_module('Settings')
         self.ui.install_module('Accounting and Finance', timeout=300,
@@ -0,0 +1,131 @@
+"""Tests around :mod:`odooselenium.blocking`, using a stub Odoo server."""
+import BaseHTTPServer
+import threading
+import time
+import urllib2
+
+import pytest
+
+from odooselenium import blocking
+from odooselenium import browsers
+
+
+class StubOdooHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serve a page, an image, a slow request and a streamed response."""
+    def _respond(self):
+        self.server.paths.append(self.path)
+        if self.path.endswith('/poll'):
+            time.sleep(0.5)
+        if self.path == '/web/content':
+            # No Content-Length: response ends when connection closes.
+            self.send_response(200)
+            self.end_headers()
+            for index in range(100):
+                self.wfile.write('x' * 1000)
+            return
+        if self.path.startswith('/web/binary/image'):
+            body, content_type = 'x' * 1000, 'image/png'
+        else:
+            body, content_type = '<html>{0}</html>'.format(self.path), \
+                'text/html'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), StubOdooHandler)
+    #: Paths requested from stub Odoo.
+    server.paths = []
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    server.url = 'http://127.0.0.1:{0}'.format(server.server_port)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def server_url(server):
+    return server.url
+
+
+@pytest.fixture
+def proxy():
+    proxy = blocking.BlockingProxy()
+    proxy.start()
+    yield proxy
+    proxy.stop()
+
+
+def fetch(proxy, url):
+    opener = urllib2.build_opener(urllib2.ProxyHandler({
+        'http': 'http://{0}'.format(proxy.address)}))
+    response = opener.open(url, timeout=5)
+    return response.getcode(), response.read()
+
+
+def test_blocked_requests_are_counted(server, server_url, proxy):
+    """Blocked URLs get empty responses, others are forwarded."""
+    assert fetch(proxy, server_url + '/web?debug=') == \
+        (200, '<html>/web?debug=</html>')
+    assert fetch(proxy, server_url + '/web/binary/image?id=1') == (204, '')
+    assert fetch(proxy, server_url + '/web/binary/image?id=1') == (204, '')
+    assert fetch(proxy, server_url + '/web/static/src/img/favicon.ico')[0] \
+        == 200
+    assert proxy.stats() == {'requests': 4, 'blocked': 2}
+    assert proxy.blocked == {'*/web/binary/image*': 2}
+    # Odoo never sees blocked requests.
+    assert server.paths == ['/web?debug=', '/web/static/src/img/favicon.ico']
+
+    proxy.reset()
+    assert proxy.stats() == {'requests': 0, 'blocked': 0}
+
+
+def test_allowlist_wins(server_url, proxy):
+    proxy.allowlist = ['*/web/binary/image?id=2']
+    assert fetch(proxy, server_url + '/web/binary/image?id=2')[0] == 200
+    assert fetch(proxy, server_url + '/web/binary/image?id=3')[0] == 204
+
+
+def test_web_client_images_are_forwarded(server_url, proxy):
+    """OdooUI waits for some static images, e.g. many2one drop down."""
+    url = server_url + '/web/static/src/img/down-arrow.png'
+    assert fetch(proxy, url)[0] == 200
+    assert fetch(proxy, server_url + '/web/image/res.users/1/image')[0] == 204
+
+
+def test_slow_responses_are_waited_for(server_url):
+    """Timeout only bounds connection, e.g. module install takes minutes."""
+    proxy = blocking.BlockingProxy(timeout=0.1)
+    proxy.start()
+    try:
+        assert fetch(proxy, server_url + '/longpolling/poll')[0] == 200
+    finally:
+        proxy.stop()
+
+
+def test_responses_are_streamed(server_url, proxy):
+    """Responses without Content-Length are forwarded in chunks."""
+    assert fetch(proxy, server_url + '/web/content') == (200, 'x' * 100000)
+
+
+def test_browser_options():
+    """Browsers are told to proxy localhost too."""
+    options = dict(browsers.get_profile('chrome'), proxy='127.0.0.1:3128')
+    assert browsers.chrome_arguments(options) == [
+        '--proxy-server=http://127.0.0.1:3128',
+        '--proxy-bypass-list=<-loopback>']
+    options['browser'] = 'firefox'
+    preferences = browsers.firefox_preferences(options)
+    assert preferences['network.proxy.http_port'] == 3128
+    assert preferences['network.proxy.no_proxies_on'] == ''
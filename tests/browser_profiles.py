@@ -0,0 +1,50 @@
+"""Tests around :mod:`odooselenium.browsers`."""
+import pytest
+
+from odooselenium import browsers
+
+
+def test_default_profile_from_environment(monkeypatch):
+    monkeypatch.delenv('ODOOSELENIUM_BROWSER', raising=False)
+    assert browsers.default_profile() == 'chrome'
+    assert browsers.chrome_arguments(browsers.get_profile()) == []
+    monkeypatch.setenv('ODOOSELENIUM_BROWSER', 'firefox-headless')
+    assert browsers.get_profile()['browser'] == 'firefox'
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        browsers.get_profile('netscape')
+
+
+def test_lean_profiles():
+    """Lean profiles disable images, GPU and background throttling."""
+    arguments = browsers.chrome_arguments(browsers.get_profile('chrome-lean'))
+    for argument in ('--headless', '--window-size=1280,1024',
+                     '--disable-gpu', '--disable-extensions',
+                     '--blink-settings=imagesEnabled=false',
+                     '--disable-background-timer-throttling',
+                     '--disable-dev-shm-usage'):
+        assert argument in arguments
+    assert browsers.chrome_preferences(
+        browsers.get_profile('chrome-lean')) == \
+        {'profile.managed_default_content_settings.images': 2}
+
+    preferences = browsers.firefox_preferences(
+        browsers.get_profile('firefox-lean'))
+    assert preferences['permissions.default.image'] == 2
+    assert preferences['layers.acceleration.disabled'] is True
+    assert browsers.firefox_preferences(browsers.get_profile('firefox')) == {}
+
+
+def test_headless_versions():
+    """Browsers too old for headless mode are refused, not started headed."""
+    assert browsers.headless_error('chrome', {
+        'browser': '59.0.3071.86', 'chromedriver': '2.29.461571'}) is None
+    assert browsers.headless_error('chrome', {
+        'browser': '59.0.3071.86', 'chromedriver': '2.25.426924'}) == \
+        'headless chrome needs chromedriver 2.29 or later, got 2.25.426924'
+    assert browsers.headless_error('firefox', {'selenium': '2.53.0'}) == \
+        'headless firefox needs selenium 3 or later, got 2.53.0'
+    # Unknown versions are not checked.
+    assert browsers.headless_error('firefox', {'selenium': '3.4.0'}) is None
@@ -0,0 +1,50 @@
+"""Tests around :mod:`odooselenium.instrument`."""
+import StringIO
+
+from odooselenium import instrument
+
+
+class FakeExecutor(object):
+    def execute(self, command, params):
+        return {'status': 0, 'value': 'text'}
+
+
+class FakeWebDriver(object):
+    def __init__(self):
+        self.command_executor = FakeExecutor()
+
+    def execute(self, command, params=None):
+        return self.command_executor.execute(command, params or {})
+
+
+class Helper(object):
+    _audited = True
+
+    def __init__(self, webdriver):
+        self.webdriver = webdriver
+
+    def get_text(self):
+        return self.webdriver.execute('getElementText', {'id': '1'})
+
+
+def test_commands_are_attributed_to_actions():
+    """Commands are counted per enclosing OdooUI-like method."""
+    webdriver = FakeWebDriver()
+    recorder = instrument.CommandRecorder()
+    recorder.install(webdriver)
+    helper = Helper(webdriver)
+    helper.get_text()
+    helper.get_text()
+    webdriver.execute('getTitle')
+    recorder.uninstall()
+    webdriver.execute('getTitle')
+
+    assert recorder.actions['Helper.get_text']['commands'] == 2
+    assert recorder.actions['Helper.get_text']['bytes'] > 0
+    assert recorder.actions[instrument.OUTSIDE_ACTION]['commands'] == 1
+    assert recorder.commands == {'getElementText': 2, 'getTitle': 1}
+    assert recorder.totals()['commands'] == 3
+
+    stream = StringIO.StringIO()
+    recorder.report(stream)
+    assert 'Helper.get_text' in stream.getvalue()
@@ -0,0 +1,336 @@
+"""Tests around :mod:`odooselenium.fake` and OdooUI methods running on it."""
+import json
+import os
+import StringIO
+import time
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+import lxml.html  # NoQA
+
+from odooselenium import instrument  # NoQA
+from odooselenium import menu  # NoQA
+from odooselenium import timing  # NoQA
+from odooselenium import ui as odoo_ui  # NoQA
+from odooselenium.fake import FakeWebDriver  # NoQA
+from odooselenium.ui import OdooUI  # NoQA
+from selenium.common.exceptions import StaleElementReferenceException  # NoQA
+
+
+#: Directory of captured Odoo web client pages.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'fixtures')
+
+#: URL of web client, as used in fixtures.
+WEB_URL = 'http://localhost:8069/web'
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name)) as fixture_file:
+        return fixture_file.read()
+
+
+def list_driver():
+    """Return driver on list view, whose pager loads second page."""
+    driver = FakeWebDriver(
+        fixture('list_view.html'), url=WEB_URL,
+        menus=json.loads(fixture('menus.json')))
+    driver.browser.on_click(
+        '//a[@data-pager-action="next"]',
+        lambda browser, element: browser.load_html(
+            fixture('list_view_page2.html')))
+    return driver
+
+
+def test_find_elements_and_visibility():
+    """Fake driver finds elements and reports visibility like a browser."""
+    driver = list_driver()
+    menus = driver.find_elements_by_css_selector('.oe_secondary_menu')
+    assert [item.is_displayed() for item in menus] == [True, False]
+    # Like WebDriver, text of hidden elements is empty.
+    assert menus[1].find_element_by_css_selector('.oe_menu_text').text == ''
+    assert driver.find_element_by_xpath('//h2').text == 'Customers'
+    assert driver.title == 'Customers - Odoo'
+    cell = driver.find_element_by_xpath('//td[@data-field="email"]')
+    assert cell.get_attribute('class') == \
+        'oe_list_field_cell oe_list_field_char'
+    assert cell.get_attribute('missing') is None
+
+
+def test_elements_of_previous_page_are_stale():
+    driver = list_driver()
+    body = driver.find_element_by_xpath('//body')
+    driver.get('http://localhost:8069/web/login')
+    with pytest.raises(StaleElementReferenceException):
+        body.is_enabled()
+
+
+def test_list_rows_in_page_matches_webdriver():
+    """Both list extractions agree, in-page one sends a single command."""
+    ui = OdooUI(list_driver())
+    recorder = instrument.CommandRecorder()
+    recorder.install(ui.webdriver)
+    rows = ui.get_rows_from_list()
+    commands = recorder.totals()['commands']
+    recorder.reset()
+    assert ui.get_rows_from_list(in_page=True) == rows
+    assert recorder.totals()['commands'] == 1
+    assert commands > 10
+    assert len(rows) == 3
+    assert rows[0] == {'Name': 'Agrolait', 'Phone': '+32 10 588 558',
+                       'Email': 'info@agrolait.com',
+                       'Salesperson': 'Administrator'}
+    assert ui.get_rows_from_list('display_name', 'Camptocamp') == [rows[1]]
+
+
+def delete_rows(browser, rows):
+    """Ask confirmation like Odoo, unless suppressed, then delete ``rows``."""
+    if not browser.confirm_suppressed:
+        browser.alert_text = 'Do you really want to remove these records?'
+    for row in rows:
+        row.getparent().remove(row)
+
+
+def test_bulk_select_and_delete():
+    """Rows are selected and deleted in a few commands, without alerts."""
+    ui = OdooUI(list_driver())
+    browser = ui.webdriver.browser
+    browser.on_click('//button[normalize-space(text())="More"]',
+                     lambda browser, element: element.getnext().set(
+                         'class', 'oe_dropdown_menu oe_opened'))
+    browser.on_click('//a[normalize-space(text())="Delete"]',
+                     lambda browser, element: delete_rows(browser, [
+                         checkbox.getparent().getparent()
+                         for checkbox in browser.document.xpath(
+                             '//tbody//input[@checked]')]))
+    recorder = instrument.CommandRecorder()
+    recorder.install(ui.webdriver)
+    assert ui.select_list_items('user_id', 'Demo User', in_page=True) == 1
+    assert ui.select_list_items('user_id', 'Demo User', in_page=True) == 1
+    assert recorder.totals()['commands'] == 2
+    assert [row['Name'] for row in ui.get_rows_from_list(in_page=True)] == \
+        ['Agrolait', 'Camptocamp', 'China Export']
+    ui.delete_from_list(suppress_confirm=True)
+    assert browser.alert_text is None
+    assert not browser.confirm_suppressed
+    assert [row['Name'] for row in ui.get_rows_from_list(in_page=True)] == \
+        ['Agrolait', 'China Export']
+
+    browser.on_click('//thead//input',
+                     lambda browser, element: [
+                         checkbox.set('checked', 'checked')
+                         for checkbox in browser.document.xpath('//input')])
+    ui.select_all_list_items()
+    ui.select_all_list_items()
+    ui.select_list_items('display_name', 'Agrolait', in_page=True)
+    assert len(browser.document.xpath('//tbody//input[@checked]')) == 2
+    ui.delete_from_list()  # Accepts alert.
+    assert ui.get_rows_from_list(in_page=True) == []
+
+
+def test_bulk_delete_from_form_list():
+    driver = FakeWebDriver(fixture('form_view.html'), url=WEB_URL)
+    driver.browser.on_click(
+        '//td[@class="oe_list_record_delete"]',
+        lambda browser, element: delete_rows(browser, [element.getparent()]))
+    ui = OdooUI(driver)
+    ui.delete_item_from_form_list('function', 'Analyst', in_page=True)
+    assert driver.browser.alert_text is None
+    assert [row['Name'] for row in ui.get_rows_from_form_list()] == \
+        ['Thomas Passot']
+    with pytest.raises(RuntimeError):
+        ui.delete_item_from_form_list('function', 'Analyst', in_page=True)
+
+
+def test_go_to_module_and_view():
+    """Menu clicks and menu index both change URL fragment."""
+    ui = OdooUI(list_driver())
+    ui.go_to_module('Settings')
+    assert ui.get_url_fragments() == {'menu_id': '2', 'action': '7'}
+    ui.go_to_view('Quotations')
+    assert ui.get_url_fragments() == {'menu_id': '12', 'action': '6'}
+
+    menu._indexes.clear()
+    ui = OdooUI(list_driver(), menu_index=True)
+    ui.go_to_module('Settings')
+    ui.go_to_view('Local Modules')
+    assert ui.get_url_fragments() == {'menu_id': '21', 'action': '7'}
+
+    # Menu and action are given, so that the web client can reload an
+    # action which is already open.
+    calls = []
+    browser = ui.webdriver.browser
+    browser.scripts[odoo_ui.GO_TO_MENU_SCRIPT] = \
+        lambda browser, *args: calls.append(args)
+    ui.go_to_view('Local Modules')
+    assert [(str(menu_id), str(action_id))
+            for fragment, menu_id, action_id in calls] == [('21', '7')]
+
+
+def test_click_list_column_goes_to_next_page():
+    ui = OdooUI(list_driver())
+    clicked = []
+    ui.webdriver.browser.on_click(
+        '//td[@data-field="display_name"]',
+        lambda browser, element: clicked.append(element.text))
+    ui.click_list_column('display_name', 'Think Big Systems')
+    assert clicked == ['Think Big Systems']
+    with pytest.raises(RuntimeError):
+        ui.click_list_column('display_name', 'Unknown')
+
+
+def test_iter_list_rows_is_lazy():
+    """Next page is loaded once first page is consumed, not before."""
+    ui = OdooUI(list_driver())
+    pages = []
+    ui.webdriver.browser.on_click(
+        '//a[@data-pager-action="next"]',
+        lambda browser, element: [pages.append(2), browser.load_html(
+            fixture('list_view_page2.html'))])
+    rows = ui.iter_list_rows(in_page=True)
+    assert next(rows)['Name'] == 'Agrolait'
+    assert [row['Name'] for row in rows] == [
+        'Camptocamp', 'China Export', 'Delta PC', 'Think Big Systems']
+    assert pages == [2]
+    # Last page: next would wrap around to first page.
+    assert list(ui.iter_list_rows('display_name', 'Agrolait')) == []
+    assert pages == [2]
+
+
+def test_iter_list_rows_raises_page_limit():
+    ui = OdooUI(list_driver())
+    browser = ui.webdriver.browser
+    browser.on_click(
+        '//span[@class="oe_list_pager_state"]',
+        lambda browser, element: element.append(lxml.html.fragment_fromstring(
+            '<select><option value="80">80</option>'
+            '<option value="NaN">Unlimited</option></select>')))
+    browser.on_click(
+        '//option[@value="NaN"]',
+        lambda browser, element: browser.load_html(
+            fixture('list_view.html').replace('1-3 of 5', '1-5 of 5')))
+    rows = list(ui.iter_list_rows(page_limit='unlimited'))
+    assert [row['Name'] for row in rows] == [
+        'Agrolait', 'Camptocamp', 'China Export']
+
+
+def test_rpc_calls_are_attributed_to_actions():
+    """JSON-RPC calls are collected once per AJAX wait."""
+    ui = OdooUI(list_driver(), trace_rpc=True)
+    browser = ui.webdriver.browser
+    browser.on_click(
+        '//a[@data-pager-action="next"]',
+        lambda browser, element: [browser.rpc_calls.extend([
+            {'url': '/web/dataset/search_read', 'model': 'res.partner',
+             'method': 'search_read', 'request_bytes': 200,
+             'response_bytes': 3000, 'start': 1000.0, 'end': 1040.0,
+             'status': 200},
+            {'url': '/web/dataset/call_kw', 'model': 'res.partner',
+             'method': 'read', 'request_bytes': 100,
+             'response_bytes': 500, 'start': 1020.0, 'end': 1050.0,
+             'status': 200}]), time.sleep(0.06), browser.load_html(
+                 fixture('list_view_page2.html'))])
+    ui.click_list_column('display_name', 'Think Big Systems')
+    counters = ui.rpc_trace.actions['OdooUI.click_list_column']
+    assert counters['calls'] == 2
+    assert counters['bytes'] == 3800
+    assert counters['server'] == 0.05
+    assert counters['client'] == pytest.approx(counters['seconds'] - 0.05)
+    assert [call['action'] for call in ui.rpc_trace.calls] == \
+        ['OdooUI.click_list_column'] * 2
+    assert ui.rpc_trace.methods()[('res.partner', 'read')] == \
+        {'calls': 1, 'seconds': 0.03}
+
+
+def test_rpc_calls_of_failed_block_are_collected():
+    """Calls sent before an error are not left to next action."""
+    ui = OdooUI(list_driver(), trace_rpc=True)
+    browser = ui.webdriver.browser
+    with pytest.raises(RuntimeError):
+        with ui._tracing_rpc():
+            browser.rpc_calls.append(
+                {'url': '/web/dataset/call_kw', 'model': 'res.partner',
+                 'method': 'write', 'request_bytes': 100,
+                 'response_bytes': 50, 'start': 1000.0, 'end': 1010.0,
+                 'status': 200})
+            raise RuntimeError('Record is locked')
+    assert browser.rpc_calls == []
+    assert [call['method'] for call in ui.rpc_trace.calls] == ['write']
+
+
+def test_browser_timings_are_collected_after_loads():
+    ui = OdooUI(list_driver(), collect_timings=True)
+    timings = iter([
+        {'navigation': None,
+         'resources': [{'name': WEB_URL + '/binary/image', 'type': 'img',
+                        'start': 10.0, 'duration': 5.0, 'size': 1200}],
+         'longtasks': [{'start': 12.0, 'duration': 130.0}]},
+        {'navigation': None, 'resources': [], 'longtasks': []},
+        {'navigation': {'responseEnd': 80.0, 'loadEventEnd': 900.0},
+         'resources': [], 'longtasks': [{'start': 50.0, 'duration': 40.0}]},
+    ])
+    ui.webdriver.browser.scripts[timing.PAGE_TIMING_SCRIPT] = \
+        lambda browser: next(timings)
+    ui.click_list_column('display_name', 'Think Big Systems')
+    with ui.wait_for_page_load():
+        ui.webdriver.get(WEB_URL)
+    assert [(sample['event'], sample['action'])
+            for sample in ui.timings.samples] == [
+        ('ajax_load', 'OdooUI.click_list_column'),
+        ('ajax_load', 'OdooUI.click_list_column'),
+        ('page_load', 'OdooUI.wait_for_page_load')]
+    assert ui.timings.totals() == {
+        'OdooUI.click_list_column': {'pages': 0, 'resources': 1,
+                                     'bytes': 1200, 'longtasks': 1,
+                                     'blocking': 0.08},
+        'OdooUI.wait_for_page_load': {'pages': 1, 'resources': 0,
+                                      'bytes': 0, 'longtasks': 1,
+                                      'blocking': 0.0}}
+    output = StringIO.StringIO()
+    ui.timings.to_json(output)
+    assert json.loads(output.getvalue())[2]['navigation']['loadEventEnd'] \
+        == 900.0
+
+
+def test_form_fields():
+    """Form fields are read and filled through web_selenium attributes."""
+    driver = FakeWebDriver(fixture('form_view.html'), url=WEB_URL)
+    driver.browser.on_click(
+        '//a[@class="ui-tabs-anchor"]',
+        lambda browser, element: [
+            panel.set('style', '' if panel.get('id') ==
+                      element.get('href')[1:] else 'display: none;')
+            for panel in browser.document.find_class('ui-tabs-panel')])
+    ui = OdooUI(driver)
+    assert ui.get_value('name', 'res.partner') == 'Agrolait'
+    assert ui.get_value('is_company', 'res.partner') is True
+    assert ui.get_value('lang', 'res.partner') == 'English'
+
+    ui.enter_data('phone', 'res.partner', '+32 2 290 34 90')
+    ui.enter_data('is_company', 'res.partner', False)
+    ui.enter_data('lang', 'res.partner', 'French')
+    assert ui.get_value('phone', 'res.partner') == '+32 2 290 34 90'
+    assert ui.get_value('is_company', 'res.partner') is False
+    assert ui.get_value('lang', 'res.partner') == 'French'
+
+    assert [row['Name'] for row in ui.get_rows_from_form_list()] == \
+        ['Michel Fletcher', 'Thomas Passot']
+    ui.go_to_tab('Internal Notes')
+    assert ui.get_value('comment', 'res.partner') == 'Good customer.'
+
+
+def test_wizard_screen():
+    driver = FakeWebDriver(fixture('wizard.html'), url=WEB_URL)
+    driver.browser.on_click(
+        '//button[@data-bt-testing-name="action_next"]',
+        lambda browser, element: browser.load_html(fixture('list_view.html')))
+    ui = OdooUI(driver)
+    ui.wizard_screen([
+        {'field': 'code_digits', 'model': 'account.installer', 'value': '8'},
+        {'field': 'has_default_company', 'model': 'account.installer',
+         'value': True},
+    ])
+    assert driver.title == 'Customers - Odoo'
@@ -0,0 +1,72 @@
+"""Tests around :mod:`odooselenium.connection`, using a stub driver."""
+from multiprocessing.pool import ThreadPool
+
+import pytest
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from odooselenium import connection
+from odooselenium.stubdriver import start_stub_driver
+
+
+@pytest.fixture
+def driver():
+    server = start_stub_driver()
+    yield server
+    server.shutdown()
+
+
+def status(executor):
+    return executor.execute(Command.STATUS, {})['value']
+
+
+def test_connections_are_reused(driver):
+    executor = connection.PooledConnection(driver.url, resolve_ip=False)
+    assert [status(executor) for _ in range(10)] == ['/status'] * 10
+    assert executor.opened == 1
+    executor.close()
+
+
+def test_threads_borrow_own_connections(driver):
+    executor = connection.PooledConnection(driver.url, pool_size=4,
+                                           resolve_ip=False)
+    pool = ThreadPool(4)
+    results = pool.map(lambda index: executor.execute(
+        Command.GET_TITLE, {'sessionId': index})['value'], range(40))
+    pool.close()
+    pool.join()
+    assert results == ['/session/{0}/title'.format(index)
+                       for index in range(40)]
+    assert executor.opened <= 4
+    executor.close()
+
+
+def test_closed_connections_are_replaced(driver):
+    driver.drop_connections = True
+    executor = connection.PooledConnection(driver.url, resolve_ip=False)
+    assert [status(executor) for _ in range(3)] == ['/status'] * 3
+    assert driver.connections == 3
+
+
+def test_install(driver):
+    class StubWebDriver(object):
+        command_executor = RemoteConnection(driver.url, resolve_ip=False)
+
+    webdriver = StubWebDriver()
+    executor = connection.install(webdriver)
+    assert webdriver.command_executor is executor
+    assert isinstance(executor, connection.PooledConnection)
+    assert connection.install(webdriver) is executor
+    assert status(executor) == '/status'
+
+
+def test_install_keep_alive_executor_by_host_name(driver):
+    """Address comes from URL, whatever selenium does with host names."""
+    class StubWebDriver(object):
+        command_executor = RemoteConnection(
+            driver.url.replace('127.0.0.1', 'localhost'), keep_alive=True)
+
+    executor = connection.install(StubWebDriver())
+    assert status(executor) == '/status'
+    assert executor.execute(Command.GET_TITLE, {'sessionId': 'a'}) == \
+        {'status': 0, 'value': '/session/a/title'}
@@ -0,0 +1,83 @@
+"""Tests around :mod:`odooselenium.load`, with stub sessions."""
+import csv
+import json
+import StringIO
+import time
+
+from odooselenium import load
+from odooselenium import wait
+
+
+class StubWebDriver(object):
+    def quit(self):
+        pass
+
+
+class StubUI(object):
+    def __init__(self, index):
+        self.index = index
+        self.webdriver = StubWebDriver()
+        self.started = None
+        self.iterations = 0
+
+
+def scenario(ui, step):
+    if ui.started is None:
+        ui.started = wait.clock()
+    ui.iterations += 1
+    with step('open'):
+        time.sleep(0.01)
+    with step('save'):
+        if ui.index == 1 and ui.iterations == 2:
+            raise RuntimeError('Record is locked')
+        time.sleep(0.02)
+
+
+def test_users_ramp_up_and_loop():
+    users = []
+
+    def factory(index):
+        users.append(StubUI(index))
+        return users[-1]
+
+    start = wait.clock()
+    stats, elapsed = load.run_load(scenario, users=3, duration=0.3,
+                                   ramp_up=0.15, factory=factory)
+    # Only lower bounds are tight: loaded machines may run late.
+    assert 0.3 <= elapsed < 5
+    # Users started at least 0.05s apart from start.
+    users.sort(key=lambda user: user.index)
+    offsets = [user.started - start for user in users]
+    assert offsets[1] >= 0.045
+    assert offsets[2] >= 0.095
+    assert all(offset < elapsed for offset in offsets)
+    summary = dict((step['step'], step) for step in stats.summary(elapsed))
+    assert [step['step'] for step in stats.summary(elapsed)] == \
+        ['open', 'save', '(iteration)']
+    iterations = sum(user.iterations for user in users)
+    assert summary['open']['count'] == iterations
+    assert summary['save']['errors'] == summary['(iteration)']['errors'] == 1
+    assert summary['save']['count'] == iterations - 1
+    assert 0.02 <= summary['save']['p50'] <= summary['save']['p99']
+    assert summary['open']['throughput'] == iterations / elapsed
+
+
+def test_exports():
+    stats = load.LoadStats()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        stats.record('open', seconds)
+    stats.record('open', error=True)
+
+    output = StringIO.StringIO()
+    stats.to_json(output, 2.0, users=4)
+    data = json.loads(output.getvalue())
+    assert data['users'] == 4
+    assert data['steps'] == [{
+        'step': 'open', 'count': 4, 'errors': 1, 'mean': 0.25, 'p50': 0.2,
+        'p95': 0.4, 'p99': 0.4, 'max': 0.4, 'throughput': 2.0}]
+
+    output = StringIO.StringIO()
+    stats.to_csv(output, 2.0)
+    rows = list(csv.DictReader(StringIO.StringIO(output.getvalue())))
+    assert rows[0]['p50'] == '0.2'
+    assert set(rows[0]) == set(load.STEP_COLUMNS)
@@ -0,0 +1,68 @@
+"""Tests around :mod:`odooselenium.menu`."""
+import pytest
+
+from odooselenium.menu import MenuIndex
+
+
+#: Sample of ``/web/menu/load`` result.
+MENU_TREE = {
+    'id': False,
+    'name': 'root',
+    'children': [{
+        'id': 1,
+        'name': 'Accounting',
+        'action': False,
+        'children': [{
+            'id': 2,
+            'name': 'Customers',
+            'action': False,
+            'children': [{
+                'id': 3,
+                'name': 'Customer Invoices',
+                'action': 'ir.actions.act_window,10',
+                'children': [],
+            }],
+        }, {
+            'id': 4,
+            'name': 'Configuration',
+            'action': False,
+            'children': [{
+                'id': 5,
+                'name': 'Accounts',
+                'action': False,
+                'children': [{
+                    'id': 6,
+                    'name': 'Setup your Bank Accounts',
+                    'action': 'ir.actions.act_window,20',
+                    'children': [],
+                }],
+            }],
+        }],
+    }],
+}
+
+
+def test_find_module():
+    """Modules open the action of their first descendant."""
+    index = MenuIndex(MENU_TREE)
+    entry = index.find_module('Accounting')
+    assert entry == {'menu_id': 1, 'action_id': 10}
+    assert MenuIndex.fragment(entry) == 'menu_id=1&action=10'
+
+
+def test_find_view():
+    """Views are found by full path or by path without section."""
+    index = MenuIndex(MENU_TREE)
+    expected = {'menu_id': 6, 'action_id': 20}
+    assert index.find_view('Configuration/Accounts/Setup your Bank Accounts',
+                           'Accounting') == expected
+    assert index.find_view('Accounts/Setup your Bank Accounts',
+                           'Accounting') == expected
+    assert index.find_view('Setup your Bank Accounts') == expected
+
+
+def test_find_view_not_found():
+    """Unknown views raise AssertionError, as OdooUI.go_to_view does."""
+    index = MenuIndex(MENU_TREE)
+    with pytest.raises(AssertionError):
+        index.find_view('Suppliers', 'Accounting')
@@ -0,0 +1,96 @@
+"""Tests around :mod:`odooselenium.history`."""
+from odooselenium import history
+from odooselenium import instrument
+
+
+TEST = 'tests.accounting.TestAccounting.test_setup_module'
+
+
+def record(database, image, seconds, commands=40, other=5.0):
+    run_id = database.start_run('abc123', image)
+    database.add_many(run_id, [
+        (TEST, history.TEST_ACTION, seconds, None),
+        (TEST, 'OdooUI.install_module', seconds - 1, commands),
+        ('tests.res_partner_bank.Test.test_create', history.TEST_ACTION,
+         other, None)])
+    return run_id
+
+
+def test_regressions_against_rolling_baseline(tmpdir):
+    database = history.History(str(tmpdir.join('perf.sqlite')))
+    for seconds in (10.0, 10.2, 9.9, 10.1):
+        record(database, 'odoo:8.0', seconds)
+    # Runs on another image are not part of baseline.
+    record(database, 'odoo:9.0', 30.0, commands=80)
+    record(database, 'odoo:8.0', 13.0, commands=41, other=5.1)
+
+    regressions = database.compare(threshold=0.2)
+    assert [(regression['action'], regression['metric'])
+            for regression in regressions] == [
+        ('OdooUI.install_module', 'seconds'), ('', 'seconds')]
+    assert regressions[1]['baseline'] == 10.05
+    assert round(regressions[1]['change'], 3) == 0.294
+
+    # Not enough history for other image.
+    assert database.compare(threshold=0.2, run_id=5) == []
+    assert database.durations(window=2) == {
+        TEST: 21.5, 'tests.res_partner_bank.Test.test_create': 5.05}
+
+
+def test_runs_without_image_have_own_baseline(tmpdir):
+    database = history.History(str(tmpdir.join('perf.sqlite')))
+    for seconds in (20.0, 20.0, 20.0):
+        record(database, 'odoo:8.0', seconds)
+    for seconds in (10.0, 10.0):
+        record(database, None, seconds)
+    record(database, None, 13.0)
+    # Two runs without image are not enough history.
+    assert database.compare(threshold=0.2) == []
+    assert database.runs(image=None) == [6, 5, 4]
+    assert database.runs() == [6, 5, 4, 3, 2, 1]
+
+
+def test_commands_outside_actions_are_recorded(tmpdir):
+    database = history.History(str(tmpdir.join('perf.sqlite')))
+    run_id = database.start_run()
+    database.add_many(run_id, [(TEST, None, 1.0, 3)])
+    assert database.timings([run_id]) == {
+        (TEST, instrument.OUTSIDE_ACTION): [(1.0, 3)]}
+
+
+def test_noisy_measures_are_not_flagged(tmpdir):
+    database = history.History(str(tmpdir.join('perf.sqlite')))
+    for seconds in (10.0, 16.0, 8.0, 14.0):
+        record(database, None, seconds)
+    record(database, None, 14.0)
+    assert database.compare(threshold=0.2) == []
+
+
+def test_report_command(tmpdir, capsys):
+    path = str(tmpdir.join('perf.sqlite'))
+    assert history.main([path]) == 0
+    assert capsys.readouterr().err == 'No run recorded.\n'
+    database = history.History(path)
+    for seconds in (10.0, 10.0, 10.0, 12.5):
+        record(database, None, seconds)
+    assert history.main([path]) == 1
+    output = capsys.readouterr().err.splitlines()
+    assert output[0].split() == ['test', 'action', 'metric', 'baseline',
+                                 'value', 'change']
+    assert output[1].split() == ['tests.accounting.TestAccounting.'
+                                 'test_setup_module', 'OdooUI.install_module',
+                                 'seconds', '9.000', '11.500', '+28%']
+    assert history.main([path, '--threshold', '0.3']) == 0
+    capsys.readouterr()
+    assert history.main([path, '--run', '42']) == 2
+    assert capsys.readouterr().err == 'No run 42.\n'
+
+
+def test_default_run_from_environment(tmpdir, monkeypatch):
+    path = str(tmpdir.join('perf.sqlite'))
+    run_id = history.History(path).start_run()
+    monkeypatch.setenv('ODOOSELENIUM_RUN', str(run_id))
+    monkeypatch.setattr(history, '_default_history', None)
+    database, default_run = history.default_run(path)
+    assert default_run == run_id
+    assert history.default_run(path) == (database, run_id)
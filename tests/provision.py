@@ -0,0 +1,51 @@
+"""Tests around :mod:`odooselenium.provision`."""
+import StringIO
+
+import pytest
+
+from odooselenium import provision
+
+
+class FakeSession(object):
+    """Serve module states and dependencies, record installations."""
+    def __init__(self):
+        self.calls = []
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        self.calls.append((model, method, args))
+        if model == 'ir.module.module' and method == 'search_read':
+            return [
+                {'id': 1, 'name': 'base', 'state': 'installed'},
+                {'id': 2, 'name': 'account', 'state': 'uninstalled'},
+                {'id': 3, 'name': 'account_accountant',
+                 'state': 'uninstalled'},
+                {'id': 4, 'name': 'web_selenium', 'state': 'uninstalled'},
+                {'id': 5, 'name': 'l10n_broken', 'state': 'uninstallable'},
+            ]
+        if method == 'search_read':
+            return [
+                {'name': 'base', 'module_id': [2, 'Accounting']},
+                {'name': 'account', 'module_id': [3, 'Accountant']},
+                {'name': 'base', 'module_id': [4, 'Web Selenium']},
+            ]
+        return True
+
+
+def test_single_install_of_missing_modules():
+    session = FakeSession()
+    stream = StringIO.StringIO()
+    timings = provision.install_modules(
+        session, ['account_accountant', 'web_selenium', 'base'], stream)
+    assert sorted(timings) == ['install', 'read', 'resolve']
+    assert session.calls[-1] == ('ir.module.module',
+                                 'button_immediate_install', [[2, 3, 4]])
+    assert len(session.calls) == 3
+    assert 'account, account_accountant, web_selenium' in stream.getvalue()
+
+
+def test_unavailable_module():
+    ids, states, dependencies = provision.read_modules(FakeSession())
+    assert dependencies['account_accountant'] == ['account']
+    for name in ('l10n_broken', 'unknown'):
+        with pytest.raises(ValueError):
+            provision.modules_to_install([name], states, dependencies)
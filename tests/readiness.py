@@ -0,0 +1,58 @@
+"""Tests around :func:`odooselenium.rpc.wait_for_server`."""
+import BaseHTTPServer
+import json
+import socket
+import threading
+
+import pytest
+
+from odooselenium import rpc
+
+
+class StartingOdooHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer 503 to first requests, like a proxy in front of Odoo."""
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests += 1
+        if self.server.requests <= self.server.unavailable:
+            self.send_error(503)
+            return
+        body = json.dumps({'result': {'server_version': '8.0'}})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), StartingOdooHandler)
+    server.requests = 0
+    server.unavailable = 3
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    server.url = 'http://127.0.0.1:{0}'.format(server.server_port)
+    yield server
+    server.shutdown()
+
+
+def test_wait_for_server_returns_when_odoo_answers(server):
+    elapsed = rpc.wait_for_server(server.url, timeout=10, interval=0.01)
+    assert server.requests == 4
+    assert 0 < elapsed < 5
+
+
+def test_wait_for_server_timeout():
+    # Find a port nobody listens on.
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    with pytest.raises(RuntimeError):
+        rpc.wait_for_server('http://127.0.0.1:{0}'.format(port), timeout=0.3,
+                            interval=0.05)
@@ -0,0 +1,49 @@
+"""Tests around :mod:`odooselenium.records`."""
+from odooselenium import records
+
+
+class FakeSession(object):
+    """Record ``execute_kw`` calls, emulate a few ORM methods."""
+    def __init__(self):
+        self.calls = []
+        self.records = {}
+        self.next_id = 100
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        self.calls.append((model, method))
+        ids = self.records.setdefault(model, [])
+        if method == 'create':
+            self.next_id += 1
+            ids.append(self.next_id)
+            return self.next_id
+        if method == 'search':
+            wanted = args[0][0][2]
+            return [record_id for record_id in ids if record_id in wanted]
+        if method == 'unlink':
+            for record_id in args[0]:
+                ids.remove(record_id)
+            return True
+
+
+def test_created_records_are_unlinked_per_model():
+    session = FakeSession()
+    fixtures = records.RecordFixtures(session)
+    partner_ids = fixtures.create('res.partner', [{'name': 'Agrolait'},
+                                                  {'name': 'Camptocamp'}])
+    bank_ids = fixtures.create('res.partner.bank', [
+        {'acc_number': '200', 'partner_id': partner_ids[0]}])
+    fixtures.create('res.partner', [{'name': 'China Export'}])
+    assert partner_ids == [101, 102]
+    assert bank_ids == [103]
+    assert fixtures.created == {'res.partner': [101, 102, 104],
+                                'res.partner.bank': [103]}
+
+    # Test deleted one record itself.
+    session.records['res.partner'].remove(102)
+    del session.calls[:]
+    fixtures.unlink_all()
+    assert session.calls == [
+        ('res.partner.bank', 'search'), ('res.partner.bank', 'unlink'),
+        ('res.partner', 'search'), ('res.partner', 'unlink')]
+    assert session.records == {'res.partner': [], 'res.partner.bank': []}
+    assert not fixtures.created
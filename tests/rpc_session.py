@@ -0,0 +1,80 @@
+"""Tests around :mod:`odooselenium.rpc`, using a stub Odoo server."""
+import BaseHTTPServer
+import json
+import threading
+
+import pytest
+
+from odooselenium import rpc
+
+
+class StubOdooHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer JSON routes used by :func:`rpc.authenticated_session`."""
+    def do_POST(self):
+        params = json.loads(
+            self.rfile.read(int(self.headers['Content-Length'])))['params']
+        cookie = self.headers.get('Cookie', '')
+        headers = {}
+        if self.path == '/web/session/authenticate':
+            if params['password'] == 'admin':
+                self.server.logins += 1
+                headers['Set-Cookie'] = 'session_id=abc{0}; Path=/'.format(
+                    self.server.logins)
+                body = {'result': {'uid': 1}}
+            else:
+                body = {'error': {'message': 'Odoo Server Error',
+                                  'data': {'message': 'Access denied'}}}
+        elif self.path == '/web/session/get_session_info':
+            valid = cookie == 'session_id=abc{0}'.format(self.server.logins)
+            body = {'result': {'uid': 1 if valid else None}}
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(body))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), StubOdooHandler)
+    server.logins = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield 'http://127.0.0.1:{0}'.format(server.server_port)
+    server.shutdown()
+    rpc._sessions.clear()
+
+
+def test_authenticated_session_is_cached(server_url):
+    """Valid sessions are reused per (url, db, user)."""
+    session = rpc.authenticated_session(server_url, 'test', 'admin', 'admin')
+    assert session.session_id == 'abc1'
+    again = rpc.authenticated_session(server_url, 'test', 'admin', 'admin')
+    assert again is session
+
+
+def test_authentication_error(server_url):
+    """Odoo errors are raised as :class:`rpc.RPCError`."""
+    with pytest.raises(rpc.RPCError) as error:
+        rpc.authenticated_session(server_url, 'test', 'admin', 'wrong')
+    assert 'Access denied' in str(error.value)
+
+
+def test_concurrent_callers_share_one_login(server_url):
+    """Cache is locked: threads do not authenticate concurrently."""
+    sessions = []
+
+    def login():
+        sessions.append(rpc.authenticated_session(server_url, 'test',
+                                                  'admin', 'admin'))
+
+    threads = [threading.Thread(target=login) for index in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert set(session.session_id for session in sessions) == set(['abc1'])
@@ -0,0 +1,92 @@
+"""Tests around :mod:`odooselenium.runner`."""
+import os
+import StringIO
+import unittest
+
+from odooselenium import runner
+
+
+class SampleTestCase(unittest.TestCase):
+    """Tests which do not need Odoo, run by the tests below."""
+    __test__ = False  # Not collected by pytest.
+
+    def test_success(self):
+        pass
+
+    def test_failure(self):
+        self.fail('Expected failure message')
+
+    def test_skip(self):
+        self.skipTest('Not relevant')
+
+    @runner.expected_duration(300)
+    def test_install(self):
+        pass
+
+
+class HistoryTestCase(unittest.TestCase):
+    __test__ = False
+
+    def test_worker_records_in_run(self):
+        self.assertEqual(os.environ.get('ODOOSELENIUM_RUN'), '1')
+
+
+class SlowTestCase(unittest.TestCase):
+    __test__ = False
+    expected_duration = 60
+
+    def test_report(self):
+        pass
+
+
+def sample_suite():
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for name in ('test_success', 'test_failure', 'test_skip'):
+        suite.addTest(loader.loadTestsFromName(name, SampleTestCase))
+    return suite
+
+
+def test_schedule_longest_first():
+    """Known durations win over static estimates, longest tests go first."""
+    loader = unittest.TestLoader()
+    tests = list(runner.iter_tests(sample_suite())) + [
+        loader.loadTestsFromName('test_install', SampleTestCase),
+        loader.loadTestsFromName('test_report', SlowTestCase)]
+    tests = list(runner.iter_tests(tests))
+    estimates = runner.estimate_durations(
+        tests, {tests[0].id(): 100.0, tests[1].id(): 45.0}, default=20)
+    assert [estimates[test] for test in tests] == [100.0, 45.0, 20, 300, 60]
+    shards, loads = runner.schedule(tests, 2, estimates)
+    assert shards == [[tests[3]], [tests[0], tests[4], tests[1], tests[2]]]
+    assert loads == [300, 225.0]
+
+
+def test_run_parallel():
+    """Results of every worker are collected in parent process."""
+    stream = StringIO.StringIO()
+    results = runner.run_parallel(sample_suite(), workers=2, template=None,
+                                  stream=stream)
+    outcomes = dict((r['id'].split('.')[-1], r['outcome']) for r in results)
+    assert outcomes == {
+        'test_success': 'ok',
+        'test_failure': 'FAIL',
+        'test_skip': 'skip',
+    }
+    assert set(r['worker'] for r in results) == set([0, 1])
+    assert 'Expected failure message' in stream.getvalue()
+    assert 'FAILED (failures=1)' in stream.getvalue()
+    assert 'Makespan: ' in stream.getvalue()
+    assert '(predicted 60.00s)' in stream.getvalue()
+
+
+def test_history_run_is_set_in_workers_only(tmpdir, monkeypatch):
+    monkeypatch.delenv('ODOOSELENIUM_HISTORY', raising=False)
+    monkeypatch.delenv('ODOOSELENIUM_RUN', raising=False)
+    suite = unittest.TestLoader().loadTestsFromTestCase(HistoryTestCase)
+    results = runner.run_parallel(
+        suite, workers=1, template=None, stream=StringIO.StringIO(),
+        history_path=str(tmpdir.join('perf.sqlite')))
+    assert [result['outcome'] for result in results] == ['ok']
+    assert 'ODOOSELENIUM_HISTORY' not in os.environ
+    assert 'ODOOSELENIUM_RUN' not in os.environ
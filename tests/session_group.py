@@ -0,0 +1,102 @@
+"""Tests around :mod:`odooselenium.multi`."""
+import math
+import time
+
+import pytest
+
+from odooselenium import multi
+from odooselenium import wait
+
+
+class StubWebDriver(object):
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+class StubUI(object):
+    """Stand-in for OdooUI."""
+    def __init__(self, index):
+        self.index = index
+        self.webdriver = StubWebDriver()
+
+    def go_to_module(self, name, arrived=None, size=0):
+        """Return index, name and deadline seen by session.
+
+        If ``arrived`` list is given, wait for ``size`` sessions to be there
+        at the same time, each in its own deadline.
+
+        """
+        with wait.deadline(10 + self.index):
+            if arrived is not None:
+                arrived.append(self.index)
+                wait.until(lambda: len(arrived) == size, timeout=5)
+            return '{0}:{1}:{2}'.format(self.index, name, int(math.ceil(
+                wait.remaining(100))))
+
+    def fail_on_odd(self):
+        if self.index % 2:
+            raise RuntimeError(self.index)
+        return self.index
+
+
+def test_sessions_run_concurrently():
+    group = multi.SessionGroup(5, factory=StubUI)
+    with group:
+        # Sessions wait for each other: would time out if run in sequence.
+        results = group.call('go_to_module', 'Sales', [], 5)
+        sessions = list(group.sessions)
+    # Deadlines are per thread: each session got its own.
+    assert results == ['{0}:Sales:{1}'.format(i, 10 + i) for i in range(5)]
+    assert all(ui.webdriver.closed for ui in sessions)
+    assert group.sessions == []
+
+
+def test_errors():
+    with multi.SessionGroup(3, factory=StubUI) as group:
+        results = group.call('fail_on_odd', return_exceptions=True)
+        assert isinstance(results[1], RuntimeError)
+        assert results[0::2] == [0, 2]
+        with pytest.raises(RuntimeError):
+            group.call('fail_on_odd')
+        assert group.submit(2, StubUI.go_to_module, 'CRM').get() \
+            == '2:CRM:12'
+
+
+def test_failed_start_quits_started_sessions():
+    started = []
+
+    def factory(index):
+        if index == 2:
+            raise RuntimeError(index)
+        ui = StubUI(index)
+        started.append(ui)
+        return ui
+
+    group = multi.SessionGroup(4, factory=factory)
+    with pytest.raises(RuntimeError):
+        with group:
+            pass
+    assert len(started) == 3
+    assert all(ui.webdriver.closed for ui in started)
+    assert group.sessions == []
+
+
+def test_calls_on_one_session_do_not_overlap():
+    active = []
+    overlaps = []
+
+    def step(ui):
+        active.append(ui.index)
+        if active.count(ui.index) > 1:
+            overlaps.append(ui.index)
+        time.sleep(0.01)
+        active.remove(ui.index)
+
+    with multi.SessionGroup(2, factory=StubUI) as group:
+        pending = [group.submit(0, step) for i in range(5)]
+        for result in pending:
+            result.get()
+    assert overlaps == []
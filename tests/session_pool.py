@@ -0,0 +1,44 @@
+"""Tests around :mod:`odooselenium.pool`."""
+from odooselenium.pool import SessionPool
+
+
+class FakeWebDriver(object):
+    def __init__(self):
+        self.quitted = False
+
+    def quit(self):
+        self.quitted = True
+
+
+def test_acquire_reuses_released_sessions():
+    """Released sessions are handed back for the same key only."""
+    pool = SessionPool()
+    driver, reused = pool.acquire('a', FakeWebDriver)
+    assert not reused
+    pool.release('a', driver)
+    assert pool.acquire('b', FakeWebDriver)[0] is not driver
+    assert pool.acquire('a', FakeWebDriver) == (driver, True)
+    assert pool.stats() == {'hits': 1, 'misses': 2, 'relogins': 0,
+                            'replaced': 0}
+
+
+def test_close_quits_idle_sessions():
+    """``close()`` quits idle web drivers."""
+    pool = SessionPool()
+    driver, _ = pool.acquire('a', FakeWebDriver)
+    pool.release('a', driver)
+    pool.close()
+    assert driver.quitted
+    assert pool.idle == {}
+
+
+def test_dead_sessions_are_replaced_and_counted_as_misses():
+    pool = SessionPool()
+    driver, _ = pool.acquire('a', FakeWebDriver)
+    pool.release('a', driver)
+    assert pool.acquire('a', FakeWebDriver) == (driver, True)
+    new_driver = pool.replace(driver, FakeWebDriver)
+    assert driver.quitted
+    assert new_driver is not driver
+    assert pool.stats() == {'hits': 0, 'misses': 2, 'relogins': 0,
+                            'replaced': 1}
@@ -0,0 +1,33 @@
+"""Tests around :mod:`odooselenium.audit`."""
+import StringIO
+
+from odooselenium import audit
+
+
+class Helper(object):
+    _audited = True
+
+    def outer(self):
+        return self._inner()
+
+    def _inner(self):
+        return audit.current_action()
+
+
+def test_current_action_is_outermost_method():
+    """Time is attributed to outermost audited method."""
+    assert Helper().outer() == 'Helper.outer'
+    assert audit.current_action() is None
+
+
+def test_report():
+    """Report lists actions, longest waits first."""
+    wait_audit = audit.WaitAudit()
+    wait_audit.record('OdooUI.go_to_tab', 0.5)
+    wait_audit.record('OdooUI.click_list_column', 1.0)
+    wait_audit.record('OdooUI.go_to_tab', 0.25)
+    stream = StringIO.StringIO()
+    wait_audit.report(stream)
+    lines = stream.getvalue().splitlines()
+    assert lines[1].split() == ['OdooUI.click_list_column', '1', '1.000']
+    assert lines[2].split() == ['OdooUI.go_to_tab', '2', '0.750']
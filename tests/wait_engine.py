@@ -0,0 +1,64 @@
+"""Tests around wait engine in :mod:`odooselenium.wait`."""
+import pytest
+
+from odooselenium import wait
+
+
+def test_until_returns_condition_value():
+    """Condition value is returned as soon as it is true."""
+    calls = []
+
+    def ready():
+        calls.append(None)
+        return len(calls) == 3 and 'ready'
+
+    assert wait.until(ready, timeout=5) == 'ready'
+    assert len(calls) == 3
+
+
+def test_until_timeout_names_condition():
+    """Timeout errors mention condition and time spent."""
+    def never_ready():
+        return False
+
+    with pytest.raises(wait.WaitTimeout) as error:
+        wait.until(never_ready, timeout=0.05)
+    assert 'never_ready' in str(error.value)
+    assert 'Timed out after 0.' in str(error.value)
+
+
+def test_nested_waits_inherit_deadline():
+    """Nested waits cannot exceed the deadline of enclosing blocks."""
+    start = wait.clock()
+    with wait.deadline(0.1):
+        with wait.deadline(10):
+            with pytest.raises(wait.WaitTimeout):
+                wait.until(lambda: False, timeout=10)
+    assert wait.clock() - start < 1
+    assert wait.remaining(10) == 10
+
+
+def test_clock_is_monotonic():
+    """Clock never goes backwards."""
+    first = wait.clock()
+    assert wait.clock() >= first
+
+
+def test_odoo_idle_restores_script_timeout():
+    """Later asynchronous scripts do not inherit remaining deadline."""
+    class StubWebDriver(object):
+        def __init__(self):
+            self.script_timeouts = []
+
+        def set_script_timeout(self, timeout):
+            self.script_timeouts.append(timeout)
+
+        def execute_async_script(self, script, *args):
+            raise wait.TimeoutException()
+
+    driver = StubWebDriver()
+    with wait.deadline(0.5):
+        with pytest.raises(wait.WaitTimeout):
+            wait.wait_for_odoo_idle(driver)
+    assert driver.script_timeouts[0] <= 0.5
+    assert driver.script_timeouts[1:] == [wait.SCRIPT_TIMEOUT]